@@ -0,0 +1,322 @@
+"""
+Benchmark suite for the Python implementation.
+
+Measures encoding, parsing, display and playback on the test fixtures and
+on large synthetic images and GIFs generated at startup, then writes the
+results with environment metadata as JSON to ``benchmarks/results/``.
+
+Usage:
+    python benchmarks/bench_python.py                   # Full run
+    python benchmarks/bench_python.py --quick           # Fewer sizes and repeats
+    python benchmarks/bench_python.py -k encode_image   # Only matching cases
+    python benchmarks/bench_python.py --compare results/baseline.json
+
+With ``--compare``, each case's best time is checked against the stored
+baseline and the run exits with status 1 if any case is slower by more
+than ``--threshold`` (default 10%). Best-of times are used because they
+are the least sensitive to other load on the machine.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT = BENCH_DIR.parent
+RESULTS_DIR = BENCH_DIR / "results"
+FIXTURES = ROOT / "python" / "tests" / "fixtures"
+
+# Benchmark the working tree rather than whatever catpic is installed
+sys.path.insert(0, str(ROOT / "python" / "src"))
+
+from PIL import Image, ImageDraw  # noqa: E402
+
+import catpic  # noqa: E402
+from catpic import BASIS, CatpicDecoder, CatpicEncoder  # noqa: E402
+from catpic.decoder import CatpicPlayer  # noqa: E402
+
+# Output widths in cells for encode_image
+WIDTHS = (40, 80, 160)
+QUICK_WIDTHS = (80,)
+
+# Default regression threshold for --compare (fraction of baseline time)
+DEFAULT_THRESHOLD = 0.10
+
+
+class NullSink(io.TextIOBase):
+    """Text stream that counts and discards everything written."""
+
+    def __init__(self) -> None:
+        self.chars = 0
+
+    def write(self, text: str) -> int:
+        self.chars += len(text)
+        return len(text)
+
+
+def make_photo(path: Path, size: Tuple[int, int]) -> Path:
+    """Write a photo-like synthetic image: gradients, shapes and noise."""
+    width, height = size
+    gradient = Image.linear_gradient("L").resize(size)
+    img = Image.merge("RGB", (
+        gradient,
+        gradient.transpose(Image.Transpose.ROTATE_90).resize(size),
+        Image.effect_noise(size, 64),
+    ))
+    draw = ImageDraw.Draw(img)
+    for i in range(12):
+        x, y = (i * 157) % width, (i * 89) % height
+        r = max(8, min(size) // (4 + i))
+        draw.ellipse((x - r, y - r, x + r, y + r), fill=((i * 40) % 256, 200, (i * 70) % 256))
+    img.save(path, quality=90)
+    return path
+
+
+def make_gif(path: Path, size: Tuple[int, int], frames: int) -> Path:
+    """Write a synthetic animated GIF with a ball moving over a gradient."""
+    width, height = size
+    background = Image.merge("RGB", (
+        Image.linear_gradient("L").resize(size),
+        Image.new("L", size, 80),
+        Image.linear_gradient("L").transpose(Image.Transpose.ROTATE_90).resize(size),
+    ))
+    images = []
+    r = min(size) // 6
+    for i in range(frames):
+        frame = background.copy()
+        x = r + (width - 2 * r) * i // max(1, frames - 1)
+        y = height // 2 + int((height // 3) * ((i % 10) - 5) / 5)
+        ImageDraw.Draw(frame).ellipse((x - r, y - r, x + r, y + r), fill=(255, 220, 0))
+        images.append(frame)
+    images[0].save(path, save_all=True, append_images=images[1:], duration=40, loop=0)
+    return path
+
+
+def measure(func: Callable[[], Any], repeat: int, min_time: float = 0.2) -> Dict[str, Any]:
+    """
+    Time func, calling it at least ``repeat`` times and for ``min_time`` seconds.
+
+    Returns:
+        Dict with min/median/mean seconds, run count and the last result
+    """
+    times: List[float] = []
+    result = None
+    started = time.perf_counter()
+    while len(times) < repeat or (time.perf_counter() - started < min_time and len(times) < 100):
+        t0 = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - t0)
+    return {
+        "runs": len(times),
+        "min_s": min(times),
+        "median_s": statistics.median(times),
+        "mean_s": statistics.fmean(times),
+        "result": result,
+    }
+
+
+def iter_cases(work: Path, quick: bool) -> Iterator[Tuple[str, Callable[[], Any], Callable[[Any], Dict[str, float]]]]:
+    """
+    Yield (name, func, rates) for every benchmark case.
+
+    ``rates`` turns func's return value and median time into throughput
+    figures; it receives (result, seconds).
+    """
+    widths = QUICK_WIDTHS if quick else WIDTHS
+    photo = make_photo(work / "photo_1920x1080.jpg", (1920, 1080))
+    gif = make_gif(work / "ball_320x240.gif", (320, 240), 12 if quick else 30)
+    images = {
+        "fixture_gradient_64x64": FIXTURES / "gradient_64x64.jpg",
+        "synthetic_1920x1080": photo,
+    }
+
+    # encode_image per BASIS, source and output width
+    for basis in BASIS:
+        encoder = CatpicEncoder(basis=basis)
+        basis_name = f"{basis.value[0]}x{basis.value[1]}"
+        for image_name, image_path in images.items():
+            for width in widths:
+                yield (
+                    f"encode_image[{basis_name},{image_name},w{width}]",
+                    lambda e=encoder, p=image_path, w=width: e.encode_image(p, width=w),
+                    lambda meow, s: {"cells_per_s": _cells(meow) / s},
+                )
+
+    # encode_animation on a fixture and a synthetic GIF
+    encoder = CatpicEncoder(basis=BASIS.BASIS_2_2)
+    gifs = {"fixture_bounce_medium": FIXTURES / "bounce_medium.gif", "synthetic_ball_320x240": gif}
+    for gif_name, gif_path in gifs.items():
+        yield (
+            f"encode_animation[{gif_name},w60]",
+            lambda p=gif_path: encoder.encode_animation(p, width=60),
+            lambda meow, s: {"frames_per_s": _frames(meow) / s},
+        )
+
+    # Parsing, display and playback of pre-encoded content
+    static = CatpicEncoder(basis=BASIS.BASIS_2_4).encode_image(photo, width=160)
+    anim = encoder.encode_animation(gif, width=80)
+    decoder = CatpicDecoder()
+    frames = [frame["lines"] for frame in decoder.parse_meow(anim)["frames"]]
+    height = decoder.parse_meow(anim)["height"]
+
+    yield (
+        "parse_meow[static,w160]",
+        lambda: decoder.parse_meow(static),
+        lambda _, s: {"mb_per_s": len(static.encode("utf-8")) / s / 1e6},
+    )
+    yield (
+        "parse_meow[anim,w80]",
+        lambda: decoder.parse_meow(anim),
+        lambda _, s: {"mb_per_s": len(anim.encode("utf-8")) / s / 1e6},
+    )
+
+    def display() -> int:
+        sink = NullSink()
+        decoder.display(static, file=sink)
+        return sink.chars
+
+    yield (
+        "display[static,w160]",
+        display,
+        lambda chars, s: {"mb_per_s": chars / s / 1e6},
+    )
+
+    for diff in (True, False):
+        def play(diff: bool = diff) -> int:
+            sink = NullSink()
+            with contextlib.redirect_stdout(sink):
+                CatpicPlayer().play_stream(
+                    [(lines, 0) for lines in frames], height, loop=False, force=True, diff=diff
+                )
+            return sink.chars
+
+        yield (
+            f"player[{'diff' if diff else 'full'},w80]",
+            play,
+            lambda chars, s: {"frames_per_s": len(frames) / s, "mb_per_s": chars / s / 1e6},
+        )
+
+
+def _cells(meow: str) -> int:
+    """Number of cells in MEOW text (each cell ends in a reset)."""
+    return meow.count("\x1b[0m")
+
+
+def _frames(meow: str) -> int:
+    return sum(1 for line in meow.splitlines() if line.startswith("FRAME:"))
+
+
+def environment() -> Dict[str, Any]:
+    """Metadata describing where the benchmark ran."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    import PIL
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "catpic": catpic.__version__,
+        "commit": commit,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "pillow": PIL.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def run(quick: bool = False, pattern: Optional[str] = None, repeat: Optional[int] = None) -> Dict[str, Any]:
+    """Run the benchmark cases and return the results document."""
+    repeat = repeat or (3 if quick else 5)
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory(prefix="catpic-bench-") as tmp:
+        for name, func, rates in iter_cases(Path(tmp), quick):
+            if pattern and pattern not in name:
+                continue
+            timing = measure(func, repeat)
+            result = timing.pop("result")
+            timing.update({key: round(value, 3) for key, value in rates(result, timing["median_s"]).items()})
+            results[name] = timing
+            print(f"{name:<58} {timing['median_s'] * 1000:10.2f} ms", file=sys.stderr)
+    return {"environment": environment(), "quick": quick, "results": results}
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Compare best times against a baseline document.
+
+    Returns:
+        One message per case slower than the baseline by more than threshold
+    """
+    for key in ("machine", "python", "pillow", "cpu_count"):
+        ours, theirs = current["environment"].get(key), baseline.get("environment", {}).get(key)
+        if ours != theirs:
+            print(f"Note: baseline {key} is {theirs!r}, this run {ours!r}", file=sys.stderr)
+
+    regressions = []
+    for name, timing in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None:
+            continue
+        ratio = timing["min_s"] / base["min_s"]
+        status = "REGRESSION" if ratio > 1 + threshold else "ok"
+        print(f"{name:<58} {ratio:6.2f}x  {status}", file=sys.stderr)
+        if ratio > 1 + threshold:
+            regressions.append(
+                f"{name}: {base['min_s'] * 1000:.2f} ms -> {timing['min_s'] * 1000:.2f} ms ({ratio:.2f}x)"
+            )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the catpic Python implementation.")
+    parser.add_argument("--quick", action="store_true", help="fewer sizes, frames and repeats")
+    parser.add_argument("-k", dest="pattern", help="only run cases whose name contains this")
+    parser.add_argument("--repeat", type=int, help="minimum runs per case")
+    parser.add_argument("-o", "--output", type=Path, help="results file (default: results/python-<time>.json)")
+    parser.add_argument("--compare", type=Path, metavar="BASELINE", help="flag regressions against a results file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown before a case is a regression (default: 0.10)")
+    args = parser.parse_args(argv)
+
+    document = run(args.quick, args.pattern, args.repeat)
+
+    output = args.output
+    if output is None:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        output = RESULTS_DIR / f"python-{stamp}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(document, indent=2) + "\n", encoding="utf-8")
+    print(f"Results written to {output}", file=sys.stderr)
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        regressions = compare(document, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s) over {args.threshold:.0%}:", file=sys.stderr)
+            for message in regressions:
+                print(f"  {message}", file=sys.stderr)
+            return 1
+        print("No regressions", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,24 +3,85 @@ catpic - Terminal Image Viewer using Unicode mosaics and ANSI colors
 
 High-level API for quick image display and MEOW format handling.
 Low-level primitives API for TUI framework integration.
+
+Public names are imported on first use (PEP 562), so ``import catpic``
+and displaying .meow files do not import Pillow.
 """
 
 __version__ = "0.5.0"
 
-from typing import Optional, Tuple, Union
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
 from pathlib import Path
-from PIL import Image
 
-# Import encoder and decoder classes
-from .encoder import CatpicEncoder
-from .decoder import CatpicDecoder
+if TYPE_CHECKING:
+    from PIL import Image
+
+    from .core import BASIS
+    from .decoder import CatpicDecoder
+    from .encoder import CatpicEncoder
+    from .progressive import ProgressiveRender
+    from .batch import render_many
+    from .gallery import render_gallery
+    from .primitives import (
+        Cell,
+        CellGrid,
+        cells_to_ansi_lines,
+        compute_centroid,
+        get_full_glut,
+        get_pips_glut,
+        image_to_cells,
+        pattern_to_index,
+        process_cell,
+        quantize_cell,
+        render_dirty,
+        update_region,
+    )
+
+# Public name -> submodule that defines it
+_LAZY_NAMES: Dict[str, str] = {
+    # Core types
+    "BASIS": "core",
+    "CatpicEncoder": "encoder",
+    "CatpicDecoder": "decoder",
+    "ProgressiveRender": "progressive",
+    # Batch conversion
+    "render_many": "batch",
+    "render_gallery": "gallery",
+    # Primitives API
+    "Cell": "primitives",
+    "CellGrid": "primitives",
+    "get_full_glut": "primitives",
+    "get_pips_glut": "primitives",
+    "quantize_cell": "primitives",
+    "compute_centroid": "primitives",
+    "pattern_to_index": "primitives",
+    "process_cell": "primitives",
+    "image_to_cells": "primitives",
+    "cells_to_ansi_lines": "primitives",
+    "update_region": "primitives",
+    "render_dirty": "primitives",
+}
+
+
+def __getattr__(name: str) -> Any:
+    """Import public names from their submodule on first access."""
+    module_name = _LAZY_NAMES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+
+    value = getattr(import_module(f".{module_name}", __name__), name)
+    globals()[name] = value  # Later lookups skip __getattr__
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY_NAMES))
 
-# Import core types for tests
-from .core import BASIS
 
 # High-level convenience functions
 def render_image_ansi(
-    image: Union[str, Path, Image.Image],
+    image: Union[str, Path, "Image.Image"],
     width: Optional[int] = None,
     height: Optional[int] = None,
     basis: Optional[Tuple[int, int]] = None,
@@ -45,24 +106,9 @@ def render_image_ansi(
         >>> ansi = render_image_ansi('photo.jpg', width=80, basis=(2, 4))
         >>> print(ansi)
     """
-    encoder = CatpicEncoder(basis=basis)
-    
-    # Handle PIL Image object
-    if isinstance(image, Image.Image):
-        # Save to temp file since encoder expects file path
-        # TODO: Refactor encoder to accept PIL Image directly
-        import tempfile
-        with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp:
-            image.save(tmp.name)
-            result = encoder.encode_image(tmp.name, width=width, height=height)
-        Path(tmp.name).unlink()  # Clean up temp file
-        
-        # Strip MEOW header, return just the ANSI data
-        lines = result.split('\n')
-        data_start = lines.index('DATA:') + 1
-        return '\n'.join(lines[data_start:])
+    from .encoder import CatpicEncoder
     
-    # Handle file path
+    encoder = CatpicEncoder(basis=basis)
     result = encoder.encode_image(image, width=width, height=height)
     
     # Strip MEOW header, return just the ANSI data
@@ -86,11 +132,13 @@ def load_meow(filepath: Union[str, Path]):
         >>> frames, meta = load_meow('animation.meow')
         >>> print(frames[0])  # Display first frame
     """
+    from .decoder import CatpicDecoder
+    
     decoder = CatpicDecoder()
     return decoder.load(filepath)
 
 
-def save_meow(filepath: Union[str, Path], image: Union[str, Path, Image.Image],
+def save_meow(filepath: Union[str, Path], image: Union[str, Path, "Image.Image"],
               width: Optional[int] = None, height: Optional[int] = None,
               basis: Optional[Tuple[int, int]] = None):
     """
@@ -106,38 +154,15 @@ def save_meow(filepath: Union[str, Path], image: Union[str, Path, Image.Image],
     Example:
         >>> save_meow('output.meow', 'photo.jpg', width=80, basis=(2, 4))
     """
-    encoder = CatpicEncoder(basis=basis)
+    from .encoder import CatpicEncoder
     
-    # Handle PIL Image
-    if isinstance(image, Image.Image):
-        import tempfile
-        with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp:
-            image.save(tmp.name)
-            meow_content = encoder.encode_image(tmp.name, width=width, height=height)
-        Path(tmp.name).unlink()
-    else:
-        meow_content = encoder.encode_image(image, width=width, height=height)
+    encoder = CatpicEncoder(basis=basis)
+    meow_content = encoder.encode_image(image, width=width, height=height)
     
     # Write to file
     with open(filepath, 'w') as f:
         f.write(meow_content)
 
-# Primitives API - Core types
-from .primitives import Cell
-
-# Primitives API - GLUT functions
-from .primitives import get_full_glut, get_pips_glut
-
-# Primitives API - Cell processing
-from .primitives import (
-    quantize_cell,
-    compute_centroid,
-    pattern_to_index,
-    process_cell,
-)
-
-# Primitives API - Image processing
-from .primitives import image_to_cells, cells_to_ansi_lines
 
 __all__ = [
     # Version
@@ -146,12 +171,16 @@ __all__ = [
     "render_image_ansi",
     "load_meow",
     "save_meow",
+    "render_many",
+    "render_gallery",
     # Core types
     "BASIS",
     "CatpicEncoder",
     "CatpicDecoder",
+    "ProgressiveRender",
     # Primitives - Core types
     "Cell",
+    "CellGrid",
     # Primitives - GLUTs
     "get_full_glut",
     "get_pips_glut",
@@ -163,4 +192,6 @@ __all__ = [
     # Primitives - Image processing
     "image_to_cells",
     "cells_to_ansi_lines",
+    "update_region",
+    "render_dirty",
 ]
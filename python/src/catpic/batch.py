@@ -0,0 +1,356 @@
+"""
+Batch conversion of many images to MEOW files.
+
+Images are split into chunks and rendered in worker processes. Inside each
+worker a background thread reads, decodes and resizes the next image while
+the current one is being encoded, so decoding and encoding overlap.
+
+Outputs that are already up to date are skipped. Each output directory
+keeps a small manifest (``.catpic-batch.json``) recording, per output, the
+source's modification time, size and SHA-256 together with the encoding
+options it was rendered with.
+"""
+
+import glob
+import hashlib
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from PIL import Image
+
+from .core import BASIS
+from .encoder import CatpicEncoder
+from .sources import IMAGE_SUFFIXES
+
+# Per-directory record of rendered outputs
+MANIFEST_NAME = ".catpic-batch.json"
+
+# Upper bound on images handed to a worker at once
+MAX_CHUNK = 16
+
+
+def collect_sources(
+    sources: Union[str, Path, Iterable[Union[str, Path]]]
+) -> List[Path]:
+    """
+    Expand directories and glob patterns into a sorted list of image files.
+
+    Args:
+        sources: A directory, a glob pattern (e.g. "photos/**/*.jpg"), a
+                 file, or an iterable of any of these
+
+    Raises:
+        ValueError: If a source matches nothing
+    """
+    if isinstance(sources, (str, Path)):
+        sources = [sources]
+
+    found: Dict[Path, None] = {}
+    for source in sources:
+        path = Path(source)
+        if path.is_dir():
+            matches = [p for p in path.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES]
+        elif path.is_file():
+            matches = [path]
+        else:
+            matches = [
+                Path(p) for p in glob.glob(str(source), recursive=True)
+                if Path(p).suffix.lower() in IMAGE_SUFFIXES
+            ]
+        if not matches:
+            raise ValueError(f"No images found for '{source}'")
+        for match in sorted(p for p in matches if p.is_file()):
+            found[match] = None
+    return list(found)
+
+
+def render_many(
+    sources: Union[str, Path, Iterable[Union[str, Path]]],
+    output_dir: Optional[Union[str, Path]] = None,
+    basis: Optional[Union[BASIS, Tuple[int, int]]] = None,
+    width: Optional[int] = None,
+    height: Optional[int] = None,
+    jobs: Optional[int] = None,
+    force: bool = False,
+) -> Dict[str, Any]:
+    """
+    Convert many images to .meow files in parallel.
+
+    Animated images are encoded as MEOW-ANIM.
+
+    Args:
+        sources: Directory, glob pattern, file, or iterable of these
+        output_dir: Directory for the .meow files (default: next to each source)
+        basis: BASIS level (default: CATPIC_BASIS env var or 2,2)
+        width: Output width in characters (default: 80, 60 for animations)
+        height: Output height in characters (default: from aspect ratio)
+        jobs: Worker processes (default: CPU count; 1 renders in-process)
+        force: Re-render outputs even when they are up to date
+
+    Returns:
+        Dict with 'rendered', 'skipped' and 'failed' counts, 'outputs'
+        (paths written), 'errors' (source -> message), 'seconds',
+        'bytes_read', 'bytes_written', 'cells' and the throughput figures
+        'images_per_second', 'cells_per_second', 'megabytes_per_second'
+
+    Raises:
+        ValueError: If no images are found or two sources map to one output
+
+    Example:
+        >>> stats = render_many('photos/*.jpg', output_dir='meow', jobs=4)
+        >>> print(stats['rendered'], stats['images_per_second'])
+    """
+    start = time.perf_counter()
+    encoder = CatpicEncoder(basis=basis)
+    options = _options_key(encoder.basis, width, height)
+
+    tasks: List[Tuple[str, str]] = []
+    manifests: Dict[Path, Dict[str, Any]] = {}
+    claimed: Dict[Path, Path] = {}  # output -> source, skipped ones included
+    skipped = 0
+    for source in collect_sources(sources):
+        directory = Path(output_dir) if output_dir is not None else source.parent
+        output = directory / (source.stem + ".meow")
+        if output in claimed:
+            raise ValueError(
+                f"'{claimed[output]}' and '{source}' both render to '{output}'"
+            )
+        claimed[output] = source
+
+        if directory not in manifests:
+            manifests[directory] = _load_manifest(directory)
+        entry = manifests[directory].get(output.name)
+        if not force and _is_up_to_date(source, output, entry, options):
+            skipped += 1
+            continue
+        tasks.append((str(source), str(output)))
+
+    for directory in manifests:
+        directory.mkdir(parents=True, exist_ok=True)
+
+    results = _run_tasks(tasks, encoder.basis, width, height, jobs)
+
+    stats: Dict[str, Any] = {
+        'rendered': 0,
+        'skipped': skipped,
+        'failed': 0,
+        'outputs': [],
+        'errors': {},
+        'bytes_read': 0,
+        'bytes_written': 0,
+        'cells': 0,
+    }
+    for result in results:
+        if result['error'] is not None:
+            stats['failed'] += 1
+            stats['errors'][result['source']] = result['error']
+            continue
+        output = Path(result['output'])
+        manifests[output.parent][output.name] = {
+            'source': str(Path(result['source']).resolve()),
+            'mtime_ns': result['mtime_ns'],
+            'size': result['bytes_read'],
+            'sha256': result['sha256'],
+            'options': options,
+        }
+        stats['rendered'] += 1
+        stats['outputs'].append(output)
+        for key in ('bytes_read', 'bytes_written', 'cells'):
+            stats[key] += result[key]
+
+    for directory, manifest in manifests.items():
+        _save_manifest(directory, manifest)
+
+    seconds = time.perf_counter() - start
+    stats['seconds'] = seconds
+    rate = 1 / seconds if seconds > 0 else 0.0
+    stats['images_per_second'] = stats['rendered'] * rate
+    stats['cells_per_second'] = stats['cells'] * rate
+    stats['megabytes_per_second'] = stats['bytes_read'] / (1024 * 1024) * rate
+    return stats
+
+
+def _options_key(basis: BASIS, width: Optional[int], height: Optional[int]) -> str:
+    """Encoding options an output depends on, as a manifest string."""
+    basis_x, basis_y = basis.value
+    return f"basis={basis_x},{basis_y};width={width or ''};height={height or ''}"
+
+
+def _load_manifest(directory: Path) -> Dict[str, Any]:
+    """Read a directory's manifest; missing or damaged manifests are empty."""
+    try:
+        with open(directory / MANIFEST_NAME, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def _save_manifest(directory: Path, manifest: Dict[str, Any]) -> None:
+    """Write a manifest atomically so an interrupted run cannot corrupt it."""
+    tmp = directory / (MANIFEST_NAME + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, directory / MANIFEST_NAME)
+
+
+def _is_up_to_date(
+    source: Path,
+    output: Path,
+    entry: Optional[Dict[str, Any]],
+    options: str
+) -> bool:
+    """
+    Check an output against its manifest entry.
+
+    Matching mtime and size is trusted. If only the mtime changed (e.g. the
+    file was touched or copied) the content hash decides; the entry is then
+    refreshed so the next run takes the cheap path again.
+    """
+    if entry is None or not output.exists():
+        return False
+    if entry.get('options') != options or entry.get('source') != str(source.resolve()):
+        return False
+
+    stat = source.stat()
+    if stat.st_size != entry.get('size'):
+        return False
+    if stat.st_mtime_ns == entry.get('mtime_ns'):
+        return True
+
+    if _sha256(source.read_bytes()) != entry.get('sha256'):
+        return False
+    entry['mtime_ns'] = stat.st_mtime_ns
+    return True
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _run_tasks(
+    tasks: List[Tuple[str, str]],
+    basis: BASIS,
+    width: Optional[int],
+    height: Optional[int],
+    jobs: Optional[int]
+) -> List[Dict[str, Any]]:
+    """Render (source, output) pairs in chunks, in-process or in a pool."""
+    if not tasks:
+        return []
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    jobs = max(1, min(jobs, len(tasks)))
+
+    if jobs == 1:
+        return _render_chunk(basis, width, height, tasks)
+
+    # Several chunks per worker keeps the pool busy when image sizes vary
+    size = max(1, min(MAX_CHUNK, -(-len(tasks) // (jobs * 4))))
+    chunks = [tasks[i:i + size] for i in range(0, len(tasks), size)]
+
+    results: List[Dict[str, Any]] = []
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [
+            pool.submit(_render_chunk, basis, width, height, chunk) for chunk in chunks
+        ]
+        for future in futures:
+            results.extend(future.result())
+    return results
+
+
+def _load_source(
+    encoder: CatpicEncoder,
+    source: str,
+    width: Optional[int],
+    height: Optional[int]
+) -> Dict[str, Any]:
+    """
+    Read, hash, decode and resize one source (runs on the prefetch thread).
+
+    Pillow releases the GIL while decoding and resampling, so this overlaps
+    with cell encoding of the previous image.
+    """
+    loaded: Dict[str, Any] = {'source': source}
+    try:
+        path = Path(source)
+        data = path.read_bytes()
+        loaded['mtime_ns'] = path.stat().st_mtime_ns
+        loaded['bytes_read'] = len(data)
+        loaded['sha256'] = _sha256(data)
+
+        img = Image.open(io.BytesIO(data))
+        if getattr(img, "is_animated", False):
+            loaded['animated'] = True
+            img.close()
+        else:
+            img.load()
+            loaded['prepared'] = encoder.prepare_image(img, width, height)
+    except Exception as e:
+        loaded['error'] = f"{type(e).__name__}: {e}"
+    return loaded
+
+
+def _render_chunk(
+    basis: BASIS,
+    width: Optional[int],
+    height: Optional[int],
+    tasks: List[Tuple[str, str]]
+) -> List[Dict[str, Any]]:
+    """Render a chunk of images, prefetching the next one on a thread."""
+    encoder = CatpicEncoder(basis=basis)
+    results = []
+    with ThreadPoolExecutor(max_workers=1) as prefetch:
+        pending = prefetch.submit(_load_source, encoder, tasks[0][0], width, height)
+        for idx, (source, output) in enumerate(tasks):
+            loaded = pending.result()
+            if idx + 1 < len(tasks):
+                pending = prefetch.submit(_load_source, encoder, tasks[idx + 1][0], width, height)
+            results.append(_encode_loaded(encoder, loaded, output, width, height))
+    return results
+
+
+def _encode_loaded(
+    encoder: CatpicEncoder,
+    loaded: Dict[str, Any],
+    output: str,
+    width: Optional[int],
+    height: Optional[int]
+) -> Dict[str, Any]:
+    """Encode a prefetched source and write its .meow file."""
+    result = {
+        'source': loaded['source'],
+        'output': output,
+        'error': loaded.get('error'),
+        'mtime_ns': loaded.get('mtime_ns'),
+        'sha256': loaded.get('sha256'),
+        'bytes_read': loaded.get('bytes_read', 0),
+        'bytes_written': 0,
+        'cells': 0,
+    }
+    if result['error'] is not None:
+        return result
+
+    try:
+        if loaded.get('animated'):
+            info = encoder.animation_info(loaded['source'], width, height)
+            content = encoder.encode_animation(loaded['source'], info['width'], info['height'])
+            cells = info['width'] * info['height'] * encoder.frame_stats['encoded']
+        else:
+            img_resized, cell_width, cell_height = loaded['prepared']
+            content = encoder.encode_resized(img_resized, cell_width, cell_height)
+            cells = cell_width * cell_height
+
+        data = content.encode("utf-8")
+        with open(output, "wb") as f:
+            f.write(data)
+        result['bytes_written'] = len(data)
+        result['cells'] = cells
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    return result
@@ -0,0 +1,342 @@
+"""
+Byte budgets for terminal output over slow links.
+
+A MEOW cell is about 40 bytes of escape sequences around one glyph, so a
+truecolor 2,4 animation can easily need more bandwidth than an SSH link
+has. With a Budget (bytes per frame, or bytes per second) catpic trades
+quality for size in this order:
+
+1. Compaction (lossless): color sequences are only sent when the color
+   changes and the per-cell resets are dropped.
+2. Color depth: xterm 256-color sequences instead of 24-bit RGB.
+3. BASIS: 2,3 and 2,4 glyphs take 4 UTF-8 bytes, 2,2 glyphs 3.
+4. Width: fewer cells.
+
+fit_image() picks the width and BASIS for an image (or an animation's
+first frame). During playback a Throttle chooses the color depth frame by
+frame and drops frames when even the cheapest form would overdraw the
+budget. Compaction and color depth only change what is written to the
+terminal; saved .meow files stay in the standard per-cell 24-bit form.
+
+Example:
+    >>> budget = Budget.parse("16k/s")
+    >>> meow, choice = fit_image("photo.jpg", budget)
+    >>> choice["width"], choice["colors"], choice["bytes"]
+"""
+
+import math
+import re
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from PIL import Image
+
+    from .core import BASIS
+
+# Color depths in order of preference
+COLOR_DEPTHS = ("truecolor", "256")
+
+# An escape sequence (CSI), a newline, or a run of other characters
+_TOKEN = re.compile(r"\x1b\[([0-9;?]*)([@-~])|(\n)|([^\x1b\n]+)")
+
+# Cursor movement and save/restore: output position only, no SGR dependence
+_CURSOR_FINALS = frozenset("ABCDEFGHfsu")
+
+# Channel levels of the xterm 6x6x6 color cube
+_CUBE = (0, 95, 135, 175, 215, 255)
+
+_BUDGET_VALUE = re.compile(r"^\s*([0-9]*\.?[0-9]+)\s*([kKmM]?)[bB]?\s*(/\s*s)?\s*$")
+
+
+class Budget:
+    """
+    A limit on bytes written to the terminal, per frame or per second.
+
+    Example:
+        >>> Budget(bytes_per_frame=4096)
+        >>> Budget.parse("20k/s")  # 20480 bytes per second
+    """
+
+    def __init__(self, bytes_per_frame: Optional[int] = None, bytes_per_second: Optional[int] = None):
+        if (bytes_per_frame is None) == (bytes_per_second is None):
+            raise ValueError("Give exactly one of bytes_per_frame and bytes_per_second")
+        if (bytes_per_frame or bytes_per_second or 0) <= 0:
+            raise ValueError("Budget must be positive")
+        self.bytes_per_frame = bytes_per_frame
+        self.bytes_per_second = bytes_per_second
+
+    @classmethod
+    def parse(cls, value: str) -> "Budget":
+        """
+        Parse "4096", "4k" or "1.5M" (bytes per frame) or "20k/s" (bytes per second).
+
+        Raises:
+            ValueError: If the value is not a budget
+        """
+        match = _BUDGET_VALUE.match(value)
+        if not match:
+            raise ValueError(f"Invalid budget '{value}' (expected e.g. 4k or 20k/s)")
+        number, unit, per_second = match.groups()
+        size = int(float(number) * {"": 1, "k": 1024, "m": 1024 * 1024}[unit.lower()])
+        if per_second:
+            return cls(bytes_per_second=size)
+        return cls(bytes_per_frame=size)
+
+    def frame_bytes(self) -> int:
+        """Bytes one full frame may take (a second's worth for per-second budgets)."""
+        return self.bytes_per_frame or self.bytes_per_second or 0
+
+    def __str__(self) -> str:
+        if self.bytes_per_second is not None:
+            return f"{self.bytes_per_second} B/s"
+        return f"{self.bytes_per_frame} B/frame"
+
+
+def xterm_256(rgb: Tuple[int, int, int]) -> int:
+    """Nearest xterm 256-color palette index (color cube or gray ramp)."""
+    r, g, b = rgb
+    cube = [min(range(6), key=lambda i: abs(_CUBE[i] - v)) for v in (r, g, b)]
+    cube_rgb = [_CUBE[i] for i in cube]
+    gray_level = min(23, max(0, round(((r + g + b) / 3 - 8) / 10)))
+    gray = 8 + 10 * gray_level
+
+    def distance(c: Tuple[int, ...]) -> int:
+        return (c[0] - r) ** 2 + (c[1] - g) ** 2 + (c[2] - b) ** 2
+
+    if distance((gray, gray, gray)) < distance(tuple(cube_rgb)):
+        return 232 + gray_level
+    return 16 + 36 * cube[0] + 6 * cube[1] + cube[2]
+
+
+def compact(text: str, colors: str = "truecolor") -> str:
+    """
+    Rewrite ANSI output with the fewest color sequences.
+
+    Colors are tracked across cells and only sent when they change (both in
+    one sequence), per-cell resets are dropped, and a single reset is sent
+    before line breaks, erases and at the end. With colors="256" RGB colors
+    are sent as xterm 256-color indexes. The text looks the same on screen
+    except for the color approximation.
+
+    Args:
+        text: MEOW data lines or player output (cursor moves are kept)
+        colors: "truecolor" or "256"
+    """
+    if colors not in COLOR_DEPTHS:
+        raise ValueError(f"Unknown color depth '{colors}' (expected one of {', '.join(COLOR_DEPTHS)})")
+    palette: Dict[str, str] = {}  # SGR color parameters -> parameters to send
+
+    def convert(params: str) -> str:
+        converted = palette.get(params)
+        if converted is None:
+            parts = params.split(";")
+            if colors == "256" and len(parts) == 5 and parts[1] == "2":
+                index = xterm_256((int(parts[2]), int(parts[3]), int(parts[4])))
+                converted = f"{parts[0]};5;{index}"
+            else:
+                converted = params
+            palette[params] = converted
+        return converted
+
+    out: List[str] = []
+    want_fg = want_bg = ""  # Color parameters wanted for the next text
+    have_fg = have_bg = ""  # What the terminal currently has
+
+    for match in _TOKEN.finditer(text):
+        params, final, newline, chars = match.groups()
+        if final == "m":
+            for param in _split_sgr(params):
+                if param in ("", "0"):
+                    want_fg = want_bg = ""
+                elif param.startswith(("38;", "39")):
+                    want_fg = "" if param == "39" else convert(param)
+                elif param.startswith(("48;", "49")):
+                    want_bg = "" if param == "49" else convert(param)
+                else:
+                    out.append(f"\x1b[{param}m")  # Attributes catpic does not produce
+        elif final in _CURSOR_FINALS:
+            out.append(match.group(0))
+        elif chars:
+            out.append(_sync(want_fg, want_bg, have_fg, have_bg))
+            have_fg, have_bg = want_fg, want_bg
+            out.append(chars)
+        else:
+            # Erases and newlines (which may scroll) fill with the background
+            out.append(_sync("", "", have_fg, have_bg))
+            have_fg = have_bg = ""
+            out.append(newline or match.group(0))
+
+    out.append(_sync("", "", have_fg, have_bg))
+    return "".join(out)
+
+
+def _split_sgr(params: str) -> List[str]:
+    """Split combined SGR parameters into single attributes ("38;2;r;g;b" stays whole)."""
+    parts = params.split(";") if params else [""]
+    result = []
+    i = 0
+    while i < len(parts):
+        part = parts[i]
+        if part in ("38", "48") and i + 1 < len(parts):
+            length = 5 if parts[i + 1] == "2" else 3
+            result.append(";".join(parts[i:i + length]))
+            i += length
+        else:
+            result.append(part)
+            i += 1
+    return result
+
+
+def _sync(want_fg: str, want_bg: str, have_fg: str, have_bg: str) -> str:
+    """One SGR sequence taking the terminal from (have) to (want) colors."""
+    if (want_fg, want_bg) == (have_fg, have_bg):
+        return ""
+    params = []
+    if (have_fg and not want_fg) or (have_bg and not want_bg):
+        params.append("0")
+        have_fg = have_bg = ""
+    if want_fg != have_fg:
+        params.append(want_fg)
+    if want_bg != have_bg:
+        params.append(want_bg)
+    return f"\x1b[{';'.join(params)}m"
+
+
+class Throttle:
+    """
+    Token bucket keeping player output within a Budget.
+
+    The bucket holds one frame's (or one second's) worth of bytes and is
+    refilled per frame (bytes_per_frame) or with wall-clock time
+    (bytes_per_second). Each frame is sent at the best color depth that
+    fits in the bucket. A frame that does not fit at any depth is dropped,
+    unless the bucket is already full (waiting would not help) or the frame
+    must be shown; it is then sent at the cheapest depth and the overdraft
+    is paid back by dropping later frames.
+
+    Attributes:
+        sent: Frames sent per color depth
+        dropped: Frames dropped to stay within the budget
+        colors: Color depth of the last frame sent
+    """
+
+    def __init__(self, budget: Budget):
+        self.budget = budget
+        self.capacity = budget.frame_bytes()
+        self.tokens = float(self.capacity)
+        self.sent: Dict[str, int] = {colors: 0 for colors in COLOR_DEPTHS}
+        self.dropped = 0
+        self.colors: Optional[str] = None
+        self._last: Optional[float] = None
+
+    def fit(self, output: str, force: bool = False, now: Optional[float] = None) -> Optional[str]:
+        """
+        Compact one frame's output to fit the budget.
+
+        Args:
+            output: Terminal output for the frame (full or diff)
+            force: Send the frame even if it overdraws the budget
+            now: Current time (time.perf_counter()) for per-second budgets
+
+        Returns:
+            The text to write, or None to drop the frame
+        """
+        self._refill(now)
+        wire = ""
+        for colors in COLOR_DEPTHS:
+            wire = compact(output, colors)
+            size = len(wire.encode("utf-8"))
+            if size <= self.tokens:
+                break
+        else:
+            if not force and self.tokens < self.capacity:
+                self.dropped += 1
+                return None
+        self.tokens -= size
+        self.sent[colors] += 1
+        self.colors = colors
+        return wire
+
+    def _refill(self, now: Optional[float]) -> None:
+        if self.budget.bytes_per_frame is not None:
+            self.tokens = min(self.capacity, self.tokens + self.budget.bytes_per_frame)
+            return
+        if now is None:
+            import time
+
+            now = time.perf_counter()
+        if self._last is not None:
+            self.tokens = min(self.capacity, self.tokens + self.capacity * (now - self._last))
+        self._last = now
+
+
+def fit_image(
+    image: Union[str, "Path", "Image.Image"],
+    budget: Budget,
+    basis: Optional[Union["BASIS", Tuple[int, int]]] = None,
+    width: Optional[int] = None,
+    height: Optional[int] = None,
+    engine: Optional[str] = None
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Encode an image at the best settings whose output fits one frame of budget.
+
+    Starting from the requested width (default 80) and BASIS, settings are
+    lowered in the order compaction, color depth, BASIS, width. For an
+    animation, pass its first frame: later frames are usually drawn as
+    smaller diffs and the player's Throttle handles the rest. Every
+    candidate is encoded with ENGINE (see CatpicEncoder), so the result is
+    what that encoder would draw at the chosen settings.
+
+    Returns:
+        (MEOW text, choice) where choice has width, height, basis ("2,2"),
+        colors, bytes (compacted output size) and fits (False if even one
+        cell is over budget)
+    """
+    from PIL import Image
+
+    from .core import BASIS
+    from .encoder import CatpicEncoder
+
+    limit = budget.frame_bytes()
+    if not isinstance(image, Image.Image):
+        with Image.open(image) as img:
+            return fit_image(img.convert("RGB"), budget, basis, width, height, engine)
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+
+    start = CatpicEncoder(basis, engine=engine).basis
+    bases = [start]
+    if start in (BASIS.BASIS_2_3, BASIS.BASIS_2_4):
+        bases.append(BASIS.BASIS_2_2)  # 3-byte glyphs instead of 4
+
+    requested = width or 80
+    cells = requested
+    smallest: Optional[Tuple[int, str, Dict[str, Any]]] = None
+    while True:
+        rows = max(1, round(height * cells / requested)) if height else None
+        size = 0
+        for candidate in bases:
+            meow = CatpicEncoder(candidate, engine=engine).encode_image(image, cells, rows)
+            data = meow.split("DATA:\n", 1)[1]
+            for colors in COLOR_DEPTHS:
+                size = len(compact(data, colors).encode("utf-8"))
+                choice = {
+                    "width": cells,
+                    "height": int(meow.split("HEIGHT:", 1)[1].split("\n", 1)[0]),
+                    "basis": f"{candidate.value[0]},{candidate.value[1]}",
+                    "colors": colors,
+                    "bytes": size,
+                    "fits": size <= limit,
+                }
+                if size <= limit:
+                    return meow, choice
+                if smallest is None or size < smallest[0]:
+                    smallest = (size, meow, choice)
+        if cells == 1:
+            assert smallest is not None
+            return smallest[1], smallest[2]
+        # Bytes grow with the cell count, i.e. with the square of the width
+        cells = max(1, min(cells - 1, int(cells * math.sqrt(limit / size) * 0.95)))
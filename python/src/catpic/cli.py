@@ -1,13 +1,20 @@
 """Command-line interface for catpic."""
 
+import contextlib
+import sys
 from pathlib import Path
-from typing import Optional
+from typing import Any, ContextManager, Dict, List, Optional, TextIO, Tuple
 
 import click
 
+from . import trace
+from .budget import Budget, Throttle, compact
 from .core import BASIS, get_default_basis
-from .decoder import CatpicDecoder, CatpicPlayer
-from .encoder import CatpicEncoder
+from .decoder import CatpicDecoder, CatpicPlayer, PlaybackStats
+from .engines import check_engine
+
+# Inputs read as video frame streams rather than with PIL
+VIDEO_SUFFIXES = (".y4m", ".rgb", ".raw")
 
 
 def parse_basis(basis_str: str) -> BASIS:
@@ -27,19 +34,107 @@ def parse_basis(basis_str: str) -> BASIS:
     return basis_map[basis_str]
 
 
-@click.command()
+class DefaultCommandGroup(click.Group):
+    """Group that runs its default command when no subcommand is named.
+
+    Keeps ``catpic photo.jpg`` working alongside ``catpic batch ...``.
+    """
+
+    def __init__(self, *args, default_command: str, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.default_command = default_command
+
+    def parse_args(self, ctx: click.Context, args):
+        # The group's own flags (e.g. --profile) come before the command
+        flags = {opt for param in self.params if getattr(param, "is_flag", False) for opt in param.opts}
+        start = 0
+        while start < len(args) and args[start] in flags:
+            start += 1
+        rest = args[start:]
+        if not rest or (rest[0] not in self.commands and rest[0] not in ("--help", "--version")):
+            args.insert(start, self.default_command)
+        return super().parse_args(ctx, args)
+
+
+@click.group(cls=DefaultCommandGroup, default_command="show")
+@click.version_option(version="0.5.0")
+@click.option("--profile", is_flag=True, help="Report per-stage timings and counters when done")
+@click.pass_context
+def cli(ctx: click.Context, profile: bool) -> None:
+    """
+    catpic - Display images in terminal using Unicode mosaics.
+
+    Displays any image format directly in terminal, or saves to .meow format.
+    Without a command, arguments are passed to "show".
+
+    \b
+    Examples:
+      catpic photo.jpg                     # Display image
+      catpic animation.gif                 # Play animation
+      catpic photo.jpg -o photo.meow       # Save to file
+      catpic batch photos/ -o meow/ -j 4   # Convert a directory in parallel
+      catpic gallery photos/               # Thumbnail grid of a directory
+      producer | catpic play -             # Live MEOW-ANIM stream from stdin
+      catpic daemon &                      # Keep a warm renderer running
+      catpic serve --port 8080             # HTTP render service
+      catpic --profile photo.jpg           # Where the time goes
+
+    \b
+    Environment:
+      CATPIC_BASIS  - Default BASIS level (e.g., "2,4")
+      CATPIC_DAEMON - Set to 0 to never use a running daemon
+      CATPIC_ENGINE - Cell encoding engine (pil, fast, numpy, process, auto)
+      CATPIC_SOCKET - Daemon socket path
+      CATPIC_TRACE  - 1 to print stage timings, or a .json path for a
+                      Chrome trace (also where --profile writes)
+    """
+    target = trace.env_target()
+    if profile and target is None:
+        target = "-"
+    if target is not None:
+        tracer = trace.enable()
+        ctx.call_on_close(lambda: trace.report(tracer, target))
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    """
+    Console entry point.
+
+    Simple display requests go to a running ``catpic daemon`` when there is
+    one; otherwise (or if the daemon fails) everything runs in-process.
+    """
+    from .daemon import run_client
+
+    if args is None:
+        args = sys.argv[1:]
+    if run_client(args):
+        return
+    cli.main(args=args, prog_name="catpic")
+
+
+@cli.command()
 @click.argument(
-    "image_file", type=click.Path(exists=True, path_type=Path), required=True
+    "image_file", type=click.Path(exists=True, allow_dash=True, path_type=Path), required=True
 )
 @click.option("--basis", "-b", default=None, help="BASIS level (1,2 | 2,2 | 2,3 | 2,4). Defaults to CATPIC_BASIS env var or 2,2")
 @click.option("--width", "-w", type=int, help="Output width in characters")
 @click.option("--height", "-h", type=int, help="Output height in characters (for encoding)")
 @click.option("--delay", "-d", type=int, help="Animation delay in ms (override)")
-@click.option("--output", "-o", type=click.Path(path_type=Path), help="Save to .meow file instead of displaying")
-@click.option("--force", "-f", is_flag=True, help="Force full-size animation (disable auto-truncation)")
+@click.option("--output", "-o", type=click.Path(allow_dash=True, path_type=Path), help="Save to .meow file instead of displaying (- for stdout)")
+@click.option("--force", "-f", is_flag=True, help="Show .meow files and animations full size (disable fitting to the terminal)")
 @click.option("--info", "-i", is_flag=True, help="Show file information instead of displaying")
-@click.version_option(version="0.5.0")
-def main(
+@click.option("--jobs", "-j", type=int, default=None, help="Encode animation frames in N worker processes")
+@click.option("--max-fps", type=float, default=None, help="Merge animation frames to stay under this frame rate")
+@click.option("--raw-size", default=None, help="Frame size WxH of raw RGB24 video input")
+@click.option("--fps", type=float, default=None, help="Frame rate of raw video or image sequence input")
+@click.option("--max-memory", type=int, default=None, help="Decode large images in strips within this many MB")
+@click.option("--stats", "print_stats", is_flag=True, help="Print playback statistics (fps, write latency, bytes per frame) when done")
+@click.option("--stats-json", type=click.Path(dir_okay=False, path_type=Path), help="Write playback statistics as JSON to this file")
+@click.option("--budget", default=None, help="Output byte budget per frame (e.g. 4k) or per second (e.g. 20k/s)")
+@click.option("--engine", default=None, help="Cell encoding engine (pil | fast | numpy | process | auto). Defaults to CATPIC_ENGINE env var or pil")
+@click.option("--progressive", is_flag=True, help="Show a quick BASIS 1,2 preview of slow images, then redraw at full quality")
+@click.option("--deadline", type=int, default=None, help="With --progressive: ms to wait for the full render before previewing (default: 30)")
+def show(
     image_file: Path,
     basis: Optional[str],
     width: Optional[int],
@@ -48,23 +143,64 @@ def main(
     output: Optional[Path],
     force: bool,
     info: bool,
+    jobs: Optional[int],
+    max_fps: Optional[float],
+    raw_size: Optional[str],
+    fps: Optional[float],
+    max_memory: Optional[int],
+    print_stats: bool,
+    stats_json: Optional[Path],
+    budget: Optional[str],
+    engine: Optional[str],
+    progressive: bool,
+    deadline: Optional[int],
 ) -> None:
     """
-    catpic - Display images in terminal using Unicode mosaics.
-
-    Displays any image format directly in terminal, or saves to .meow format.
+    Display an image, animation or .meow file, or save it as .meow.
 
+    \b
     Examples:
       catpic photo.jpg                     # Display image
       catpic animation.gif                 # Play animation
       catpic photo.jpg -o photo.meow       # Save to file
       catpic animation.gif > anim.meow     # Save via redirect
+      catpic animation.gif --max-fps 15    # Merge frames above 15 fps
       catpic image.meow                    # Display saved file
       catpic image.meow --info             # Show file info
-      
+      catpic frames/ -o clip.meow --fps 12 # Encode a numbered image sequence
+      catpic scan.tif --max-memory 64      # Huge image in bounded memory
+      catpic animation.gif --stats         # Is playback keeping up?
+      catpic animation.gif --budget 32k/s  # Fit a slow SSH link
+      catpic huge.png --engine process     # Encode cells on all cores
+      catpic photo.jpg --progressive       # Preview at once, refine in place
+      ffmpeg -i clip.mp4 -f yuv4mpegpipe - | catpic - -o clip.meow
+
+    \b
     Environment:
-      CATPIC_BASIS - Default BASIS level (e.g., "2,4")
+      CATPIC_BASIS  - Default BASIS level (e.g., "2,4")
+      CATPIC_ENGINE - Default cell encoding engine (e.g., "numpy")
     """
+    try:
+        engine = check_engine(engine)
+    except ValueError as e:
+        click.echo(f"Error: {e}", err=True)
+        raise SystemExit(1)
+
+    byte_budget = None
+    if budget is not None:
+        try:
+            byte_budget = Budget.parse(budget)
+        except ValueError as e:
+            click.echo(f"Error: {e}", err=True)
+            raise SystemExit(1)
+
+    stats = None
+    if print_stats or stats_json or byte_budget:
+        stats = PlaybackStats()
+        click.get_current_context().call_on_close(
+            lambda: report_stats(stats, print_stats, stats_json)
+        )
+
     # Get BASIS (from flag, env var, or default)
     if basis is None:
         basis_enum = get_default_basis()
@@ -85,7 +221,15 @@ def main(
         if output:
             click.echo("Error: Cannot re-encode .meow files", err=True)
             raise SystemExit(1)
-        display_meow_file(image_file, delay, force)
+        display_meow_file(image_file, delay, force, stats, byte_budget)
+        return
+
+    # Video-like input: Y4M / raw RGB streams and image sequences
+    if str(image_file) == "-" or image_file.is_dir() or image_file.suffix.lower() in VIDEO_SUFFIXES:
+        encode_video(
+            image_file, basis_enum, width, height, output, force, jobs, max_fps, raw_size, fps, stats,
+            byte_budget, engine,
+        )
         return
 
     # Encode image/animation
@@ -99,33 +243,374 @@ def main(
         raise SystemExit(1)
 
     try:
-        encoder = CatpicEncoder(basis=basis_enum)
+        from .encoder import CatpicEncoder
+
+        encoder = CatpicEncoder(basis=basis_enum, engine=engine)
+        meow_content = None
+        wire_colors = None
+        if byte_budget is not None:
+            # Pick width and BASIS on the image (an animation's first frame)
+            from .budget import fit_image
+
+            with Image.open(image_file) as img:
+                meow_content, choice = fit_image(img.convert("RGB"), byte_budget, basis_enum, width, height, engine)
+            click.echo(describe_choice(byte_budget, choice), err=True)
+            encoder = CatpicEncoder(basis=parse_basis(choice["basis"]), engine=engine)
+            width, height = choice["width"], choice["height"]
+            wire_colors = choice["colors"]
+
+        if is_animated and not output:
+            # Encode while playing: frames go straight from the encoder to
+            # the player without serializing and re-parsing MEOW text
+            anim = encoder.animation_info(image_file, width, height, delay)
+            player = CatpicPlayer()
+            player.play_stream(
+                encoder.iter_timed_frames(
+                    image_file,
+                    anim["width"],
+                    anim["height"],
+                    delay=delay,
+                    workers=jobs,
+                    max_fps=max_fps,
+                ),
+                height=anim["height"],
+                delay=anim["delay"],
+                force=force,
+                stats=stats,
+                budget=byte_budget,
+            )
+            return
+
+        if progressive and not is_animated and not output and wire_colors is None and sys.stdout.isatty():
+            # Cursor-addressed redraws only make sense on a terminal
+            from .progressive import DEFAULT_DEADLINE, ProgressiveRender
+
+            ProgressiveRender(
+                encoder, image_file, width, height,
+                deadline=deadline / 1000 if deadline is not None else DEFAULT_DEADLINE,
+                max_memory=max_memory * 2**20 if max_memory is not None else None,
+            ).show()
+            return
 
         if is_animated:
-            meow_content = encoder.encode_animation(image_file, width, height, delay)
-        else:
-            meow_content = encoder.encode_image(image_file, width, height)
+            meow_content = encoder.encode_animation(
+                image_file, width, height, delay, workers=jobs, max_fps=max_fps
+            )
+        elif meow_content is None:
+            meow_content = encoder.encode_image(
+                image_file, width, height,
+                max_memory=max_memory * 2**20 if max_memory is not None else None
+            )
 
         # Save or display
         if output:
-            with open(output, "w", encoding="utf-8") as f:
+            with open_output(output) as f:
                 f.write(meow_content)
-            click.echo(f"Saved to {output}")
+            to_stdout = str(output) == "-"
+            click.echo(f"Saved to {output}", err=to_stdout)
+            if is_animated:
+                frames = encoder.frame_stats
+                click.echo(f"Frames: {frames['encoded']} (from {frames['source']} source frames)", err=to_stdout)
+                click.echo(f"Cells reused from previous frame: {encoder.reuse_ratio:.1%}", err=to_stdout)
+        elif wire_colors is not None:
+            # print(), not click.echo(), which strips escapes when piped
+            print(compact(meow_content.split("DATA:\n", 1)[1], wire_colors))
         else:
             # Display directly
-            if is_animated:
-                player = CatpicPlayer()
-                player.play(meow_content, delay=delay, force=force)
+            decoder = CatpicDecoder()
+            decoder.display(meow_content)
+
+    except Exception as e:
+        click.echo(f"Error: {e}", err=True)
+        raise SystemExit(1)
+
+
+@cli.command()
+@click.argument("source", default="-", type=click.Path(exists=True, dir_okay=False, allow_dash=True, path_type=Path))
+@click.option("--force", "-f", is_flag=True, help="Play full size (disable fitting to the terminal)")
+@click.option("--stats", "print_stats", is_flag=True, help="Print playback statistics when done")
+@click.option("--stats-json", type=click.Path(dir_okay=False, path_type=Path), help="Write playback statistics as JSON to this file")
+@click.option("--budget", default=None, help="Output byte budget per frame (e.g. 4k) or per second (e.g. 20k/s)")
+def play(
+    source: Path,
+    force: bool,
+    print_stats: bool,
+    stats_json: Optional[Path],
+    budget: Optional[str],
+) -> None:
+    """
+    Play MEOW-ANIM from stdin as it arrives, or a .meow file.
+
+    From stdin ("-", the default) the stream may be open-ended (no FRAMES
+    header). Frames are drawn as they complete; when the producer is faster
+    than the terminal, stale frames are skipped for the newest one.
+
+    \b
+    Examples:
+      catpic clip.y4m -o - | catpic play -
+      ssh cam 'capture | catpic - -o -' | catpic play - --stats
+    """
+    try:
+        byte_budget = Budget.parse(budget) if budget is not None else None
+    except ValueError as e:
+        click.echo(f"Error: {e}", err=True)
+        raise SystemExit(1)
+
+    stats = PlaybackStats()
+    if print_stats or stats_json or byte_budget:
+        click.get_current_context().call_on_close(
+            lambda: report_stats(stats, print_stats, stats_json)
+        )
+
+    if str(source) != "-":
+        display_meow_file(source, None, force, stats, byte_budget)
+        return
+
+    import io
+
+    # MEOW is UTF-8 whatever the locale; newline="\n" keeps lines intact
+    stream = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", newline="\n")
+    try:
+        CatpicPlayer().play_live(stream, force=force, stats=stats, budget=byte_budget)
+    except ValueError as e:
+        click.echo(f"Error: {e}", err=True)
+        raise SystemExit(1)
+
+
+@cli.command()
+@click.argument("sources", nargs=-1, required=True)
+@click.option("--output-dir", "-o", type=click.Path(file_okay=False, path_type=Path), help="Directory for .meow files (default: next to each image)")
+@click.option("--basis", "-b", default=None, help="BASIS level (1,2 | 2,2 | 2,3 | 2,4). Defaults to CATPIC_BASIS env var or 2,2")
+@click.option("--width", "-w", type=int, help="Output width in characters")
+@click.option("--height", "-h", type=int, help="Output height in characters")
+@click.option("--jobs", "-j", type=int, default=None, help="Worker processes (default: CPU count)")
+@click.option("--force", "-f", is_flag=True, help="Re-render files that are already up to date")
+def batch(
+    sources: Tuple[str, ...],
+    output_dir: Optional[Path],
+    basis: Optional[str],
+    width: Optional[int],
+    height: Optional[int],
+    jobs: Optional[int],
+    force: bool,
+) -> None:
+    """
+    Convert many images to .meow files in parallel.
+
+    SOURCES are directories, image files or glob patterns. Images whose
+    .meow output is up to date are skipped.
+
+    \b
+    Examples:
+      catpic batch photos/                 # photos/*.meow next to the images
+      catpic batch 'shots/**/*.png' -o out -j 8 -b 2,4
+    """
+    from .batch import render_many
+
+    try:
+        basis_enum = get_default_basis() if basis is None else parse_basis(basis)
+        stats = render_many(
+            sources, output_dir, basis_enum, width, height, jobs=jobs, force=force
+        )
+    except (click.BadParameter, ValueError) as e:
+        click.echo(f"Error: {e}", err=True)
+        raise SystemExit(1)
+
+    for source, error in stats["errors"].items():
+        click.echo(f"Failed {source}: {error}", err=True)
+
+    click.echo(
+        f"Rendered {stats['rendered']}, skipped {stats['skipped']}, "
+        f"failed {stats['failed']} in {stats['seconds']:.2f}s"
+    )
+    if stats["rendered"]:
+        click.echo(
+            f"Throughput: {stats['images_per_second']:.1f} images/s, "
+            f"{stats['cells_per_second'] / 1000:.1f}k cells/s, "
+            f"{stats['megabytes_per_second']:.1f} MB/s read"
+        )
+    if stats["failed"]:
+        raise SystemExit(1)
+
+
+@cli.command()
+@click.argument("sources", nargs=-1, required=True)
+@click.option("--basis", "-b", default=None, help="BASIS level (1,2 | 2,2 | 2,3 | 2,4). Defaults to CATPIC_BASIS env var or 2,2")
+@click.option("--columns", "-c", type=int, help="Number of columns (default: fit terminal)")
+@click.option("--width", "-w", type=int, help="Thumbnail width in characters")
+@click.option("--jobs", "-j", type=int, default=None, help="Worker processes (default: CPU count)")
+@click.option("--no-captions", is_flag=True, help="Do not print file names")
+def gallery(
+    sources: Tuple[str, ...],
+    basis: Optional[str],
+    columns: Optional[int],
+    width: Optional[int],
+    jobs: Optional[int],
+    no_captions: bool,
+) -> None:
+    """
+    Show images as a grid of thumbnails sized to the terminal.
+
+    SOURCES are directories, image files or glob patterns.
+
+    \b
+    Examples:
+      catpic gallery photos/
+      catpic gallery 'shots/*.png' -c 6 -b 2,4
+    """
+    from .gallery import render_gallery
+
+    try:
+        basis_enum = get_default_basis() if basis is None else parse_basis(basis)
+        render_gallery(
+            sources, basis=basis_enum, columns=columns, tile_width=width,
+            jobs=jobs, captions=not no_captions
+        )
+    except (click.BadParameter, ValueError) as e:
+        click.echo(f"Error: {e}", err=True)
+        raise SystemExit(1)
+
+
+@cli.command()
+@click.option("--socket", "socket_path", default=None, help="Socket path (default: CATPIC_SOCKET or per-user runtime dir)")
+@click.option("--jobs", "-j", type=int, default=None, help="Worker processes (default: CPU count)")
+@click.option("--stop", is_flag=True, help="Stop a running daemon")
+@click.option("--status", is_flag=True, help="Show whether a daemon is running")
+def daemon(socket_path: Optional[str], jobs: Optional[int], stop: bool, status: bool) -> None:
+    """
+    Run a warm rendering server on a Unix socket.
+
+    While it runs, "catpic IMAGE" renders through it and skips the cost of
+    importing and starting the encoder on every call.
+    """
+    from .daemon import CatpicDaemon, request
+
+    if stop or status:
+        response = request({"op": "shutdown" if stop else "ping"}, socket_path, timeout=5.0)
+        if response is None:
+            click.echo("No catpic daemon running", err=True)
+            raise SystemExit(1)
+        if status:
+            stats = response[0]
+            click.echo(
+                f"catpic daemon pid {stats['pid']}: {stats['requests']} requests, "
+                f"{stats['renders']} renders, {stats['cache_hits']} cache hits"
+            )
+        return
+
+    server = CatpicDaemon(socket_path, jobs=jobs)
+    try:
+        server.start()
+    except (OSError, RuntimeError) as e:
+        click.echo(f"Error: {e}", err=True)
+        raise SystemExit(1)
+    click.echo(f"catpic daemon listening on {server.socket_path}", err=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+@cli.command()
+@click.option("--host", default="127.0.0.1", help="Interface to bind (default: localhost)")
+@click.option("--port", "-p", type=int, default=8080, help="TCP port (default: 8080)")
+@click.option("--jobs", "-j", type=int, default=None, help="Worker processes (default: CPU count)")
+@click.option("--max-queue", type=int, default=None, help="Renders in progress before answering 503 (default: 4 per worker)")
+def serve(host: str, port: int, jobs: Optional[int], max_queue: Optional[int]) -> None:
+    """
+    Run an HTTP render service.
+
+    POST an image to /render?basis=2,2&width=60 to get MEOW back; GET
+    /stats for latency and throughput counters.
+
+    \b
+    Example:
+      curl --data-binary @photo.jpg 'localhost:8080/render?width=60'
+    """
+    from .server import serve as run_server
+
+    click.echo(f"catpic serving on http://{host}:{port}/", err=True)
+    try:
+        run_server(host, port, jobs=jobs, max_queue=max_queue)
+    except OSError as e:
+        click.echo(f"Error: {e}", err=True)
+        raise SystemExit(1)
+
+
+def open_output(output: Path) -> ContextManager[TextIO]:
+    """Open a .meow output for writing; "-" is stdout, which is left open."""
+    if str(output) == "-":
+        return contextlib.nullcontext(sys.stdout)
+    return open(output, "w", encoding="utf-8")
+
+
+def encode_video(
+    source_path: Path,
+    basis: BASIS,
+    width: Optional[int],
+    height: Optional[int],
+    output: Optional[Path],
+    force: bool,
+    jobs: Optional[int],
+    max_fps: Optional[float],
+    raw_size: Optional[str],
+    fps: Optional[float],
+    stats: Optional[PlaybackStats] = None,
+    budget: Optional[Budget] = None,
+    engine: Optional[str] = None,
+) -> None:
+    """Encode or play a Y4M / raw RGB stream or an image sequence frame by frame."""
+    from .encoder import CatpicEncoder
+    from .sources import open_source
+
+    try:
+        size = None
+        if raw_size:
+            w, _, h = raw_size.lower().partition("x")
+            size = (int(w), int(h))
+
+        source = open_source(source_path, raw_size=size, fps=fps)
+        encoder = CatpicEncoder(basis=basis, engine=engine)
+        try:
+            if output:
+                with open_output(output) as f:
+                    count = encoder.encode_stream(
+                        source, f, width, height, workers=jobs, max_fps=max_fps
+                    )
+                to_stdout = str(output) == "-"
+                click.echo(f"Saved to {output}", err=to_stdout)
+                click.echo(f"Frames: {count} (from {encoder.frame_stats['source']} source frames)", err=to_stdout)
             else:
-                decoder = CatpicDecoder()
-                decoder.display(meow_content)
+                # Played once: retaining every frame of a long clip for
+                # later loops would defeat the bounded-memory streaming
+                frames = encoder.iter_source_frames(
+                    source, width, height, workers=jobs, max_fps=max_fps
+                )
+                player = CatpicPlayer()
+                player.play_stream(
+                    frames,
+                    height=encoder._stream_dimensions(source, width, height)[1],
+                    delay=source.delay,
+                    loop=False,
+                    force=force,
+                    stats=stats,
+                    budget=budget,
+                )
+        finally:
+            source.close()
 
     except Exception as e:
         click.echo(f"Error: {e}", err=True)
         raise SystemExit(1)
 
 
-def display_meow_file(meow_file: Path, delay: Optional[int], force: bool) -> None:
+def display_meow_file(
+    meow_file: Path,
+    delay: Optional[int],
+    force: bool,
+    stats: Optional[PlaybackStats] = None,
+    budget: Optional[Budget] = None,
+) -> None:
     """Display or play a .meow file."""
     try:
         with open(meow_file, "r", encoding="utf-8") as f:
@@ -134,16 +619,61 @@ def display_meow_file(meow_file: Path, delay: Optional[int], force: bool) -> Non
         first_line = content.split("\n")[0].strip()
         if first_line.startswith("MEOW-ANIM/"):
             player = CatpicPlayer()
-            player.play(content, delay=delay, force=force)
+            player.play(content, delay=delay, force=force, stats=stats, budget=budget)
+        elif budget is not None:
+            # BASIS is fixed by the file; only fit the width, compact and pick colors
+            decoder = CatpicDecoder()
+            parsed = decoder.parse_meow(content)
+            lines = decoder.fit_lines(parsed, parsed["data_lines"], None if force else terminal_columns())
+            throttle = Throttle(budget)
+            wire = throttle.fit("\n".join(lines), force=True)
+            print(wire)
+            click.echo(f"Budget {budget}: {throttle.colors} colors, {len(wire.encode('utf-8'))} bytes", err=True)
         else:
+            # Wider than the terminal: downscale in cell space instead of wrapping
             decoder = CatpicDecoder()
-            decoder.display(content)
+            decoder.display(content, max_width=None if force else terminal_columns())
 
     except Exception as e:
         click.echo(f"Error: {e}", err=True)
         raise SystemExit(1)
 
 
+def terminal_columns() -> int:
+    """Width of the terminal in cells."""
+    import shutil
+
+    return shutil.get_terminal_size(fallback=(80, 24)).columns
+
+
+def describe_choice(budget: Budget, choice: Dict[str, Any]) -> str:
+    """One line describing the settings fit_image() picked."""
+    line = (
+        f"Budget {budget}: width {choice['width']}, BASIS {choice['basis']}, "
+        f"{choice['colors']} colors, {choice['bytes']} bytes per full frame"
+    )
+    if not choice["fits"]:
+        line += " (over budget at the smallest size)"
+    return line
+
+
+def report_stats(stats: PlaybackStats, print_summary: bool, json_path: Optional[Path]) -> None:
+    """Print and/or save playback statistics once playback has ended."""
+    if stats.started is None:
+        if print_summary or json_path:
+            click.echo("No animation was played; no playback statistics", err=True)
+        return
+    if print_summary:
+        click.echo(stats.summary(), err=True)
+    elif stats.throttle is not None:
+        # Budgeted playback always reports what it achieved
+        for line in stats.summary().splitlines()[-2:]:
+            click.echo(line, err=True)
+    if json_path:
+        stats.write_json(json_path)
+        click.echo(f"Playback statistics written to {json_path}", err=True)
+
+
 def show_info(file_path: Path) -> None:
     """Display file information."""
     try:
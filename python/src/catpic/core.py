@@ -14,18 +14,24 @@ class BASIS(Enum):
     BASIS_2_4 = (2, 4)  # 256 patterns - Ultra quality
 
 
-def get_default_basis() -> BASIS:
+def get_default_basis(value: Optional[str] = None) -> BASIS:
     """
     Get default BASIS from environment variable or fallback.
     
     Reads CATPIC_BASIS environment variable (format: "2,2" or "2x2" or "2_2")
     Falls back to BASIS_2_2 if not set or invalid.
     
+    Args:
+        value: Parse this string instead of reading the environment
+               (used by the daemon on behalf of a client)
+    
     Examples:
         export CATPIC_BASIS=2,4  # Use ultra quality
         export CATPIC_BASIS=1,2  # Use universal compatibility
     """
-    env_basis = os.environ.get('CATPIC_BASIS', '').strip()
+    if value is None:
+        value = os.environ.get('CATPIC_BASIS', '')
+    env_basis = value.strip()
     
     if not env_basis:
         return BASIS.BASIS_2_2  # Default
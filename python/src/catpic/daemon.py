@@ -0,0 +1,377 @@
+"""
+Warm rendering daemon and thin client over a Unix domain socket.
+
+Every ``catpic`` invocation pays interpreter startup and Pillow imports
+before it can encode anything. ``catpic daemon`` keeps a process pool with
+encoders already loaded, plus a cache of recent results, and serves render
+requests over a Unix socket. ``catpic photo.jpg`` first tries the daemon
+and falls back to rendering in-process when none is running.
+
+Protocol: the client sends one JSON request line and reads one JSON
+response line followed by the MEOW text until the server closes the
+connection.
+
+    {"op": "render", "path": "/abs/photo.jpg", "basis": "2,2",
+     "engine": "pil", "width": 40, "height": null}
+    {"ok": true, "format": "MEOW/1.0", "cached": false}
+    MEOW/1.0...
+
+Other ops are "ping" (returns counters) and "shutdown".
+
+Animations are not rendered by the daemon: it answers ``"local": true``
+and the client plays them in-process, encoding frames while playing
+instead of waiting for a whole MEOW-ANIM and re-parsing it.
+
+At load time this module only imports what the client needs; the server
+side (socketserver, the process pool) is imported by CatpicDaemon.
+"""
+
+import json
+import os
+import socket
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from .engines import DEFAULT_ENGINE
+from .trace import env_target
+
+if TYPE_CHECKING:
+    import socketserver
+    from concurrent.futures import ProcessPoolExecutor
+
+PROTOCOL_VERSION = 1
+
+# Default upper bound on cached MEOW text held by the daemon
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+
+# Seconds the client waits for a render before giving up on the daemon
+CLIENT_TIMEOUT = 30.0
+
+# BASIS strings the client forwards; anything else is rendered in-process
+_BASIS_VALUES = ("1,2", "2,2", "2,3", "2,4")
+
+# Inputs the daemon does not handle (streams, sequences, saved files)
+_LOCAL_SUFFIXES = (".meow", ".y4m", ".rgb", ".raw")
+
+
+def default_socket_path() -> str:
+    """Socket path from CATPIC_SOCKET, else a per-user runtime location."""
+    path = os.environ.get("CATPIC_SOCKET")
+    if path:
+        return path
+    runtime = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(runtime, f"catpic-{os.getuid()}.sock")
+
+
+# ---------------------------------------------------------------------------
+# Client
+# ---------------------------------------------------------------------------
+
+
+def request(
+    message: Dict[str, Any],
+    socket_path: Optional[str] = None,
+    timeout: float = CLIENT_TIMEOUT
+) -> Optional[Tuple[Dict[str, Any], str]]:
+    """
+    Send one request to the daemon.
+
+    Returns:
+        (response header, body text), or None if no daemon is reachable
+    """
+    path = socket_path or default_socket_path()
+    if not os.path.exists(path):
+        return None
+
+    message = dict(message, version=PROTOCOL_VERSION)
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(path)
+            sock.sendall(json.dumps(message).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as reader:
+                header = json.loads(reader.readline())
+                body = reader.read().decode("utf-8")
+    except (OSError, ValueError):
+        return None
+    return header, body
+
+
+def parse_client_args(args: List[str]) -> Optional[Dict[str, Any]]:
+    """
+    Turn simple display invocations into a render request.
+
+    Only ``catpic [show] IMAGE [-b B] [-w W] [-h H] [-d D] [-f]`` is
+    forwarded; everything else (saving, info, streams, subcommands) returns
+    None and runs in-process.
+    """
+    if args and args[0] == "show":
+        args = args[1:]
+
+    values: Dict[str, Any] = {"basis": None, "width": None, "height": None, "delay": None}
+    names = {
+        "-b": "basis", "--basis": "basis",
+        "-w": "width", "--width": "width",
+        "-h": "height", "--height": "height",
+        "-d": "delay", "--delay": "delay",
+    }
+    force = False
+    paths = []
+    tokens = iter(args)
+    for token in tokens:
+        if token in ("-f", "--force"):
+            force = True
+        elif token.split("=", 1)[0] in names:
+            name, sep, value = token.partition("=")
+            if not sep:
+                value = next(tokens, None)
+                if value is None:
+                    return None
+            values[names[name]] = value
+        elif token.startswith("-"):
+            return None
+        else:
+            paths.append(token)
+
+    if len(paths) != 1:
+        return None
+    path = Path(paths[0])
+    if path.suffix.lower() in _LOCAL_SUFFIXES or not path.is_file():
+        return None
+    if values["basis"] is not None and values["basis"] not in _BASIS_VALUES:
+        return None
+    try:
+        for key in ("width", "height", "delay"):
+            if values[key] is not None:
+                values[key] = int(values[key])
+    except ValueError:
+        return None
+
+    return {
+        "op": "render",
+        "path": str(path.resolve()),
+        "basis": values["basis"] or os.environ.get("CATPIC_BASIS", ""),
+        "engine": os.environ.get("CATPIC_ENGINE", ""),
+        "width": values["width"],
+        "height": values["height"],
+        "delay": values["delay"],
+        "force": force,
+    }
+
+
+def run_client(args: List[str], socket_path: Optional[str] = None) -> bool:
+    """
+    Display an image via a running daemon.
+
+    Returns:
+        True if the daemon handled the request, False to render in-process
+        (no daemon, unsupported arguments, an animation, or a daemon-side
+        error)
+    """
+    # Tracing (CATPIC_TRACE) measures the in-process pipeline
+    if os.environ.get("CATPIC_DAEMON", "1") == "0" or env_target() is not None:
+        return False
+    message = parse_client_args(args)
+    if message is None:
+        return False
+
+    response = request(message, socket_path)
+    if response is None or not response[0].get("ok"):
+        return False
+    from .decoder import CatpicDecoder
+
+    CatpicDecoder().display(response[1])
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+
+# Encoders kept alive in each pool worker, one per (BASIS, engine)
+_ENCODERS: Dict[Any, Any] = {}
+
+
+def _warm_worker() -> None:
+    """Pool initializer: import the encoder stack before the first request."""
+    from . import encoder  # noqa: F401
+
+
+def _render(
+    path: str,
+    basis_value: str,
+    width: Optional[int],
+    height: Optional[int],
+    engine: str = DEFAULT_ENGINE
+) -> str:
+    """Encode one image in a pool worker; animations return "" (played locally)."""
+    from PIL import Image
+
+    from .core import get_default_basis
+    from .encoder import CatpicEncoder
+
+    basis = get_default_basis(basis_value)
+    encoder = _ENCODERS.get((basis, engine))
+    if encoder is None:
+        encoder = _ENCODERS[basis, engine] = CatpicEncoder(basis=basis, engine=engine)
+
+    with Image.open(path) as img:
+        if getattr(img, "is_animated", False):
+            return ""
+        return encoder.encode_image(img, width, height)
+
+
+class CatpicDaemon:
+    """
+    Render server keeping a warm process pool and a result cache.
+
+    Results are cached by (path, mtime, size, BASIS, engine, width, height)
+    and the cache is trimmed least-recently-used first to ``cache_bytes``.
+    Requests without an engine use DEFAULT_ENGINE, not the daemon's own
+    CATPIC_ENGINE: the client sends its environment's choice.
+
+    Example:
+        >>> daemon = CatpicDaemon(jobs=2)
+        >>> daemon.serve_forever()  # until a "shutdown" request
+    """
+
+    def __init__(
+        self,
+        socket_path: Optional[str] = None,
+        jobs: Optional[int] = None,
+        cache_bytes: int = DEFAULT_CACHE_BYTES
+    ):
+        self.socket_path = socket_path or default_socket_path()
+        self.jobs = jobs or os.cpu_count() or 1
+        self.cache_bytes = cache_bytes
+        self.stats = {"requests": 0, "renders": 0, "cache_hits": 0, "errors": 0}
+
+        self._cache: "OrderedDict[Tuple[Any, ...], str]" = OrderedDict()
+        self._cached_bytes = 0
+        self._lock = threading.Lock()
+        self._pool: Optional["ProcessPoolExecutor"] = None
+        self._server: Optional["socketserver.UnixStreamServer"] = None
+
+    def start(self) -> None:
+        """Bind the socket and start the worker pool."""
+        import socketserver
+        from concurrent.futures import ProcessPoolExecutor
+
+        if request({"op": "ping"}, self.socket_path, timeout=1.0) is not None:
+            raise RuntimeError(f"A catpic daemon is already running on {self.socket_path}")
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)  # Stale socket from a crashed daemon
+
+        self._pool = ProcessPoolExecutor(max_workers=self.jobs, initializer=_warm_worker)
+        # Start the workers now rather than on the first request
+        for future in [self._pool.submit(_warm_worker) for _ in range(self.jobs)]:
+            future.result()
+
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self) -> None:
+                daemon._handle_connection(self.rfile, self.wfile)
+
+        old_umask = os.umask(0o077)  # Socket usable by this user only
+        try:
+            self._server = socketserver.ThreadingUnixStreamServer(self.socket_path, Handler)
+        finally:
+            os.umask(old_umask)
+        self._server.daemon_threads = True
+
+    def serve_forever(self) -> None:
+        """Serve requests until shutdown() or a "shutdown" request."""
+        if self._server is None:
+            self.start()
+        assert self._server is not None
+        try:
+            self._server.serve_forever()
+        finally:
+            self.close()
+
+    def shutdown(self) -> None:
+        """Stop serve_forever() from another thread."""
+        if self._server is not None:
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+
+    def close(self) -> None:
+        """Release the socket and worker pool."""
+        if self._server is not None:
+            self._server.server_close()
+            self._server = None
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+
+    def _handle_connection(self, rfile, wfile) -> None:
+        try:
+            message = json.loads(rfile.readline())
+            header, body = self.handle(message)
+        except ValueError as e:
+            header, body = {"ok": False, "error": f"Bad request: {e}"}, ""
+        wfile.write(json.dumps(header).encode("utf-8") + b"\n")
+        wfile.write(body.encode("utf-8"))
+
+    def handle(self, message: Dict[str, Any]) -> Tuple[Dict[str, Any], str]:
+        """Answer one request; returns (response header, body text)."""
+        with self._lock:
+            self.stats["requests"] += 1
+
+        op = message.get("op")
+        if message.get("version") != PROTOCOL_VERSION:
+            return {"ok": False, "error": "Protocol version mismatch"}, ""
+        if op == "ping":
+            with self._lock:
+                return dict(self.stats, ok=True, pid=os.getpid(), cached=len(self._cache)), ""
+        if op == "shutdown":
+            self.shutdown()
+            return {"ok": True}, ""
+        if op != "render":
+            return {"ok": False, "error": f"Unknown op: {op}"}, ""
+
+        try:
+            content, cached = self._render_cached(message)
+        except Exception as e:
+            with self._lock:
+                self.stats["errors"] += 1
+            return {"ok": False, "error": f"{type(e).__name__}: {e}"}, ""
+
+        if not content:
+            return {"ok": False, "local": True, "error": "Animations play in-process"}, ""
+        fmt = content.split("\n", 1)[0].strip()
+        return {"ok": True, "format": fmt, "cached": cached}, content
+
+    def _render_cached(self, message: Dict[str, Any]) -> Tuple[str, bool]:
+        path = message["path"]
+        stat = os.stat(path)
+        key = (
+            path, stat.st_mtime_ns, stat.st_size,
+            message.get("basis") or "", message.get("engine") or DEFAULT_ENGINE,
+            message.get("width"), message.get("height"),
+        )
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.stats["cache_hits"] += 1
+                return self._cache[key], True
+
+        assert self._pool is not None
+        content = self._pool.submit(
+            _render, path, key[3], message.get("width"), message.get("height"), key[4]
+        ).result()
+
+        with self._lock:
+            self.stats["renders"] += 1
+            if key not in self._cache and len(content) <= self.cache_bytes:
+                self._cache[key] = content
+                self._cached_bytes += len(content)
+                while self._cached_bytes > self.cache_bytes:
+                    _, dropped = self._cache.popitem(last=False)
+                    self._cached_bytes -= len(dropped)
+        return content, False
@@ -1,9 +1,15 @@
 """catpic decoding and display functionality."""
 
+import queue
 import sys
+import threading
 import time
 from pathlib import Path
-from typing import Dict, List, Optional, Union
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+
+from . import trace
+from .budget import Budget, Throttle
+from .framediff import diff_frame, full_frame, split_cells
 
 
 class CatpicDecoder:
@@ -15,6 +21,10 @@ class CatpicDecoder:
     
     def parse_meow(self, content: str) -> Dict[str, Union[str, int, List[str]]]:
         """Parse MEOW content and extract metadata and data."""
+        with trace.stage("decode.parse"):
+            return self._parse(content)
+    
+    def _parse(self, content: str) -> Dict[str, Union[str, int, List[str]]]:
         lines = content.strip().split('\n')
         
         if not lines or not lines[0].startswith(('MEOW/', 'MEOW-ANIM/')):
@@ -25,6 +35,7 @@ class CatpicDecoder:
         data_lines = []
         in_data_section = False
         current_frame_lines = []
+        current_frame_delay = None
         frames = []
         current_frame = None
         
@@ -45,12 +56,15 @@ class CatpicDecoder:
                 # Handle frame data for animations
                 if line.startswith("FRAME:"):
                     if current_frame is not None:
-                        frames.append({
-                            'frame': current_frame,
-                            'lines': current_frame_lines
-                        })
+                        frames.append(self._frame_entry(
+                            current_frame, current_frame_lines, current_frame_delay
+                        ))
                     current_frame = int(line.split(':', 1)[1])
                     current_frame_lines = []
+                    current_frame_delay = None
+                elif line.startswith("DELAY:") and current_frame is not None and not current_frame_lines:
+                    # Per-frame delay override, directly after the FRAME marker
+                    current_frame_delay = int(line.split(':', 1)[1])
                 else:
                     if format_type.startswith('MEOW-ANIM/'):
                         current_frame_lines.append(line)
@@ -59,10 +73,9 @@ class CatpicDecoder:
         
         # Handle last frame for animations
         if current_frame is not None:
-            frames.append({
-                'frame': current_frame,
-                'lines': current_frame_lines
-            })
+            frames.append(self._frame_entry(
+                current_frame, current_frame_lines, current_frame_delay
+            ))
         
         if format_type.startswith('MEOW-ANIM/'):
             metadata['frames'] = frames
@@ -71,8 +84,24 @@ class CatpicDecoder:
         
         return metadata
     
-    def display(self, content: str, file=None) -> None:
-        """Display MEOW content to terminal."""
+    @staticmethod
+    def _frame_entry(frame: int, lines: List[str], delay: Optional[int]) -> Dict[str, object]:
+        """Build a parsed frame; 'delay' is present only for per-frame overrides."""
+        entry: Dict[str, object] = {'frame': frame, 'lines': lines}
+        if delay is not None:
+            entry['delay'] = delay
+        return entry
+    
+    def display(self, content: str, file=None, max_width: Optional[int] = None) -> None:
+        """
+        Display MEOW content to terminal.
+        
+        Args:
+            content: MEOW or MEOW-ANIM text (animations show their first frame)
+            file: Output stream (default: sys.stdout)
+            max_width: Downscale images wider than this many cells in cell
+                       space (see catpic.rescale)
+        """
         if file is None:
             file = sys.stdout
         
@@ -85,18 +114,39 @@ class CatpicDecoder:
         if parsed['format'].startswith('MEOW-ANIM/'):
             # Animation - display first frame only
             if 'frames' in parsed and parsed['frames']:
-                for line in parsed['frames'][0]['lines']:
-                    print(line, file=file)
+                self._write_lines(self.fit_lines(parsed, parsed['frames'][0]['lines'], max_width), file)
             else:
                 print("Error: No frames found in animation", file=sys.stderr)
         else:
             # Static image
             if 'data_lines' in parsed:
-                for line in parsed['data_lines']:
-                    print(line, file=file)
+                self._write_lines(self.fit_lines(parsed, parsed['data_lines'], max_width), file)
             else:
                 print("Error: No image data found", file=sys.stderr)
     
+    @staticmethod
+    def fit_lines(parsed: Dict[str, Any], lines: List[str], max_width: Optional[int]) -> List[str]:
+        """
+        Data lines downscaled in cell space to MAX_WIDTH cells if wider.
+        
+        PARSED is the result of parse_meow(), for its WIDTH and BASIS; LINES
+        are its data lines or one frame's. None leaves LINES unchanged.
+        """
+        if max_width is None or 0 < parsed.get('width', 0) <= max_width:
+            return lines
+        from .core import get_default_basis
+        from .rescale import fit_width
+        
+        with trace.stage("decode.rescale"):
+            return fit_width(lines, get_default_basis(parsed.get('basis', '')), max_width)
+    
+    @staticmethod
+    def _write_lines(lines: List[str], file) -> None:
+        with trace.stage("decode.write"):
+            for line in lines:
+                print(line, file=file)
+        trace.count("bytes_emitted", sum(len(line) + 1 for line in lines))
+    
     def display_file(self, meow_path: Union[str, Path], file=None) -> None:
         """Display MEOW file contents."""
         try:
@@ -109,12 +159,229 @@ class CatpicDecoder:
             print(f"Error: Cannot decode file '{meow_path}' as UTF-8", file=sys.stderr)
 
 
+class MeowStreamReader:
+    """
+    Incremental reader for MEOW-ANIM text arriving over a pipe.
+    
+    The header is read when the reader is created; iterating then yields
+    each frame as soon as it is complete, i.e. once it has HEIGHT data lines
+    or the next FRAME marker (or the end of the stream) arrives. FRAMES is
+    not needed, so open-ended live streams work.
+    
+    Example:
+        >>> reader = MeowStreamReader(sys.stdin)
+        >>> for lines, delay in reader:
+        ...     print("\\n".join(lines))
+    """
+    
+    def __init__(self, stream: TextIO):
+        """
+        Args:
+            stream: Text stream positioned at the start of MEOW-ANIM content
+        
+        Raises:
+            ValueError: If the header is missing or not MEOW-ANIM
+        """
+        self.stream = stream
+        header = []
+        for line in stream:
+            line = line.rstrip("\r\n")
+            if line == "DATA:":
+                break
+            header.append(line)
+        self.header = CatpicDecoder().parse_meow("\n".join(header))
+        if not self.header["format"].startswith("MEOW-ANIM/"):
+            raise ValueError("Not a MEOW-ANIM stream")
+        self.height: Optional[int] = self.header.get("height")  # type: ignore[assignment]
+        self.delay: int = self.header.get("delay", 100)  # type: ignore[assignment]
+    
+    def __iter__(self) -> Iterator[Tuple[List[str], int]]:
+        """Yield (lines, delay_ms) per frame."""
+        lines: Optional[List[str]] = None  # The frame being read, after its FRAME marker
+        delay = self.delay
+        for line in self.stream:
+            line = line.rstrip("\r\n")
+            if line.startswith("FRAME:"):
+                if lines:
+                    yield lines, delay
+                lines, delay = [], self.delay
+            elif lines is None:
+                continue
+            elif line.startswith("DELAY:") and not lines:
+                delay = int(line.split(":", 1)[1])
+            else:
+                lines.append(line)
+                if self.height is not None and len(lines) == self.height:
+                    yield lines, delay
+                    lines = None  # Complete: anything before the next FRAME is ignored
+        if lines:
+            yield lines, delay
+
+
+class PlaybackStats:
+    """
+    Statistics for one playback session of CatpicPlayer.
+    
+    The player records every frame it writes: how long the write (print
+    and flush) took, how many bytes went to the terminal, and whether the
+    frame was late, i.e. finished after its display slot (its DELAY) had
+    already ended. Frames skipped to keep time are counted as dropped.
+    
+    Example:
+        >>> stats = PlaybackStats(on_frame=lambda s: print(s.frames, file=sys.stderr))
+        >>> CatpicPlayer().play(content, max_loops=1, stats=stats)
+        >>> print(stats.summary())
+    """
+    
+    # Write latencies kept for percentiles; totals keep counting past this
+    MAX_SAMPLES = 100_000
+    
+    def __init__(self, on_frame: Optional[Callable[["PlaybackStats"], None]] = None):
+        """
+        Args:
+            on_frame: Called with these stats after each frame is written
+        """
+        self.on_frame = on_frame
+        self.frames = 0
+        self.dropped = 0
+        self.late = 0
+        self.bytes = 0
+        self.max_frame_bytes = 0
+        self.write_latencies: List[float] = []
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.throttle: Optional[Throttle] = None  # Set by the player for budgeted playback
+        self._delay_ms = 0  # Sum of DELAYs of frames written or dropped
+    
+    def start(self) -> None:
+        """Mark the start of playback."""
+        self.started = time.perf_counter()
+        self.finished = None
+    
+    def finish(self) -> None:
+        """Mark the end of playback."""
+        self.finished = time.perf_counter()
+    
+    def record_frame(self, latency: float, size: int, delay: int, late: bool = False) -> None:
+        """
+        Record one written frame.
+        
+        Args:
+            latency: Seconds spent writing and flushing the frame
+            size: Bytes written
+            delay: The frame's DELAY in milliseconds
+            late: Whether it finished after its display slot ended
+        """
+        self.frames += 1
+        self.bytes += size
+        self.max_frame_bytes = max(self.max_frame_bytes, size)
+        if late:
+            self.late += 1
+        self._delay_ms += delay
+        if len(self.write_latencies) < self.MAX_SAMPLES:
+            self.write_latencies.append(latency)
+        if self.on_frame is not None:
+            self.on_frame(self)
+    
+    def record_drop(self, delay: int) -> None:
+        """Record a frame skipped without being written."""
+        self.dropped += 1
+        self._delay_ms += delay
+    
+    @property
+    def elapsed(self) -> float:
+        """Seconds from start() to finish() (or until now while playing)."""
+        if self.started is None:
+            return 0.0
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return end - self.started
+    
+    @property
+    def target_fps(self) -> Optional[float]:
+        """Frame rate the DELAYs ask for, or None if they are all 0."""
+        frames = self.frames + self.dropped
+        if not frames or not self._delay_ms:
+            return None
+        return frames * 1000.0 / self._delay_ms
+    
+    @property
+    def achieved_fps(self) -> float:
+        """Frames written per second of playback."""
+        elapsed = self.elapsed
+        return self.frames / elapsed if elapsed > 0 else 0.0
+    
+    def latency_percentile(self, percent: float) -> float:
+        """Write latency in seconds at the given percentile (nearest rank)."""
+        if not self.write_latencies:
+            return 0.0
+        ordered = sorted(self.write_latencies)
+        rank = max(1, -(-len(ordered) * percent // 100))
+        return ordered[min(len(ordered), int(rank)) - 1]
+    
+    def as_dict(self) -> Dict[str, Any]:
+        """Statistics as JSON-compatible values (times in milliseconds)."""
+        target = self.target_fps
+        elapsed = self.elapsed
+        values: Dict[str, Any] = {
+            "frames": self.frames,
+            "dropped": self.dropped,
+            "late": self.late,
+            "elapsed_ms": round(elapsed * 1000, 3),
+            "target_fps": round(target, 3) if target is not None else None,
+            "achieved_fps": round(self.achieved_fps, 3),
+            "write_ms": {
+                f"p{p}": round(self.latency_percentile(p) * 1000, 3) for p in (50, 90, 99, 100)
+            },
+            "bytes": self.bytes,
+            "bytes_per_frame": round(self.bytes / self.frames, 1) if self.frames else 0,
+            "max_frame_bytes": self.max_frame_bytes,
+            "bytes_per_second": round(self.bytes / elapsed, 1) if elapsed > 0 else 0,
+        }
+        if self.throttle is not None:
+            values["budget"] = {
+                "limit": str(self.throttle.budget),
+                "frames_by_colors": dict(self.throttle.sent),
+                "dropped": self.throttle.dropped,
+            }
+        return values
+    
+    def summary(self) -> str:
+        """Human-readable summary of as_dict()."""
+        values = self.as_dict()
+        target = values["target_fps"]
+        write = values["write_ms"]
+        lines = [
+            f"frames      {values['frames']} written, {values['dropped']} dropped, {values['late']} late",
+            f"fps         {values['achieved_fps']:.1f} achieved"
+            + (f" of {target:.1f} target" if target is not None else " (no DELAY)"),
+            f"write ms    p50 {write['p50']:.2f}  p90 {write['p90']:.2f}  "
+            f"p99 {write['p99']:.2f}  max {write['p100']:.2f}",
+            f"bytes       {values['bytes_per_frame']:.0f} per frame, "
+            f"{values['max_frame_bytes']} max, {values['bytes']} total, "
+            f"{values['bytes_per_second']:.0f} per second",
+        ]
+        budget = values.get("budget")
+        if budget is not None:
+            colors = ", ".join(f"{count} {name}" for name, count in budget["frames_by_colors"].items())
+            lines.append(f"budget      {budget['limit']}: {colors}; {budget['dropped']} dropped to fit")
+        return "\n".join(lines)
+    
+    def write_json(self, path: Union[str, Path]) -> None:
+        """Write as_dict() to a JSON file."""
+        import json
+        
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.as_dict(), f, indent=2)
+            f.write("\n")
+
+
 class CatpicPlayer:
     """Player for MEOW animated images."""
     
     def __init__(self):
         """Initialize player."""
         self.decoder = CatpicDecoder()
+        self.stats: Optional[PlaybackStats] = None  # Of the last playback
     
     def play(
         self, 
@@ -122,7 +389,11 @@ class CatpicPlayer:
         delay: Optional[int] = None,
         loop: bool = True,
         max_loops: Optional[int] = None,
-        force: bool = False
+        force: bool = False,
+        diff: bool = True,
+        stats: Optional[PlaybackStats] = None,
+        drop_late: bool = False,
+        budget: Optional[Budget] = None
     ) -> None:
         """
         Play MEOW animation content with reduced flicker.
@@ -130,14 +401,23 @@ class CatpicPlayer:
         Animation plays at current cursor position instead of clearing screen.
         Saves cursor position before starting, restores after.
         
-        Auto-truncates animation height to fit terminal unless force=True.
+        Unless force=True, animations wider than the terminal are downscaled
+        in cell space and taller ones truncated to fit.
         
         Args:
             content: MEOW-ANIM format string
             delay: Override frame delay in milliseconds
             loop: Loop animation indefinitely
             max_loops: Maximum number of loops
-            force: If True, skip auto-truncation and play full size
+            force: If True, skip auto-fitting and play full size
+            diff: If True, redraw only the cell spans that changed since the
+                  previous frame (computed once when the file is loaded)
+            stats: Collects playback statistics (default: a new PlaybackStats,
+                   kept as self.stats)
+            drop_late: If True, skip frames whose display slot has already
+                       passed instead of drawing every frame late
+            budget: Keep terminal output within this many bytes per frame
+                    or per second (see catpic.budget.Throttle)
         
         Flicker reduction techniques:
         1. Save/restore cursor position
@@ -145,6 +425,7 @@ class CatpicPlayer:
         3. Use saved position (\x1b[u) to return to start of animation
         4. Buffer entire frame before outputting
         5. Single flush per frame
+        6. Cursor-addressed updates of changed cell spans only
         """
         try:
             parsed = self.decoder.parse_meow(content)
@@ -160,11 +441,146 @@ class CatpicPlayer:
             print("Error: No frames found in animation", file=sys.stderr)
             return
         
-        # Get animation height
-        anim_height = parsed.get('height', 0)
+        # Per-frame DELAY lines apply unless the caller overrides the delay
+        file_delay = parsed.get('delay', 100)
+        frames = [
+            (frame_data['lines'], delay or frame_data.get('delay', file_delay))
+            for frame_data in parsed['frames']
+        ]
+        height = parsed.get('height', 0)
+        
+        import shutil
         
+        terminal_width = shutil.get_terminal_size(fallback=(80, 24)).columns
+        if not force and parsed.get('width', 0) > terminal_width:
+            # Too wide to fit: downscale every frame in cell space
+            frames = [(CatpicDecoder.fit_lines(parsed, lines, terminal_width), frame_delay) for lines, frame_delay in frames]
+            height = len(frames[0][0])
+            print(f"Note: Animation scaled to {terminal_width} columns (terminal width: {terminal_width}, animation width: {parsed['width']}). Use --force to disable.", file=sys.stderr)
+        self._play_frames(
+            frames,
+            height,
+            delay or file_delay,
+            loop,
+            max_loops,
+            force,
+            diff,
+            stats,
+            drop_late,
+            budget,
+        )
+    
+    def play_stream(
+        self,
+        frames: Iterable[Union[List[str], Tuple[List[str], int]]],
+        height: int,
+        delay: int = 100,
+        loop: bool = True,
+        max_loops: Optional[int] = None,
+        force: bool = False,
+        prefetch: int = 8,
+        diff: bool = True,
+        stats: Optional[PlaybackStats] = None,
+        drop_late: bool = False,
+        budget: Optional[Budget] = None
+    ) -> None:
+        """
+        Play frames while they are still being produced.
+        
+        A background thread pulls frames from the iterable (typically
+        CatpicEncoder.iter_animation_frames) into a bounded queue while the
+        player draws them, so the first frame appears as soon as it has been
+        encoded instead of after the whole animation has been serialized and
+        re-parsed. When looping, frames are retained after the first pass for
+        later loops.
+        
+        Args:
+            frames: Iterable of frames, each a list of ANSI data lines or a
+                    (lines, delay_ms) tuple such as iter_timed_frames yields
+            height: Frame height in terminal rows
+            delay: Frame delay in milliseconds for frames without their own
+            loop: Loop animation indefinitely
+            max_loops: Maximum number of loops
+            force: If True, skip auto-truncation and play full size
+            prefetch: Maximum number of encoded frames waiting to be drawn
+            diff: If True, redraw only the cell spans that changed since the
+                  previous frame (computed as frames arrive)
+            stats: Collects playback statistics (default: a new PlaybackStats,
+                   kept as self.stats)
+            drop_late: If True, skip frames whose display slot has already
+                       passed instead of drawing every frame late
+            budget: Keep terminal output within this many bytes per frame
+                    or per second (see catpic.budget.Throttle)
+        """
+        buffered = _PrefetchedFrames(frames, prefetch, retain=loop)
+        try:
+            self._play_frames(
+                buffered, height, delay, loop, max_loops, force, diff, stats, drop_late, budget
+            )
+        finally:
+            buffered.close()
+    
+    def play_live(
+        self,
+        stream: TextIO,
+        force: bool = False,
+        diff: bool = True,
+        stats: Optional[PlaybackStats] = None,
+        budget: Optional[Budget] = None
+    ) -> None:
+        """
+        Play an open-ended MEOW-ANIM stream (e.g. stdin) as frames arrive.
+        
+        Frames are drawn as soon as they are complete, at most one per DELAY.
+        When the producer outpaces the terminal, frames that arrived while
+        the previous one was being drawn are skipped in favor of the newest,
+        so the picture never lags more than one frame behind. Skipped frames
+        are counted as dropped in the statistics. Playback ends when the
+        stream does.
+        
+        Args:
+            stream: Text stream of MEOW-ANIM content (FRAMES is not needed)
+            force, diff, stats, budget: See play_stream()
+        
+        Raises:
+            ValueError: If the stream is not MEOW-ANIM or has no HEIGHT
+        """
+        reader = MeowStreamReader(stream)
+        if not reader.height:
+            raise ValueError("MEOW-ANIM stream has no HEIGHT")
+        stats = stats if stats is not None else PlaybackStats()
+        self._play_frames(
+            _LatestFrame(reader, stats), reader.height, reader.delay,
+            loop=False, max_loops=None, force=force, diff=diff, stats=stats, budget=budget,
+        )
+    
+    def _play_frames(
+        self,
+        frames: Iterable[Union[List[str], Tuple[List[str], int]]],
+        anim_height: int,
+        frame_delay: int,
+        loop: bool,
+        max_loops: Optional[int],
+        force: bool,
+        diff: bool = True,
+        stats: Optional[PlaybackStats] = None,
+        drop_late: bool = False,
+        budget: Optional[Budget] = None
+    ) -> None:
+        """
+        Draw frames in place until the loop limit or Ctrl+C.
+        
+        Frames are paced against the clock: each frame's slot starts when the
+        previous one's ends, so time spent preparing and writing a frame
+        comes out of its DELAY. A frame that overruns its slot is late; the
+        next frame then either starts right away (the schedule restarts) or,
+        with drop_late, frames are skipped until one is due again.
+        
+        With a budget, each frame's output is compacted and its color depth
+        chosen by a Throttle, which also drops frames (keeping the previous
+        one on screen) when the budget is spent.
+        """
         # Check terminal height and auto-truncate if needed
-        import os
         import shutil
         
         terminal_size = shutil.get_terminal_size(fallback=(80, 24))
@@ -174,57 +590,109 @@ class CatpicPlayer:
         if force or anim_height <= terminal_height:
             # Use full height
             display_height = anim_height
-            truncated = False
         else:
             # Auto-truncate to fit terminal
             # Reserve 3 lines: current line, animation, and one for cursor after
             display_height = max(1, terminal_height - 3)
-            truncated = True
             print(f"Note: Animation truncated to {display_height} lines (terminal height: {terminal_height}). Use --force to disable.", file=sys.stderr)
         
-        # Use provided delay or file delay or default
-        frame_delay = delay or parsed.get('delay', 100)
-        delay_seconds = frame_delay / 1000.0
-        
-        frames = parsed['frames']
         loop_count = 0
         
-        # Get expected line width from metadata
-        # Each character position has ANSI codes, so we can't use simple len()
-        # Instead, clear any partial lines by moving to column 0 and clearing to end
-        frame_width = parsed.get('width', 80)
-        
         # Save cursor position and hide cursor
         # \x1b[s = save cursor position
         # \x1b[?25l = hide cursor
         print('\x1b[s\x1b[?25l', end='', flush=True)
         
+        # Terminal output per (previous frame, frame) transition, built once
+        updates: Dict[Tuple[Optional[int], int], str] = {}
+        frame_cells: Dict[int, List[List[str]]] = {}
+        
+        def frame_output(prev_idx: Optional[int], idx: int, lines: List[str]) -> str:
+            key = (prev_idx, idx)
+            if key not in updates:
+                if diff and idx not in frame_cells:
+                    frame_cells[idx] = [split_cells(line) for line in lines[:display_height]]
+                if prev_idx is None or not diff:
+                    updates[key] = full_frame(lines, display_height)
+                else:
+                    updates[key] = diff_frame(frame_cells[prev_idx], frame_cells[idx])
+            return updates[key]
+        
+        if diff and isinstance(frames, list) and frames:
+            # All frames are known up front: compute every update at load time
+            all_lines = [frame[0] if isinstance(frame, tuple) else frame for frame in frames]
+            with trace.stage("play.prepare"):
+                for idx, lines in enumerate(all_lines):
+                    frame_output(idx - 1 if idx else None, idx, lines)
+                frame_output(len(all_lines) - 1, 0, all_lines[0])
+        
+        prev_idx: Optional[int] = None
+        due: Optional[float] = None  # Start of the current frame's slot
+        # The last frame of a known sequence is never dropped
+        last_idx = len(frames) - 1 if isinstance(frames, list) else None
+        stats = self.stats = stats if stats is not None else PlaybackStats()
+        throttle = stats.throttle = Throttle(budget) if budget is not None else None
+        stats.start()
+        
         try:
             while True:
-                for frame_data in frames:
-                    # Build frame using cursor positioning, no newlines
-                    # \x1b[u = restore to saved position
-                    output_buffer = ['\x1b[u']
+                for idx, frame in enumerate(frames):
+                    if isinstance(frame, tuple):
+                        frame_lines, wait = frame
+                    else:
+                        frame_lines, wait = frame, frame_delay
+                    now = time.perf_counter()
+                    if due is None:
+                        due = now
+                    slot_end = due + wait / 1000.0
+                    if (
+                        drop_late and prev_idx is not None and idx != last_idx
+                        and wait > 0 and now >= slot_end
+                    ):
+                        # This frame's whole slot has passed: skip to catch up
+                        due = slot_end
+                        stats.record_drop(wait)
+                        continue
                     
-                    for idx, line in enumerate(frame_data['lines']):
-                        if idx >= display_height:
-                            break
-                        
-                        # Output line content
-                        output_buffer.append(line)
-                        
-                        # Clear to end of line (removes artifacts)
-                        output_buffer.append('\x1b[K')
-                        
-                        # Move to next line (down 1, column 0) - but not after last line
-                        if idx < display_height - 1:
-                            output_buffer.append('\x1b[B\x1b[G')
+                    # Only the spans that changed since the previous frame
+                    # are redrawn, using cursor positioning from the saved origin
+                    with trace.stage("play.prepare"):
+                        output = frame_output(prev_idx, idx, frame_lines)
+                        if throttle is not None:
+                            output = throttle.fit(output, prev_idx is None or idx == last_idx, now)
+                    if not loop:
+                        # Nothing is replayed, so keep only the frame on screen
+                        updates.pop((prev_idx, idx), None)
+                        if output is None:
+                            frame_cells.pop(idx, None)
+                        elif prev_idx is not None and prev_idx != idx:
+                            frame_cells.pop(prev_idx, None)
+                    if output is None:
+                        # Over budget: the previous frame stays on screen
+                        due = slot_end
+                        stats.record_drop(wait)
+                        remaining = due - time.perf_counter()
+                        if remaining > 0:
+                            time.sleep(remaining)
+                        continue
+                    prev_idx = idx
                     
                     # Output entire frame at once
-                    print(''.join(output_buffer), end='', flush=True)
+                    start = time.perf_counter()
+                    with trace.stage("play.write"):
+                        print(output, end='', flush=True)
+                    end = time.perf_counter()
+                    trace.count("frames_drawn")
+                    trace.count("bytes_emitted", len(output))
+                    late = wait > 0 and end > slot_end
+                    stats.record_frame(end - start, len(output.encode('utf-8')), wait, late)
                     
-                    # Wait for next frame
-                    time.sleep(delay_seconds)
+                    # Wait for the next frame's slot
+                    due = slot_end
+                    if late and not drop_late:
+                        due = end
+                    if due > end:
+                        time.sleep(due - end)
                 
                 if not loop:
                     break
@@ -236,6 +704,7 @@ class CatpicPlayer:
         except KeyboardInterrupt:
             pass
         finally:
+            stats.finish()
             # Restore cursor position, show cursor
             print('\x1b[u\x1b[?25h', end='', flush=True)
             # Move cursor below animation
@@ -262,3 +731,140 @@ class CatpicPlayer:
             print(f"Error: File '{meow_path}' not found", file=sys.stderr)
         except UnicodeDecodeError:
             print(f"Error: Cannot decode file '{meow_path}' as UTF-8", file=sys.stderr)
+
+
+
+class _PrefetchedFrames:
+    """
+    Frames produced by a background thread into a bounded queue.
+    
+    The first iteration consumes the queue as frames arrive and keeps each
+    frame (unless retain is False); subsequent iterations replay the kept
+    frames without touching the producer. Errors raised by the producer are re-raised in the
+    consuming thread.
+    """
+    
+    _DONE = object()
+    
+    def __init__(self, frames: Iterable[Any], prefetch: int = 8, retain: bool = True):
+        self._retain = retain
+        self._queue: "queue.Queue[object]" = queue.Queue(maxsize=max(1, prefetch))
+        self._frames: List[Any] = []
+        self._complete = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._produce, args=(frames,), daemon=True
+        )
+        self._thread.start()
+    
+    def _produce(self, frames: Iterable[Any]) -> None:
+        try:
+            for frame in frames:
+                if not self._put(frame):
+                    return
+        except BaseException as e:  # Hand the failure to the consumer
+            self._put(e)
+            return
+        finally:
+            # A generator can only be closed by the thread running it; this
+            # runs the encoder's cleanup (e.g. shutting down its process pool)
+            if self._stop.is_set() and hasattr(frames, "close"):
+                frames.close()
+        self._put(self._DONE)
+    
+    def _put(self, item: object) -> bool:
+        # Poll so close() can stop a producer blocked on a full queue
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def __iter__(self) -> Iterator[Any]:
+        if self._complete:
+            return iter(self._frames)
+        return self._drain()
+    
+    def _drain(self) -> Iterator[Any]:
+        yield from self._frames
+        while True:
+            item = self._queue.get()
+            if item is self._DONE:
+                self._complete = True
+                return
+            if isinstance(item, BaseException):
+                raise item
+            if self._retain:
+                self._frames.append(item)
+            yield item
+    
+    def close(self, timeout: float = 5.0) -> None:
+        """
+        Stop the producer thread (e.g. after Ctrl+C during the first pass).
+        
+        The producer closes its frame generator and exits once the frame it
+        is working on is done. Waits up to timeout seconds for that; a
+        producer blocked reading a stream that never delivers is abandoned
+        (it is a daemon thread).
+        """
+        self._stop.set()
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+
+class _LatestFrame:
+    """
+    The newest complete frame from a background reader.
+    
+    A background thread reads frames and keeps only the newest one. Each
+    time the player asks for a frame it gets the newest that arrived since
+    the last one; frames that were replaced before the player got to them
+    are recorded as dropped. A producer faster than the terminal therefore
+    never builds up a backlog: the frame drawn is at most one draw old.
+    Errors raised by the reader are re-raised in the consuming thread.
+    """
+    
+    def __init__(self, frames: Iterable[Tuple[List[str], int]], stats: PlaybackStats):
+        self._stats = stats
+        self._cond = threading.Condition()
+        self._frame: Optional[Tuple[List[str], int]] = None
+        self._replaced: List[int] = []  # Delays of frames replaced before being drawn
+        self._done = False
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._produce, args=(frames,), daemon=True)
+        self._thread.start()
+    
+    def _produce(self, frames: Iterable[Tuple[List[str], int]]) -> None:
+        try:
+            for frame in frames:
+                with self._cond:
+                    if self._frame is not None:
+                        self._replaced.append(self._frame[1])
+                    self._frame = frame
+                    self._cond.notify()
+        except BaseException as e:  # Hand the failure to the consumer
+            with self._cond:
+                self._error = e
+        finally:
+            with self._cond:
+                self._done = True
+                self._cond.notify()
+    
+    def __iter__(self) -> Iterator[Tuple[List[str], int]]:
+        while True:
+            with self._cond:
+                # Wait with a timeout so Ctrl+C reaches the player promptly
+                while self._frame is None and not self._done:
+                    self._cond.wait(0.1)
+                frame, self._frame = self._frame, None
+                replaced, self._replaced = self._replaced, []
+                error = self._error
+            for delay in replaced:
+                self._stats.record_drop(delay)
+            if frame is None:
+                if error is not None:
+                    raise error
+                return
+            yield frame
@@ -1,25 +1,77 @@
 """catpic image encoding functionality."""
 
+import threading
+from collections import deque
 from pathlib import Path
-from typing import Optional, Tuple, Union
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, TextIO, Tuple, Union
 
 from PIL import Image
 
+from . import engines, trace
 from .core import BASIS, CatpicCore, get_default_basis
 
+if TYPE_CHECKING:
+    from .sources import FrameSource
+
+# MEOW-ANIM/1.1 adds per-frame DELAY lines and an optional FRAMES header.
+# Files that use neither are still written as 1.0 for older readers.
+MEOW_ANIM_1_0 = "MEOW-ANIM/1.0"
+MEOW_ANIM_1_1 = "MEOW-ANIM/1.1"
+
+# Decoded size above which images are decoded in strips (or JPEG drafts)
+# when no max_memory is given
+DEFAULT_MAX_MEMORY = 512 * 1024 * 1024
+
+# Bytes per pixel of raw pixel data, for raw tiles that give no row stride
+_RAW_BYTES = {
+    'L': 1, 'P': 1, 'LA': 2, 'PA': 2, 'I;16': 2, 'I;16B': 2, 'I;16L': 2,
+    'RGB': 3, 'BGR': 3, 'RGBA': 4, 'BGRA': 4, 'RGBX': 4, 'BGRX': 4, 'CMYK': 4,
+}
+
+# Resampling filters for CatpicEncoder(resample=...). "nearest" never
+# introduces colors that are not in the source, so paletted images and GIF
+# frames keep their palette entries and most cells split exactly, without
+# quantizing.
+RESAMPLE_FILTERS = {
+    'lanczos': Image.Resampling.LANCZOS,
+    'nearest': Image.Resampling.NEAREST,
+}
+
+# Serializes lifting Pillow's pixel-count limit around Image.open
+_PIXEL_LIMIT_LOCK = threading.Lock()
+
+
+class EncodeCancelled(Exception):
+    """Raised by encode_image() when its cancel event is set."""
+
 
 class CatpicEncoder:
     """Encoder for converting images to MEOW format (Mosaic Encoding Over Wire)."""
     
-    def __init__(self, basis: Optional[Union[BASIS, Tuple[int, int]]] = None):
+    def __init__(
+        self,
+        basis: Optional[Union[BASIS, Tuple[int, int]]] = None,
+        resample: str = 'lanczos',
+        engine: Optional[str] = None
+    ):
         """Initialize encoder with specified BASIS level.
         
         Args:
             basis: Either a BASIS enum, tuple (2, 2), or None.
                    If None, uses CATPIC_BASIS environment variable or defaults to BASIS_2_2.
+            resample: 'lanczos' (default) or 'nearest'. Nearest resampling
+                      keeps palette indices: paletted images and GIF frames
+                      are resized before any RGB conversion, and cells with
+                      at most two distinct colors are split exactly instead
+                      of being quantized.
+            engine: Cell encoding engine (see catpic.engines): 'pil',
+                    'fast', 'numpy', 'process' or 'auto'. If None, uses the
+                    CATPIC_ENGINE environment variable or 'pil'. BASIS 1,2
+                    needs no engine: its cells are read directly.
         
         Environment:
             CATPIC_BASIS: Set default BASIS (e.g., "2,4" or "2x4" or "2_4")
+            CATPIC_ENGINE: Set default engine (e.g., "numpy")
         """
         # If no basis provided, check environment variable
         if basis is None:
@@ -39,17 +91,39 @@ class CatpicEncoder:
         else:
             self.basis = basis
         
+        if resample not in RESAMPLE_FILTERS:
+            raise ValueError(f"Invalid resample: {resample}. Must be one of {list(RESAMPLE_FILTERS)}")
+        self.resample = resample
+        self.engine = engines.check_engine(engine)
+        
         self.core = CatpicCore()
         
+        # Cell reuse and frame counters for the most recent animation encode
+        self.reuse_stats: Dict[str, int] = {'cells': 0, 'reused': 0}
+        self.frame_stats: Dict[str, int] = {'source': 0, 'encoded': 0}
+        
     def encode_image(
         self, 
-        image_path: Union[str, Path], 
+        image_path: Union[str, Path, Image.Image], 
         width: Optional[int] = None,
-        height: Optional[int] = None
+        height: Optional[int] = None,
+        max_memory: Optional[int] = None,
+        cancel: Optional[threading.Event] = None
     ) -> str:
         """
         Encode a single image to MEOW format using EnGlyph algorithm.
         
+        Args:
+            image_path: Path to image file, or an already open PIL Image
+            width: Output width in characters (default: 80)
+            height: Output height in characters (default: from aspect ratio)
+            max_memory: Peak bytes allowed for decoding; see prepare_image().
+                        When given, Pillow's decompression-bomb pixel limit
+                        is lifted for this file since the ceiling bounds
+                        memory instead.
+            cancel: When set (from another thread), encoding stops at the
+                    next cell row and EncodeCancelled is raised
+        
         Algorithm:
         1. Resize image to WIDTH×BASIS_X by HEIGHT×BASIS_Y pixels
         2. For each cell: Extract BASIS_X×BASIS_Y pixel block  
@@ -59,64 +133,384 @@ class CatpicEncoder:
         6. Compute RGB centroids for foreground/background
         7. Output ANSI color sequence
         """
-        with Image.open(image_path) as img:
-            # Convert to RGB if necessary
+        if isinstance(image_path, Image.Image):
+            return self.encode_resized(*self.prepare_image(image_path, width, height, max_memory), cancel=cancel)
+        
+        with _open_image(image_path, unlimited=max_memory is not None) as img:
+            return self.encode_resized(*self.prepare_image(img, width, height, max_memory), cancel=cancel)
+    
+    def encode_draft(
+        self,
+        image_path: Union[str, Path, Image.Image],
+        width: Optional[int] = None,
+        height: Optional[int] = None
+    ) -> str:
+        """
+        Quick low-quality render for progressive display.
+        
+        Returns MEOW at BASIS 1,2 with the same WIDTH×HEIGHT cells that
+        encode_image() produces for these arguments, so the full render can
+        be drawn over it line for line. JPEGs are decoded at a reduced DCT
+        scale (Image.draft(), only for images opened here), other images
+        are shrunk by Image.reduce() before a bilinear resize, and the two
+        pixels of each half-block cell need no quantizing.
+        """
+        if isinstance(image_path, Image.Image):
+            return self._encode_draft(image_path, width, height, draft=False)
+        
+        with _open_image(image_path) as img:
+            return self._encode_draft(img, width, height, draft=True)
+    
+    def _encode_draft(self, img: Image.Image, width: Optional[int], height: Optional[int], draft: bool) -> str:
+        width, height = self._cell_size(img, width, height)
+        with trace.stage("encode.decode"):
+            if draft:
+                img.draft('RGB', (width, 2 * height))
+            img.load()
             if img.mode != 'RGB':
                 img = img.convert('RGB')
+        with trace.stage("encode.resize"):
+            img_resized = img.resize((width, 2 * height), Image.Resampling.BILINEAR, reducing_gap=2.0)
+        return CatpicEncoder(basis=BASIS.BASIS_1_2, engine=self.engine).encode_resized(img_resized, width, height)
+    
+    def prepare_image(
+        self,
+        img: Image.Image,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        max_memory: Optional[int] = None
+    ) -> Tuple[Image.Image, int, int]:
+        """
+        Decode and resize an image for encoding (steps before cell encoding).
+        
+        Images that are still undecoded and would need more than max_memory
+        bytes (default: DEFAULT_MAX_MEMORY) to decode whole are read in a
+        bounded way instead: JPEGs are decoded at a reduced DCT scale, and
+        images stored as raw rows (BMP, uncompressed TIFF, PPM, TGA) are
+        read in horizontal strips, each reduced with Image.reduce() into a
+        small intermediate image that is then resized as usual.
+        
+        Args:
+            max_memory: Peak bytes for decoding. If given explicitly,
+                        formats that can only be decoded whole (PNG, WebP,
+                        compressed TIFF) raise ValueError when over it;
+                        with the default they are decoded whole anyway.
+        
+        Returns:
+            (resized RGB image, width, height) for encode_resized()
+        """
+        # Calculate dimensions (known before decoding)
+        width, height = self._cell_size(img, width, height)
+        
+        # Get BASIS dimensions
+        basis_x, basis_y = self.core.get_basis_dimensions(self.basis)
+        pixel_width = width * basis_x
+        pixel_height = height * basis_y
+        
+        limit = max_memory if max_memory is not None else DEFAULT_MAX_MEMORY
+        if getattr(img, 'tile', None) and _decoded_bytes(img) > limit:
+            img = self._decode_bounded(img, pixel_width, pixel_height, limit, max_memory is not None)
+        
+        # Decode and convert to RGB if necessary
+        with trace.stage("encode.decode"):
+            img.load()
+            if img.mode != 'RGB' and self.resample != 'nearest':
+                img = img.convert('RGB')
+        
+        # Resize image to exact pixel dimensions needed
+        with trace.stage("encode.resize"):
+            img_resized = self._resize(img, pixel_width, pixel_height)
+        return img_resized, width, height
+    
+    @staticmethod
+    def _cell_size(img: Image.Image, width: Optional[int], height: Optional[int]) -> Tuple[int, int]:
+        """Output size in cells, filling in defaults from the image size."""
+        if width is None:
+            width = 80  # Default terminal width
+        if height is None:
+            # Maintain aspect ratio with terminal character aspect correction
+            aspect_ratio = img.height / img.width
+            height = int(width * aspect_ratio * 0.5)
+        return width, height
+    
+    def _resize(self, img: Image.Image, pixel_width: int, pixel_height: int) -> Image.Image:
+        """
+        Resize to cell pixel dimensions with the encoder's resample filter.
+        
+        With 'nearest', paletted (and other non-RGB) images are resized in
+        their own mode first, so only the resized pixels are looked up in
+        the palette.
+        """
+        img_resized = img.resize((pixel_width, pixel_height), RESAMPLE_FILTERS[self.resample])
+        if img_resized.mode != 'RGB':
+            img_resized = img_resized.convert('RGB')
+        return img_resized
+    
+    def _decode_bounded(
+        self,
+        img: Image.Image,
+        pixel_width: int,
+        pixel_height: int,
+        limit: int,
+        strict: bool
+    ) -> Image.Image:
+        """
+        Decode an image too large to decode whole within limit bytes.
+        
+        Returns a JPEG in draft mode, or an RGB image reduced by an integer
+        factor from strips of raw rows. Other formats are returned as they
+        are (decoded whole by the caller) unless strict.
+        """
+        if img.format == 'JPEG':
+            # The JPEG decoder scales by 1/2, 1/4 or 1/8 while decoding
+            img.draft('RGB', (pixel_width, pixel_height))
+            if not strict or _decoded_bytes(img) <= limit:
+                return img
+        else:
+            tiles = _raw_tiles(img)
+            if tiles is not None:
+                return self._reduce_strips(img, tiles, pixel_width, pixel_height, limit)
+        
+        if strict:
+            raise ValueError(
+                f"{img.format} image of {img.width}x{img.height} needs about "
+                f"{_decoded_bytes(img) // 2**20} MB to decode, over the "
+                f"{limit // 2**20} MB limit, and cannot be decoded in strips"
+            )
+        return img
+    
+    def _reduce_strips(
+        self,
+        img: Image.Image,
+        tiles: List[Tuple[Tuple[int, int, int, int], int, str, int, int]],
+        pixel_width: int,
+        pixel_height: int,
+        limit: int
+    ) -> Image.Image:
+        """
+        Read raw tiles in horizontal strips and Image.reduce() each one.
+        
+        The reduction factor keeps the result at least twice the target
+        pixel size so the final LANCZOS resize has detail to work with.
+        Strips start on multiples of the factor, so the result equals
+        reducing the whole image at once.
+        """
+        full_width, full_height = img.size
+        factor = max(1, min(full_width // (2 * pixel_width), full_height // (2 * pixel_height)))
+        reduced = Image.new('RGB', (-(-full_width // factor), -(-full_height // factor)))
+        
+        # Per source row: raw bytes read, the strip image, and its RGB copy
+        row_bytes = full_width * (2 * _mode_bytes(img.mode) + 3)
+        budget = limit - reduced.width * reduced.height * 3
+        rows = budget // row_bytes // factor * factor
+        if rows < factor:
+            raise ValueError(
+                f"max_memory of {limit} bytes is too small for a {full_width}-pixel-wide image"
+            )
+        
+        palette = img.palette.getdata() if img.mode in ('P', 'PA') and img.palette else None
+        for top in range(0, full_height, rows):
+            bottom = min(full_height, top + rows)
+            with trace.stage("encode.decode"):
+                strip = Image.new(img.mode, (full_width, bottom - top))
+                for (x0, y0, x1, y1), offset, rawmode, stride, orientation in tiles:
+                    first, last = max(y0, top), min(y1, bottom)
+                    if first >= last:
+                        continue
+                    # Bottom-up tiles store their last row first
+                    skip = first - y0 if orientation >= 0 else y1 - last
+                    img.fp.seek(offset + skip * stride)
+                    data = img.fp.read((last - first) * stride)
+                    part = Image.frombytes(
+                        img.mode, (x1 - x0, last - first), data, 'raw', rawmode, stride, orientation
+                    )
+                    del data
+                    strip.paste(part, (x0, first - top))
+                if palette is not None:
+                    rawmode, data = palette
+                    strip.putpalette(data, rawmode)
+                if strip.mode != 'RGB':
+                    strip = strip.convert('RGB')
+            with trace.stage("encode.resize"):
+                reduced.paste(strip.reduce(factor), (0, top // factor))
+            del strip
+        
+        return reduced
+    
+    def encode_resized(
+        self,
+        img_resized: Image.Image,
+        width: int,
+        height: int,
+        cancel: Optional[threading.Event] = None
+    ) -> str:
+        """Encode an image from prepare_image() to MEOW format."""
+        basis_x, basis_y = self.core.get_basis_dimensions(self.basis)
+        
+        # Generate MEOW header
+        lines = [
+            "MEOW/1.0",
+            f"WIDTH:{width}",
+            f"HEIGHT:{height}",
+            f"BASIS:{basis_x},{basis_y}",
+            "DATA:",
+        ]
+        
+        # Process each cell using EnGlyph algorithm
+        lines.extend(self._encode_cells(img_resized, width, height, cancel))
+        
+        return "\n".join(lines)
+    
+    def _encode_cells(
+        self,
+        img_resized: Image.Image,
+        width: int,
+        height: int,
+        cancel: Optional[threading.Event] = None
+    ) -> List[str]:
+        """
+        Encode an already-resized image into MEOW data lines.
+        
+        The image must be exactly WIDTH×BASIS_X by HEIGHT×BASIS_Y pixels.
+        Returns one ANSI string per terminal row.
+        """
+        rows = self._encode_cell_rows(img_resized, width, height, cancel=cancel)
+        return ["".join(row) for row in rows]  # type: ignore[arg-type]
+    
+    def _encode_cell_rows(
+        self,
+        img_resized: Image.Image,
+        width: int,
+        height: int,
+        unchanged: Optional[bytearray] = None,
+        cancel: Optional[threading.Event] = None
+    ) -> List[List[Optional[str]]]:
+        """
+        Encode an already-resized image into rows of formatted cells.
+        
+        Args:
+            unchanged: Optional WIDTH*HEIGHT mask from _unchanged_cells();
+                       cells flagged there are skipped and returned as None
+                       so the caller can reuse the previous frame's cell.
+            cancel: Raise EncodeCancelled before the next row once set
+        """
+        if self.basis == BASIS.BASIS_1_2:
+            return self._encode_half_block_rows(img_resized, width, height, unchanged, cancel)
+        
+        basis_x, basis_y = self.core.get_basis_dimensions(self.basis)
+        engine = engines.get_engine(self.engine, basis_x, basis_y, width * height)
+        
+        # Get character lookup table for this BASIS level
+        blocks = self.core.BLOCKS[self.basis]
+        
+        # After nearest resampling, most cells hold at most two colors
+        glyph_rows = engine.encode(
+            img_resized, basis_x, basis_y, width, height, unchanged, exact=self.resample == 'nearest'
+        )
+        
+        rows = []
+        encoded = 0
+        for _ in range(height):
+            if cancel is not None and cancel.is_set():
+                raise EncodeCancelled()
+            with trace.stage("encode.quantize"):
+                glyphs = next(glyph_rows)
             
-            # Calculate dimensions
-            if width is None:
-                width = 80  # Default terminal width
-            if height is None:
-                # Maintain aspect ratio with terminal character aspect correction
-                aspect_ratio = img.height / img.width
-                height = int(width * aspect_ratio * 0.5)
-            
-            # Get BASIS dimensions
-            basis_x, basis_y = self.core.get_basis_dimensions(self.basis)
-            pixel_width = width * basis_x
-            pixel_height = height * basis_y
-            
-            # Resize image to exact pixel dimensions needed
-            img_resized = img.resize((pixel_width, pixel_height), Image.Resampling.LANCZOS)
-            
-            # Generate MEOW header
-            lines = [
-                "MEOW/1.0",
-                f"WIDTH:{width}",
-                f"HEIGHT:{height}",
-                f"BASIS:{basis_x},{basis_y}",
-                "DATA:",
-            ]
-            
-            # Get character lookup table for this BASIS level
-            blocks = self.core.BLOCKS[self.basis]
-            
-            # Process each cell using EnGlyph algorithm
-            for y in range(height):
-                line_chars = []
+            # Format with ANSI colors
+            with trace.stage("encode.format"):
+                row = [
+                    None if glyph is None else self.core.format_cell(blocks[glyph[0]], glyph[1], glyph[2])
+                    for glyph in glyphs
+                ]
+            encoded += len(row) - row.count(None)
+            rows.append(row)
+        
+        trace.count("cells_encoded", encoded)
+        return rows
+    
+    def _encode_half_block_rows(
+        self,
+        img_resized: Image.Image,
+        width: int,
+        height: int,
+        unchanged: Optional[bytearray] = None,
+        cancel: Optional[threading.Event] = None
+    ) -> List[List[Optional[str]]]:
+        """
+        BASIS 1,2 fast path for _encode_cell_rows().
+        
+        A 1×2 cell holds exactly two pixels, which two colors always
+        represent exactly, so there is nothing to quantize: the top pixel is
+        the foreground of "▀" and the bottom pixel its background, or "█"
+        when both are the same color. Pixels are read from one tobytes()
+        buffer instead of cropping each cell.
+        """
+        if img_resized.mode != 'RGB':
+            img_resized = img_resized.convert('RGB')
+        data = img_resized.tobytes()
+        stride = width * 3
+        upper = "\x1b[38;2;%d;%d;%dm\x1b[48;2;%d;%d;%dm" + self.core.BLOCKS[self.basis][1] + "\x1b[0m"
+        full = "\x1b[38;2;%d;%d;%dm\x1b[48;2;%d;%d;%dm" + self.core.BLOCKS[self.basis][3] + "\x1b[0m"
+        
+        rows = []
+        encoded = 0
+        for y in range(height):
+            if cancel is not None and cancel.is_set():
+                raise EncodeCancelled()
+            with trace.stage("encode.format"):
+                top = data[2 * y * stride:(2 * y + 1) * stride]
+                bottom = data[(2 * y + 1) * stride:(2 * y + 2) * stride]
+                row: List[Optional[str]] = []
                 for x in range(width):
-                    # Extract pixel block for this cell
-                    block_x = x * basis_x
-                    block_y = y * basis_y
-                    cell_img = img_resized.crop((
-                        block_x, 
-                        block_y, 
-                        block_x + basis_x, 
-                        block_y + basis_y
-                    ))
-                    
-                    # Apply EnGlyph algorithm to this cell
-                    glut_idx, fg_color, bg_color = self._cell_to_glyph(cell_img)
-                    char = blocks[glut_idx]
-                    
-                    # Format with ANSI colors
-                    cell = self.core.format_cell(char, fg_color, bg_color)
-                    line_chars.append(cell)
-                
-                lines.append("".join(line_chars))
+                    if unchanged is not None and unchanged[y * width + x]:
+                        row.append(None)
+                        continue
+                    i = 3 * x
+                    fg = top[i:i + 3]
+                    bg = bottom[i:i + 3]
+                    row.append((full if fg == bg else upper) % (fg[0], fg[1], fg[2], bg[0], bg[1], bg[2]))
+                    encoded += 1
+            rows.append(row)
+        
+        trace.count("cells_encoded", encoded)
+        return rows
+    
+    def _unchanged_cells(self, previous: bytes, current: bytes, width: int, height: int) -> bytearray:
+        """
+        Flag cells whose pixel block is identical in two resized RGB frames.
+        
+        Compares raw tobytes() buffers: a whole cell row is checked with one
+        slice comparison, and only pixel rows that differ are compared cell
+        by cell.
+        
+        Returns:
+            WIDTH*HEIGHT bytearray, 1 where the cell is unchanged
+        """
+        basis_x, basis_y = self.core.get_basis_dimensions(self.basis)
+        stride = width * basis_x * 3
+        cell_bytes = basis_x * 3
+        
+        unchanged = bytearray(b'\x01' * (width * height))
+        prev = memoryview(previous)
+        cur = memoryview(current)
+        
+        for y in range(height):
+            top = y * basis_y * stride
+            if prev[top:top + basis_y * stride] == cur[top:top + basis_y * stride]:
+                continue
             
-            return "\n".join(lines)
+            for r in range(basis_y):
+                offset = top + r * stride
+                if prev[offset:offset + stride] == cur[offset:offset + stride]:
+                    continue
+                for x in range(width):
+                    idx = y * width + x
+                    if unchanged[idx]:
+                        start = offset + x * cell_bytes
+                        if prev[start:start + cell_bytes] != cur[start:start + cell_bytes]:
+                            unchanged[idx] = 0
+        
+        return unchanged
     
     def _cell_to_glyph(self, cell_img: Image.Image) -> Tuple[int, Tuple[int, int, int], Tuple[int, int, int]]:
         """
@@ -152,12 +546,14 @@ class CatpicEncoder:
         
         # Step 2 & 3: Build bit pattern and separate fg/bg pixels
         # Pixel at index i contributes 2^i to pattern if classified as foreground
-        for idx, pixel_class in enumerate(list(duotone.getdata())):
+        raw = cell_img.tobytes()
+        for idx, pixel_class in enumerate(duotone.tobytes()):
+            pixel = (raw[3 * idx], raw[3 * idx + 1], raw[3 * idx + 2])
             if pixel_class:  # Foreground pixel
-                fg_pixels.append(cell_img.getdata()[idx])
+                fg_pixels.append(pixel)
                 glut_idx += 2**idx  # Bit pattern generation
             else:  # Background pixel
-                bg_pixels.append(cell_img.getdata()[idx])
+                bg_pixels.append(pixel)
         
         # Step 4: Compute color centroids (arithmetic mean of RGB values)
         fg_color = self._compute_centroid(fg_pixels)
@@ -196,24 +592,24 @@ class CatpicEncoder:
         
         return (r_sum // n, g_sum // n, b_sum // n)
     
-    def encode_animation(
-        self, 
+    def animation_info(
+        self,
         gif_path: Union[str, Path],
         width: Optional[int] = None,
         height: Optional[int] = None,
         delay: Optional[int] = None
-    ) -> str:
+    ) -> Dict[str, int]:
         """
-        Encode animated GIF to MEOW animation format.
+        Read animation properties without encoding any frames.
         
-        Uses the same EnGlyph algorithm per frame.
+        Returns:
+            Dict with 'width', 'height' (characters), 'frames' and 'delay' (ms),
+            resolved the same way encode_animation resolves them.
         """
         with Image.open(gif_path) as img:
             if not getattr(img, 'is_animated', False):
                 raise ValueError("Input file is not an animated image")
             
-            # Get animation properties
-            frame_count = getattr(img, 'n_frames', 1)
             if delay is None:
                 delay = img.info.get('duration', 100)
             
@@ -224,50 +620,458 @@ class CatpicEncoder:
                 aspect_ratio = img.height / img.width
                 height = int(width * aspect_ratio * 0.5)
             
-            # Generate MEOW animation header
-            basis_x, basis_y = self.core.get_basis_dimensions(self.basis)
-            lines = [
-                "MEOW-ANIM/1.0",
-                f"WIDTH:{width}",
-                f"HEIGHT:{height}",
-                f"BASIS:{basis_x},{basis_y}",
-                f"FRAMES:{frame_count}",
-                f"DELAY:{delay}",
-                "DATA:",
-            ]
-            
-            # Get character lookup table
-            blocks = self.core.BLOCKS[self.basis]
-            pixel_width = width * basis_x
-            pixel_height = height * basis_y
-            
-            # Encode each frame
-            for frame_idx in range(frame_count):
-                img.seek(frame_idx)
-                frame = img.copy().convert('RGB')
-                frame_resized = frame.resize((pixel_width, pixel_height), Image.Resampling.LANCZOS)
-                
-                lines.append(f"FRAME:{frame_idx}")
+            return {
+                'width': width,
+                'height': height,
+                'frames': getattr(img, 'n_frames', 1),
+                'delay': delay,
+            }
+    
+    def iter_animation_frames(
+        self,
+        gif_path: Union[str, Path],
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        workers: Optional[int] = None
+    ) -> Iterator[List[str]]:
+        """
+        Encode an animated image lazily, one frame at a time.
+        
+        Yields the data lines of each source frame as soon as it is encoded,
+        so a consumer (e.g. CatpicPlayer.play_stream) can start showing
+        frame 0 before the rest of the animation has been decoded. Use
+        iter_timed_frames() to also get per-frame delays and merge
+        duplicate frames.
+        """
+        for lines, _ in self.iter_timed_frames(
+            gif_path, width, height, workers=workers, collapse=False
+        ):
+            yield lines
+    
+    def iter_timed_frames(
+        self,
+        gif_path: Union[str, Path],
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        delay: Optional[int] = None,
+        workers: Optional[int] = None,
+        collapse: bool = True,
+        tolerance: int = 0,
+        max_fps: Optional[float] = None
+    ) -> Iterator[Tuple[List[str], int]]:
+        """
+        Encode an animated image lazily, yielding (lines, delay_ms) per frame.
+        
+        Cells whose resized pixel block is byte-identical to the previous
+        frame's reuse that frame's glyph and colors instead of being
+        quantized again; see reuse_stats / reuse_ratio afterwards.
+        
+        Consecutive frames that look the same once resized are merged into
+        one frame showing for their combined duration, and max_fps merges
+        frames that would be shown sooner than 1/max_fps after the previous
+        one. See frame_stats afterwards.
+        
+        Args:
+            gif_path: Path to animated image
+            width: Output width in characters
+            height: Output height in characters
+            delay: Override every source frame's delay in milliseconds
+            workers: Number of processes for cell encoding. Frames are still
+                     decoded and resized sequentially (GIF frames depend on
+                     their predecessors), then encoded in parallel and
+                     yielded in frame order. None or 1 encodes in-process.
+            collapse: Merge identical consecutive frames
+            tolerance: Largest per-channel pixel difference (0-255) at which
+                       consecutive resized frames still count as identical
+            max_fps: Optional frame rate budget
+        """
+        info = self.animation_info(gif_path, width, height)
+        width, height = info['width'], info['height']
+        
+        return self._encode_frame_stream(
+            self._iter_resized_frames(gif_path, width, height, delay),
+            width,
+            height,
+            workers,
+            collapse,
+            tolerance,
+            max_fps,
+        )
+    
+    def _encode_frame_stream(
+        self,
+        frames: Iterator[Tuple[Image.Image, int]],
+        width: int,
+        height: int,
+        workers: Optional[int] = None,
+        collapse: bool = True,
+        tolerance: int = 0,
+        max_fps: Optional[float] = None
+    ) -> Iterator[Tuple[List[str], int]]:
+        """Encode (resized frame, delay) pairs into (lines, delay) pairs; see iter_timed_frames."""
+        self.reuse_stats = {'cells': 0, 'reused': 0}
+        self.frame_stats = {'source': 0, 'encoded': 0}
+        
+        if collapse or max_fps:
+            frames = self._collapse_frames(frames, tolerance if collapse else -1, max_fps)
+        
+        pool = None
+        if workers is not None and workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            pool = ProcessPoolExecutor(max_workers=workers)
+        
+        # At most this many frames are decoded but not yet yielded
+        window = 2 * workers if pool is not None else 1
+        pending: "deque[Tuple[Any, Optional[bytearray], int]]" = deque()
+        previous_bytes = None
+        previous_rows: List[List[str]] = []
+        
+        def finish() -> Tuple[List[str], int]:
+            # Fill reused cells from the previous frame, in frame order
+            nonlocal previous_rows
+            result, unchanged, duration = pending.popleft()
+            rows = result.result() if pool is not None else result
+            if unchanged is not None:
+                rows = [
+                    [cell if cell is not None else previous_rows[y][x] for x, cell in enumerate(row)]
+                    for y, row in enumerate(rows)
+                ]
+                self.reuse_stats['reused'] += sum(unchanged)
+            self.reuse_stats['cells'] += width * height
+            self.frame_stats['encoded'] += 1
+            trace.count("frames_encoded")
+            previous_rows = rows
+            return ["".join(row) for row in rows], duration
+        
+        try:
+            for frame_resized, duration in frames:
+                # Cells identical to the previous frame are not re-quantized
+                frame_bytes = frame_resized.tobytes()
+                unchanged = None
+                if previous_bytes is not None:
+                    unchanged = self._unchanged_cells(previous_bytes, frame_bytes, width, height)
+                previous_bytes = frame_bytes
                 
-                # Process frame using same cell encoding
-                for y in range(height):
-                    line_chars = []
-                    for x in range(width):
-                        block_x = x * basis_x
-                        block_y = y * basis_y
-                        cell_img = frame_resized.crop((
-                            block_x,
-                            block_y,
-                            block_x + basis_x,
-                            block_y + basis_y
-                        ))
-                        
-                        # Apply EnGlyph algorithm
-                        glut_idx, fg_color, bg_color = self._cell_to_glyph(cell_img)
-                        char = blocks[glut_idx]
-                        cell = self.core.format_cell(char, fg_color, bg_color)
-                        line_chars.append(cell)
-                    
-                    lines.append("".join(line_chars))
+                if pool is None:
+                    result: Any = self._encode_cell_rows(frame_resized, width, height, unchanged)
+                else:
+                    # Frames are still decoded sequentially (GIF frames depend
+                    # on their predecessors); cell encoding runs in the pool
+                    result = pool.submit(
+                        _encode_frame_worker,
+                        self.basis,
+                        frame_resized.size,
+                        frame_bytes,
+                        width,
+                        height,
+                        unchanged,
+                        self.resample,
+                        self.engine,
+                    )
+                pending.append((result, unchanged, duration))
+                if len(pending) >= window:
+                    yield finish()
             
-            return "\n".join(lines)
+            while pending:
+                yield finish()
+        finally:
+            if pool is not None:
+                # Closed early (e.g. Ctrl+C): drop frames not yet started
+                for result, _, _ in pending:
+                    result.cancel()
+                pool.shutdown()
+    
+    @property
+    def reuse_ratio(self) -> float:
+        """Fraction of cells reused from the previous frame in the last animation."""
+        if not self.reuse_stats['cells']:
+            return 0.0
+        return self.reuse_stats['reused'] / self.reuse_stats['cells']
+    
+    def _iter_resized_frames(
+        self,
+        gif_path: Union[str, Path],
+        width: int,
+        height: int,
+        delay: Optional[int] = None
+    ) -> Iterator[Tuple[Image.Image, int]]:
+        """Decode animation frames in order, resized to cell pixel dimensions, with delays."""
+        basis_x, basis_y = self.core.get_basis_dimensions(self.basis)
+        pixel_width = width * basis_x
+        pixel_height = height * basis_y
+        
+        with Image.open(gif_path) as img:
+            default_delay = img.info.get('duration', 100)
+            for frame_idx in range(getattr(img, 'n_frames', 1)):
+                img.seek(frame_idx)
+                self.frame_stats['source'] += 1
+                frame_delay = delay if delay is not None else img.info.get('duration', default_delay)
+                with trace.stage("encode.decode"):
+                    frame = img.copy()
+                    if self.resample != 'nearest':
+                        frame = frame.convert('RGB')
+                with trace.stage("encode.resize"):
+                    frame = self._resize(frame, pixel_width, pixel_height)
+                yield frame, frame_delay
+    
+    def _collapse_frames(
+        self,
+        frames: Iterator[Tuple[Image.Image, int]],
+        tolerance: int = 0,
+        max_fps: Optional[float] = None
+    ) -> Iterator[Tuple[Image.Image, int]]:
+        """
+        Merge runs of frames into the first frame of the run.
+        
+        A frame is merged into the one before it when no pixel channel
+        differs by more than tolerance (a negative tolerance disables this),
+        or when the frame before it has not yet been shown for 1/max_fps.
+        The merged frame's delay is the sum of the run's delays.
+        """
+        from PIL import ImageChops
+        
+        min_interval = 1000.0 / max_fps if max_fps else 0.0
+        held: Optional[Image.Image] = None
+        held_delay = 0
+        
+        for frame, frame_delay in frames:
+            if held is not None:
+                merge = held_delay < min_interval
+                if not merge and tolerance >= 0:
+                    extrema = ImageChops.difference(held, frame).getextrema()
+                    merge = max(high for _, high in extrema) <= tolerance  # type: ignore[union-attr]
+                if merge:
+                    held_delay += frame_delay
+                    continue
+                yield held, held_delay
+            held, held_delay = frame, frame_delay
+        
+        if held is not None:
+            yield held, held_delay
+    
+    def encode_animation(
+        self, 
+        gif_path: Union[str, Path],
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        delay: Optional[int] = None,
+        workers: Optional[int] = None,
+        collapse: bool = True,
+        tolerance: int = 0,
+        max_fps: Optional[float] = None
+    ) -> str:
+        """
+        Encode animated GIF to MEOW animation format.
+        
+        Uses the same EnGlyph algorithm per frame. With workers > 1, cell
+        encoding runs in a process pool. Duplicate frames are merged and
+        max_fps limits the frame rate (see iter_timed_frames); frames whose
+        delay differs from the DELAY header carry their own DELAY line.
+        """
+        info = self.animation_info(gif_path, width, height, delay)
+        
+        frame_lines = []
+        timed = False
+        for frame_idx, (lines, frame_delay) in enumerate(self.iter_timed_frames(
+            gif_path,
+            info['width'],
+            info['height'],
+            delay=delay,
+            workers=workers,
+            collapse=collapse,
+            tolerance=tolerance,
+            max_fps=max_fps,
+        )):
+            frame_lines.append(f"FRAME:{frame_idx}")
+            if frame_delay != info['delay']:
+                frame_lines.append(f"DELAY:{frame_delay}")
+                timed = True
+            frame_lines.extend(lines)
+        
+        # Generate MEOW animation header
+        basis_x, basis_y = self.core.get_basis_dimensions(self.basis)
+        lines = [
+            MEOW_ANIM_1_1 if timed else MEOW_ANIM_1_0,
+            f"WIDTH:{info['width']}",
+            f"HEIGHT:{info['height']}",
+            f"BASIS:{basis_x},{basis_y}",
+            f"FRAMES:{self.frame_stats['encoded']}",
+            f"DELAY:{info['delay']}",
+            "DATA:",
+        ]
+        lines.extend(frame_lines)
+        
+        return "\n".join(lines)
+    
+    def encode_stream(
+        self,
+        source: "FrameSource",
+        out: TextIO,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        workers: Optional[int] = None,
+        collapse: bool = True,
+        tolerance: int = 0,
+        max_fps: Optional[float] = None
+    ) -> int:
+        """
+        Encode a frame source to MEOW-ANIM, writing each frame as it is encoded.
+        
+        Memory stays bounded by a few frames regardless of clip length: the
+        source is read one frame at a time and every encoded frame is
+        written to out immediately. FRAMES is only written to the header
+        when the final count is known up front (no merging and a source that
+        knows its length); readers count FRAME markers otherwise.
+        
+        Args:
+            source: Frame source from catpic.sources.open_source()
+            out: Text stream to write MEOW-ANIM to
+            width: Output width in characters (default: 60)
+            height: Output height in characters (default: from aspect ratio)
+            workers, collapse, tolerance, max_fps: See iter_timed_frames()
+        
+        Returns:
+            Number of frames written
+        """
+        width, height = self._stream_dimensions(source, width, height)
+        basis_x, basis_y = self.core.get_basis_dimensions(self.basis)
+        
+        # Without merging every frame has the source delay, so only an
+        # unknown length needs 1.1; merged frames may carry DELAY lines
+        known = source.frame_count is not None and not collapse and not max_fps
+        header = [
+            MEOW_ANIM_1_0 if known else MEOW_ANIM_1_1,
+            f"WIDTH:{width}",
+            f"HEIGHT:{height}",
+            f"BASIS:{basis_x},{basis_y}",
+        ]
+        if known:
+            header.append(f"FRAMES:{source.frame_count}")
+        header.extend([f"DELAY:{source.delay}", "DATA:"])
+        out.write("\n".join(header) + "\n")
+        out.flush()
+        
+        # Each frame ends with a newline before the flush, so a reader on
+        # the other end of a pipe (catpic play -) sees it complete at once
+        count = 0
+        for lines, frame_delay in self.iter_source_frames(
+            source, width, height, workers, collapse, tolerance, max_fps
+        ):
+            out.write(f"FRAME:{count}\n")
+            if frame_delay != source.delay:
+                out.write(f"DELAY:{frame_delay}\n")
+            out.write("\n".join(lines) + "\n")
+            out.flush()
+            count += 1
+        
+        return count
+    
+    def iter_source_frames(
+        self,
+        source: "FrameSource",
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        workers: Optional[int] = None,
+        collapse: bool = True,
+        tolerance: int = 0,
+        max_fps: Optional[float] = None
+    ) -> Iterator[Tuple[List[str], int]]:
+        """Encode a frame source lazily, yielding (lines, delay_ms); see iter_timed_frames()."""
+        width, height = self._stream_dimensions(source, width, height)
+        basis_x, basis_y = self.core.get_basis_dimensions(self.basis)
+        pixel_size = (width * basis_x, height * basis_y)
+        
+        def resized() -> Iterator[Tuple[Image.Image, int]]:
+            for frame in source:
+                self.frame_stats['source'] += 1
+                with trace.stage("encode.resize"):
+                    frame = self._resize(frame, *pixel_size)
+                yield frame, source.delay
+        
+        return self._encode_frame_stream(
+            resized(), width, height, workers, collapse, tolerance, max_fps
+        )
+    
+    @staticmethod
+    def _stream_dimensions(
+        source: "FrameSource",
+        width: Optional[int],
+        height: Optional[int]
+    ) -> Tuple[int, int]:
+        """Resolve output size for a frame source like encode_animation does."""
+        if width is None:
+            width = 60  # Smaller default for animations
+        if height is None:
+            height = max(1, int(width * source.height / source.width * 0.5))
+        return width, height
+
+
+def _open_image(path: Union[str, Path], unlimited: bool = False) -> Image.Image:
+    """Open an image, optionally without Pillow's decompression-bomb pixel limit."""
+    if not unlimited:
+        return Image.open(path)
+    with _PIXEL_LIMIT_LOCK:
+        pixel_limit, Image.MAX_IMAGE_PIXELS = Image.MAX_IMAGE_PIXELS, None
+        try:
+            return Image.open(path)
+        finally:
+            Image.MAX_IMAGE_PIXELS = pixel_limit
+
+
+def _mode_bytes(mode: str) -> int:
+    """Bytes per decoded pixel of an image mode."""
+    if mode in ('I', 'F'):
+        return 4
+    if mode.startswith('I;16'):
+        return 2
+    return Image.getmodebands(mode) if mode != '1' else 1
+
+
+def _decoded_bytes(img: Image.Image) -> int:
+    """Memory needed to decode an image whole and convert it to RGB."""
+    rgb_copy = 0 if img.mode == 'RGB' else 3
+    return img.width * img.height * (_mode_bytes(img.mode) + rgb_copy)
+
+
+def _raw_tiles(img: Image.Image) -> Optional[List[Tuple[Tuple[int, int, int, int], int, str, int, int]]]:
+    """
+    Raw tile layout of an undecoded image, or None if rows cannot be read directly.
+    
+    Returns:
+        (extents, offset, rawmode, stride, orientation) per tile
+    """
+    tiles = []
+    for tile in img.tile:
+        name, extents, offset, args = tile[:4]
+        if name != 'raw' or getattr(img, 'fp', None) is None:
+            return None
+        if isinstance(args, str):
+            args = (args,)
+        rawmode = args[0]
+        stride = args[1] if len(args) > 1 else 0
+        orientation = args[2] if len(args) > 2 else 1
+        if not stride:
+            if rawmode not in _RAW_BYTES:
+                return None
+            stride = (extents[2] - extents[0]) * _RAW_BYTES[rawmode]
+        tiles.append((tuple(extents), offset, rawmode, stride, orientation or 1))
+    if img.getexif().get(0x0112, 1) != 1:
+        # Orientation is applied by load(); leave rotated files to it
+        return None
+    return tiles
+
+
+def _encode_frame_worker(
+    basis: BASIS,
+    size: Tuple[int, int],
+    data: bytes,
+    width: int,
+    height: int,
+    unchanged: Optional[bytearray] = None,
+    resample: str = 'lanczos',
+    engine: Optional[str] = None
+) -> List[List[Optional[str]]]:
+    """Encode one resized RGB frame in a worker process."""
+    frame = Image.frombytes('RGB', size, data)
+    encoder = CatpicEncoder(basis=basis, resample=resample, engine=engine)
+    return encoder._encode_cell_rows(frame, width, height, unchanged)
@@ -0,0 +1,629 @@
+"""
+Cell encoding engines and automatic engine selection.
+
+An engine splits the cells of a resized RGB image (exactly WIDTH×BASIS_X
+by HEIGHT×BASIS_Y pixels) into two colors. It yields one row of
+(pattern, fg_rgb, bg_rgb) glyphs per cell row, and CatpicEncoder and
+primitives.image_to_cells format or store them. All engines agree on
+cells holding at most two colors; cells with more colors may be split
+differently, but with the same kind of error as the reference.
+
+Engines:
+    pil      Reference EnGlyph algorithm: crop() and quantize() per cell
+    fast     Pure Python over one tobytes() buffer; no per-cell PIL objects
+    numpy    Vectorized split of all cells at once (requires NumPy)
+    process  The fast engine over bands of cell rows in a process pool
+    auto     Pick the engine predicted fastest for the image size and
+             BASIS among fast, numpy and process, from a small calibration
+             run cached on disk
+
+The default is the reference engine, so output does not change unless an
+engine is asked for with CatpicEncoder(engine=...), ``catpic --engine`` or
+the CATPIC_ENGINE environment variable. Extra engines can be added with
+register().
+
+Like catpic.core, this module imports neither Pillow nor multiprocessing
+at load time.
+"""
+
+import json
+import math
+import os
+import sys
+import threading
+import time
+from itertools import compress
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+    from PIL import Image
+
+RGB = Tuple[int, int, int]
+Glyph = Tuple[int, RGB, RGB]
+
+# Engine used when neither engine= nor CATPIC_ENGINE names one
+DEFAULT_ENGINE = "pil"
+
+# Cell grids timed per engine by the calibration run, smallest first
+CALIBRATION_SIZES = ((8, 4), (48, 24))
+
+CALIBRATION_FILE = "engines.json"
+
+# _ABOVE[m] is a bytes.translate() table mapping channel values above m to
+# 1 and the rest to 0
+_ABOVE = [bytes(m + 1) + b"\x01" * (255 - m) for m in range(256)]
+
+# Per cell size: foreground mask bytes (one 0/1 byte per pixel) -> pattern
+_PATTERNS: Dict[int, Dict[bytes, int]] = {}
+
+
+class Engine:
+    """
+    Base class for cell encoding engines.
+
+    Subclasses set ``name`` and implement encode(); available() reports
+    whether the engine's dependencies are installed.
+    """
+
+    name = ""
+
+    def available(self) -> bool:
+        """Whether the engine can run here."""
+        return True
+
+    def encode(
+        self,
+        img_resized: "Image.Image",
+        basis_x: int,
+        basis_y: int,
+        width: int,
+        height: int,
+        unchanged: Optional[bytearray] = None,
+        exact: bool = False
+    ) -> Iterator[List[Optional[Glyph]]]:
+        """
+        Split every cell of an already-resized RGB image into two colors.
+
+        Args:
+            unchanged: Optional WIDTH*HEIGHT mask; flagged cells may be
+                       skipped and yielded as None
+            exact: Hint that most cells hold at most two colors (nearest
+                   resampling), so splitting them exactly first pays off
+
+        Yields:
+            One list of (glut_index, fg_rgb, bg_rgb) per cell row
+        """
+        raise NotImplementedError
+
+
+class PilEngine(Engine):
+    """Reference engine: the EnGlyph algorithm with PIL quantize() per cell."""
+
+    name = "pil"
+
+    def encode(
+        self,
+        img_resized: "Image.Image",
+        basis_x: int,
+        basis_y: int,
+        width: int,
+        height: int,
+        unchanged: Optional[bytearray] = None,
+        exact: bool = False
+    ) -> Iterator[List[Optional[Glyph]]]:
+        from .primitives import _cell_values
+
+        data = img_resized.tobytes() if exact else b""
+        stride = img_resized.width * 3
+        for y in range(height):
+            row: List[Optional[Glyph]] = []
+            for x in range(width):
+                if unchanged is not None and unchanged[y * width + x]:
+                    row.append(None)
+                    continue
+                block_x = x * basis_x
+                block_y = y * basis_y
+                if exact:
+                    glyph = exact_glyph(data, stride, block_x, block_y, basis_x, basis_y)
+                    if glyph is not None:
+                        row.append(glyph)
+                        continue
+                row.append(_cell_values(img_resized.crop((
+                    block_x,
+                    block_y,
+                    block_x + basis_x,
+                    block_y + basis_y,
+                ))))
+            yield row
+
+
+class FastEngine(Engine):
+    """
+    Zero-dependency engine: stride arithmetic over one tobytes() buffer.
+
+    Splits cells exactly like the numpy engine, without per-cell PIL
+    objects. Each cell's pixel rows are sliced out of the image's pixel
+    rows and joined, so each channel is a stepped slice of the cell's
+    bytes. The midpoint split is a bytes.translate() through a threshold
+    table, the pattern is a table lookup on the resulting mask, and
+    foreground sums use itertools.compress().
+    """
+
+    name = "fast"
+
+    def encode(
+        self,
+        img_resized: "Image.Image",
+        basis_x: int,
+        basis_y: int,
+        width: int,
+        height: int,
+        unchanged: Optional[bytearray] = None,
+        exact: bool = False
+    ) -> Iterator[List[Optional[Glyph]]]:
+        data = img_resized.tobytes()
+        yield from split_rows(data, img_resized.width * 3, basis_x, basis_y, width, height, unchanged)
+
+
+class NumpyEngine(Engine):
+    """
+    Vectorized engine splitting all cells at once with NumPy.
+
+    Each cell is split on its widest RGB channel at the midpoint of that
+    channel's range; pixels above it are foreground. Centroids are
+    floored means, as in the reference.
+    """
+
+    name = "numpy"
+
+    def available(self) -> bool:
+        from importlib.util import find_spec
+
+        return find_spec("numpy") is not None
+
+    def encode(
+        self,
+        img_resized: "Image.Image",
+        basis_x: int,
+        basis_y: int,
+        width: int,
+        height: int,
+        unchanged: Optional[bytearray] = None,
+        exact: bool = False
+    ) -> Iterator[List[Optional[Glyph]]]:
+        if (basis_x, basis_y) == (1, 2):
+            # Nothing to split; reading the two pixels is memory bound anyway
+            yield from half_block_rows(img_resized.tobytes(), width, height, unchanged)
+            return
+
+        import numpy as np
+
+        n = basis_x * basis_y
+        pixels = np.frombuffer(img_resized.tobytes(), dtype=np.uint8)
+        # (row, pixel row, column, pixel column, channel) -> (row, column, pixel, channel)
+        cells = pixels.reshape(height, basis_y, width, basis_x, 3).transpose(0, 2, 1, 3, 4)
+        cells = cells.reshape(height, width, n, 3).astype(np.int32)
+
+        low = cells.min(axis=2)
+        high = cells.max(axis=2)
+        channel = (high - low).argmax(axis=2)[:, :, None]
+        middle = (np.take_along_axis(low, channel, 2) + np.take_along_axis(high, channel, 2)) // 2
+        values = np.take_along_axis(cells, channel[:, :, :, None], 3)[:, :, :, 0]
+        is_fg = values > middle
+
+        patterns = (is_fg << np.arange(n)).sum(axis=2)
+        fg_count = is_fg.sum(axis=2)[:, :, None]
+        fg_sum = (cells * is_fg[:, :, :, None]).sum(axis=2)
+        bg_sum = cells.sum(axis=2) - fg_sum
+        fg = np.where(fg_count > 0, fg_sum // np.maximum(fg_count, 1), 0)
+        bg = np.where(fg_count < n, bg_sum // np.maximum(n - fg_count, 1), 0)
+
+        patterns_list = patterns.tolist()
+        fg_list = fg.tolist()
+        bg_list = bg.tolist()
+        for y in range(height):
+            row: List[Optional[Glyph]] = []
+            for x in range(width):
+                if unchanged is not None and unchanged[y * width + x]:
+                    row.append(None)
+                else:
+                    row.append((patterns_list[y][x], tuple(fg_list[y][x]), tuple(bg_list[y][x])))  # type: ignore[arg-type]
+            yield row
+
+
+class ProcessEngine(Engine):
+    """
+    The fast engine over bands of cell rows in a shared process pool.
+
+    Pays off for large single images: animations already spread whole
+    frames over processes (encode_animation(workers=...)). Inside a worker
+    process it encodes in-process instead of nesting pools.
+    """
+
+    name = "process"
+
+    def encode(
+        self,
+        img_resized: "Image.Image",
+        basis_x: int,
+        basis_y: int,
+        width: int,
+        height: int,
+        unchanged: Optional[bytearray] = None,
+        exact: bool = False
+    ) -> Iterator[List[Optional[Glyph]]]:
+        import multiprocessing
+
+        jobs = os.cpu_count() or 1
+        if jobs < 2 or height < 2 or multiprocessing.parent_process() is not None:
+            yield from ENGINES["fast"].encode(img_resized, basis_x, basis_y, width, height, unchanged, exact)
+            return
+
+        band = math.ceil(height / jobs)
+        futures = []
+        for top in range(0, height, band):
+            rows = min(band, height - top)
+            strip = img_resized.crop((0, top * basis_y, width * basis_x, (top + rows) * basis_y))
+            mask = unchanged[top * width:(top + rows) * width] if unchanged is not None else None
+            futures.append(_pool().submit(
+                _encode_band, strip.size, strip.tobytes(), basis_x, basis_y, width, rows, mask, exact
+            ))
+        for future in futures:
+            yield from future.result()
+
+
+_POOL: Optional["ProcessPoolExecutor"] = None
+_POOL_LOCK = threading.Lock()
+
+
+def _pool() -> "ProcessPoolExecutor":
+    """Process pool shared by all process engine calls, started on first use."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            from concurrent.futures import ProcessPoolExecutor
+
+            _POOL = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+        return _POOL
+
+
+def _encode_band(
+    size: Tuple[int, int],
+    data: bytes,
+    basis_x: int,
+    basis_y: int,
+    width: int,
+    height: int,
+    unchanged: Optional[bytearray],
+    exact: bool
+) -> List[List[Optional[Glyph]]]:
+    """Encode one band of cell rows in a worker process."""
+    return list(split_rows(data, size[0] * 3, basis_x, basis_y, width, height, unchanged))
+
+
+def split_rows(
+    data: bytes,
+    stride: int,
+    basis_x: int,
+    basis_y: int,
+    width: int,
+    height: int,
+    unchanged: Optional[bytearray] = None
+) -> Iterator[List[Optional[Glyph]]]:
+    """
+    The fast engine's split over a raw RGB buffer of STRIDE bytes per row.
+
+    For callers that hold pixels but no PIL image, such as cell-space
+    rescaling (catpic.rescale).
+    """
+    if (basis_x, basis_y) == (1, 2):
+        yield from half_block_rows(data, width, height, unchanged)
+        return
+
+    n = basis_x * basis_y
+    patterns = _PATTERNS.get(n)
+    if patterns is None:
+        patterns = _PATTERNS[n] = {bytes(i >> b & 1 for b in range(n)): i for i in range(1 << n)}
+    above = _ABOVE
+
+    cell_bytes = basis_x * 3
+    for y in range(height):
+        top = y * basis_y * stride
+        pixel_rows = [data[top + r * stride:top + (r + 1) * stride] for r in range(basis_y)]
+        row: List[Optional[Glyph]] = []
+        for x in range(width):
+            if unchanged is not None and unchanged[y * width + x]:
+                row.append(None)
+                continue
+            start = x * cell_bytes
+            cell = b"".join([pixel_row[start:start + cell_bytes] for pixel_row in pixel_rows])
+            reds = cell[0::3]
+            greens = cell[1::3]
+            blues = cell[2::3]
+
+            # Split on the widest channel (first on ties) at its midpoint
+            low_r, high_r = min(reds), max(reds)
+            low_g, high_g = min(greens), max(greens)
+            low_b, high_b = min(blues), max(blues)
+            span_r, span_g, span_b = high_r - low_r, high_g - low_g, high_b - low_b
+            if span_r >= span_g and span_r >= span_b:
+                if not span_r:
+                    # Uniform cell: all background, like quantize()
+                    row.append((0, (0, 0, 0), (reds[0], greens[0], blues[0])))
+                    continue
+                mask = reds.translate(above[(low_r + high_r) >> 1])
+            elif span_g >= span_b:
+                mask = greens.translate(above[(low_g + high_g) >> 1])
+            else:
+                mask = blues.translate(above[(low_b + high_b) >> 1])
+
+            fg_count = mask.count(1)
+            bg_count = n - fg_count
+            fg_r = sum(compress(reds, mask))
+            fg_g = sum(compress(greens, mask))
+            fg_b = sum(compress(blues, mask))
+            row.append((
+                patterns[mask],
+                (fg_r // fg_count, fg_g // fg_count, fg_b // fg_count),
+                ((sum(reds) - fg_r) // bg_count, (sum(greens) - fg_g) // bg_count,
+                 (sum(blues) - fg_b) // bg_count),
+            ))
+        yield row
+
+
+def half_block_rows(
+    data: bytes,
+    width: int,
+    height: int,
+    unchanged: Optional[bytearray] = None
+) -> Iterator[List[Optional[Glyph]]]:
+    """
+    BASIS 1,2 glyphs read straight from the two pixels of each cell.
+
+    The top pixel is the foreground of pattern 1 (upper half) and the
+    bottom pixel its background, or pattern 3 (full block) when they are
+    equal, as CatpicEncoder and image_to_cells encode BASIS 1,2. DATA is
+    the resized image's tobytes().
+    """
+    stride = width * 3
+    for y in range(height):
+        top = data[2 * y * stride:(2 * y + 1) * stride]
+        bottom = data[(2 * y + 1) * stride:(2 * y + 2) * stride]
+        row: List[Optional[Glyph]] = []
+        for x in range(width):
+            if unchanged is not None and unchanged[y * width + x]:
+                row.append(None)
+                continue
+            i = 3 * x
+            fg = (top[i], top[i + 1], top[i + 2])
+            bg = (bottom[i], bottom[i + 1], bottom[i + 2])
+            row.append((3 if fg == bg else 1, fg, bg))
+        yield row
+
+
+def exact_glyph(
+    data: bytes,
+    stride: int,
+    block_x: int,
+    block_y: int,
+    basis_x: int,
+    basis_y: int
+) -> Optional[Glyph]:
+    """
+    Split a cell with at most two distinct colors without quantizing.
+
+    Such a cell is partitioned exactly by color, and each color is its own
+    centroid. The first pixel's color is the background.
+
+    Args:
+        data: tobytes() of the resized RGB image
+        stride: Bytes per pixel row of data
+
+    Returns:
+        (glut_index, fg_rgb, bg_rgb), or None if the cell has more than two
+        colors and needs quantizing
+    """
+    row_bytes = basis_x * 3
+    start = block_y * stride + block_x * 3
+    bg = data[start:start + 3]
+    fg = None
+    pattern = 0
+    bit = 1
+    for r in range(basis_y):
+        offset = start + r * stride
+        for i in range(offset, offset + row_bytes, 3):
+            color = data[i:i + 3]
+            if color != bg:
+                if fg is None:
+                    fg = color
+                elif color != fg:
+                    return None
+                pattern |= bit
+            bit <<= 1
+
+    bg_rgb = (bg[0], bg[1], bg[2])
+    return (pattern, (fg[0], fg[1], fg[2]) if fg is not None else bg_rgb, bg_rgb)
+
+
+# Registered engines by name, in order of preference for ties
+ENGINES: Dict[str, Engine] = {}
+
+
+def register(engine: Engine) -> Engine:
+    """Add an engine to the registry (replacing one of the same name)."""
+    ENGINES[engine.name] = engine
+    return engine
+
+
+for _engine in (PilEngine(), FastEngine(), NumpyEngine(), ProcessEngine()):
+    register(_engine)
+
+
+def engine_names() -> List[str]:
+    """Names accepted by get_engine(): "auto" and every available engine."""
+    return ["auto"] + [name for name, engine in ENGINES.items() if engine.available()]
+
+
+def check_engine(name: Optional[str]) -> str:
+    """
+    Resolve an engine name (None: CATPIC_ENGINE, else DEFAULT_ENGINE) and validate it.
+
+    Raises:
+        ValueError: Unknown engine, or its dependencies are not installed
+    """
+    if name is None:
+        name = os.environ.get("CATPIC_ENGINE") or DEFAULT_ENGINE
+    name = name.strip().lower()
+    if name == "auto":
+        return name
+    engine = ENGINES.get(name)
+    if engine is None:
+        raise ValueError(f"Unknown engine: {name}. Must be one of {engine_names()}")
+    if not engine.available():
+        raise ValueError(f"Engine {name} is not available here (missing dependency)")
+    return name
+
+
+def get_engine(name: Optional[str], basis_x: int, basis_y: int, cells: int) -> Engine:
+    """
+    Engine to encode an image of this many cells at this BASIS.
+
+    Args:
+        name: Engine name, "auto", or None for CATPIC_ENGINE / DEFAULT_ENGINE
+    """
+    name = check_engine(name)
+    if name == "auto":
+        name = select_engine(basis_x, basis_y, cells)
+    return ENGINES[name]
+
+
+def _candidates() -> List[str]:
+    """Engines auto may pick here (never the slow reference engine)."""
+    names = []
+    for name, engine in ENGINES.items():
+        if name == "pil" or not engine.available():
+            continue
+        if name == "process":
+            import multiprocessing
+
+            if (os.cpu_count() or 1) < 2 or multiprocessing.parent_process() is not None:
+                continue
+        names.append(name)
+    return names
+
+
+# Calibration results per BASIS ("x,y"), loaded once per process
+_CALIBRATION: Dict[str, Dict[str, List[float]]] = {}
+_CALIBRATION_LOCK = threading.Lock()
+
+
+def select_engine(basis_x: int, basis_y: int, cells: int) -> str:
+    """
+    Name of the engine predicted fastest for this BASIS and cell count.
+
+    Each engine's time is modelled as fixed overhead plus a per-cell cost,
+    both measured once per BASIS and engine by calibrate() and cached on
+    disk (see calibration_path()). Only engines missing from the cache are
+    timed, so a pool worker, which has no process engine to choose, reuses
+    the main process's measurements. With a single candidate nothing is
+    measured.
+    """
+    candidates = _candidates()
+    if len(candidates) == 1:
+        return candidates[0]
+
+    key = f"{basis_x},{basis_y}"
+    with _CALIBRATION_LOCK:
+        if not _CALIBRATION:
+            _CALIBRATION.update(_load_calibration())
+        costs = _CALIBRATION.setdefault(key, {})
+        missing = [name for name in candidates if name not in costs]
+        if missing:
+            costs.update(calibrate(basis_x, basis_y, missing))
+            _save_calibration()
+
+    return min(candidates, key=lambda name: costs[name][0] + costs[name][1] * cells)
+
+
+def calibrate(basis_x: int, basis_y: int, names: List[str]) -> Dict[str, List[float]]:
+    """
+    Time engines on synthetic noise at CALIBRATION_SIZES.
+
+    Returns:
+        {engine name: [overhead seconds, seconds per cell]}
+    """
+    from PIL import Image
+
+    big_w, big_h = CALIBRATION_SIZES[-1]
+    size = (big_w * basis_x, big_h * basis_y)
+    noise = Image.merge("RGB", [Image.effect_noise(size, 64) for _ in range(3)])
+    images = [
+        (noise.crop((0, 0, w * basis_x, h * basis_y)), w, h) for w, h in CALIBRATION_SIZES
+    ]
+
+    costs = {}
+    for name in names:
+        engine = ENGINES[name]
+        times = []
+        # The first (cold) run includes one-time costs such as pool startup
+        for img, w, h in [images[0]] + images:
+            start = time.perf_counter()
+            for _ in engine.encode(img, basis_x, basis_y, w, h):
+                pass
+            times.append(time.perf_counter() - start)
+        (small_w, small_h), (big_w, big_h) = CALIBRATION_SIZES[0], CALIBRATION_SIZES[-1]
+        per_cell = max((times[2] - times[1]) / (big_w * big_h - small_w * small_h), 1e-9)
+        costs[name] = [max(times[0] - per_cell * small_w * small_h, 0.0), per_cell]
+    return costs
+
+
+def calibration_path() -> str:
+    """Cache file: $XDG_CACHE_HOME/catpic/engines.json (default ~/.cache)."""
+    cache = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache, "catpic", CALIBRATION_FILE)
+
+
+def _calibration_key() -> str:
+    """Calibrations are reused only on the same version, Python and CPUs."""
+    from . import __version__
+
+    return "catpic {}; python {}.{}; cpus {}".format(
+        __version__, sys.version_info[0], sys.version_info[1], os.cpu_count()
+    )
+
+
+def _load_calibration() -> Dict[str, Dict[str, List[float]]]:
+    try:
+        with open(calibration_path(), encoding="utf-8") as f:
+            cached: Dict[str, Any] = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cached, dict) or cached.get("key") != _calibration_key():
+        return {}
+    bases = cached.get("bases")
+    if not isinstance(bases, dict):
+        return {}
+    return {key: costs for key, costs in bases.items() if isinstance(costs, dict)}
+
+
+def _save_calibration() -> None:
+    """
+    Merge this process's costs into the cache and write it atomically.
+
+    Engines another process measured since this one loaded the cache are
+    kept. An unwritable cache only costs a recalibration.
+    """
+    path = calibration_path()
+    bases = _load_calibration()
+    for key, costs in _CALIBRATION.items():
+        bases.setdefault(key, {}).update(costs)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp = f"{path}.{os.getpid()}.tmp"
+        with open(temp, "w", encoding="utf-8") as f:
+            json.dump({"key": _calibration_key(), "bases": bases}, f, indent=1)
+        os.replace(temp, path)
+    except OSError:
+        pass
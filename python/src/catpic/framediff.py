@@ -0,0 +1,132 @@
+"""
+Frame differencing for in-place terminal animation.
+
+Consecutive animation frames usually share most of their cells. Instead of
+rewriting every line of every frame, the player can compare frames cell by
+cell and emit cursor-addressed updates for only the spans that changed.
+
+All cursor movement is relative to the position saved with ``ESC[s`` at
+the start of playback, matching the full-frame redraw used by CatpicPlayer.
+"""
+
+import re
+from typing import List, Optional, Sequence, Tuple
+
+# An SGR escape sequence or a single printable character
+_TOKEN = re.compile(r"\x1b\[([0-9;]*)m|([^\x1b])", re.DOTALL)
+
+RESET = "\x1b[0m"
+
+Span = Tuple[int, int, int]  # (row, start_col, end_col), end exclusive
+
+
+def split_cells(line: str) -> List[str]:
+    """
+    Split an ANSI data line into self-contained cell strings.
+
+    Each returned string carries the SGR state active for that cell, the
+    character itself and a trailing reset, so any cell can be redrawn on its
+    own. For standard MEOW lines this is exactly the text of each cell.
+
+    Example:
+        >>> split_cells("\\x1b[38;2;1;2;3m\\x1b[48;2;4;5;6m▘\\x1b[0m")
+        ['\\x1b[38;2;1;2;3m\\x1b[48;2;4;5;6m▘\\x1b[0m']
+    """
+    cells = []
+    fg = bg = ""
+    other: List[str] = []
+    for match in _TOKEN.finditer(line):
+        params, char = match.groups()
+        if char is None:
+            if params in ("", "0"):
+                fg = bg = ""
+                other = []
+            elif params.startswith(("38;", "39")):
+                fg = match.group(0)
+            elif params.startswith(("48;", "49")):
+                bg = match.group(0)
+            else:
+                other.append(match.group(0))
+            continue
+        cells.append(f"{''.join(other)}{fg}{bg}{char}{RESET}")
+    return cells
+
+
+def changed_spans(
+    previous: Sequence[Sequence[str]],
+    current: Sequence[Sequence[str]],
+) -> List[Span]:
+    """
+    Find runs of cells that differ between two frames.
+
+    Args:
+        previous: Rows of cells from split_cells() for the frame on screen
+        current: Rows of cells for the frame to draw
+
+    Returns:
+        List of (row, start_col, end_col) spans. A row that got shorter
+        yields a span ending at the old row length so its tail is cleared.
+    """
+    spans = []
+    for row, cells in enumerate(current):
+        old = previous[row] if row < len(previous) else ()
+        width = max(len(cells), len(old))
+        start = None
+        for col in range(width):
+            same = col < len(cells) and col < len(old) and cells[col] == old[col]
+            if not same and start is None:
+                start = col
+            elif same and start is not None:
+                spans.append((row, start, col))
+                start = None
+        if start is not None:
+            spans.append((row, start, width))
+    return spans
+
+
+def cursor_to(row: int, col: int) -> str:
+    """Move from the saved origin to (row, col) of the animation area."""
+    move = "\x1b[u"
+    if row > 0:
+        move += f"\x1b[{row}B\x1b[G"
+    if col > 0:
+        move += f"\x1b[{col}C"
+    return move
+
+
+def full_frame(lines: Sequence[str], height: int) -> str:
+    """Redraw a whole frame line by line from the saved origin."""
+    output_buffer = ["\x1b[u"]
+    for idx, line in enumerate(lines):
+        if idx >= height:
+            break
+        # Line content, then clear to end of line (removes artifacts)
+        output_buffer.append(line)
+        output_buffer.append("\x1b[K")
+        # Move to next line (down 1, column 0) - but not after last line
+        if idx < height - 1:
+            output_buffer.append("\x1b[B\x1b[G")
+    return "".join(output_buffer)
+
+
+def diff_frame(
+    previous: Optional[Sequence[Sequence[str]]],
+    current: Sequence[Sequence[str]],
+) -> str:
+    """
+    Build terminal output that turns ``previous`` into ``current``.
+
+    Both frames are rows of cells from split_cells(). With no previous
+    frame the whole frame is drawn.
+    """
+    if previous is None:
+        return full_frame(["".join(cells) for cells in current], len(current))
+
+    output = []
+    for row, start, end in changed_spans(previous, current):
+        cells = current[row]
+        output.append(cursor_to(row, start))
+        output.append("".join(cells[start:end]))
+        if end > len(cells):
+            output.append("\x1b[K")
+    return "".join(output)
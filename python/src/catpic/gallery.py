@@ -0,0 +1,218 @@
+"""
+Contact-sheet (gallery) rendering of many images as a thumbnail grid.
+
+Tiles are encoded concurrently in a process pool and composited into
+terminal lines one grid row at a time. A row is written as soon as all of
+its tiles are done, so the first thumbnails appear while later ones are
+still being encoded.
+"""
+
+import os
+import shutil
+import sys
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, TextIO, Tuple, Union
+
+from PIL import Image
+
+from .core import BASIS
+from .encoder import CatpicEncoder
+
+# Default thumbnail width in characters
+DEFAULT_TILE_WIDTH = 24
+
+# Blank columns between tiles
+GAP = 2
+
+
+def gallery_layout(
+    count: int,
+    columns: Optional[int] = None,
+    tile_width: Optional[int] = None,
+    term_width: Optional[int] = None
+) -> Tuple[int, int]:
+    """
+    Fit a grid of thumbnails to the terminal width.
+
+    Args:
+        count: Number of images
+        columns: Fixed number of columns (tile width is derived from it)
+        tile_width: Fixed tile width in characters (columns are derived)
+        term_width: Terminal width (default: detected)
+
+    Returns:
+        (columns, tile_width)
+    """
+    if term_width is None:
+        term_width = shutil.get_terminal_size().columns
+
+    if columns is None:
+        if tile_width is None:
+            tile_width = DEFAULT_TILE_WIDTH
+        columns = max(1, (term_width + GAP) // (tile_width + GAP))
+    elif tile_width is None:
+        tile_width = max(1, (term_width + GAP) // columns - GAP)
+
+    return max(1, min(columns, count)), tile_width
+
+
+def fit_tile(image_size: Tuple[int, int], tile_width: int, tile_height: int) -> Tuple[int, int]:
+    """Largest cell size with the image's aspect ratio inside the tile."""
+    img_width, img_height = image_size
+    # Character cells are about twice as tall as wide
+    aspect = img_height / img_width * 0.5
+    width = tile_width
+    height = round(width * aspect)
+    if height > tile_height:
+        height = tile_height
+        width = round(height / aspect)
+    return max(1, min(width, tile_width)), max(1, height)
+
+
+def render_tile(
+    basis: BASIS,
+    path: Union[str, Path],
+    tile_width: int,
+    tile_height: int
+) -> List[str]:
+    """
+    Encode one thumbnail as ANSI lines (first frame of animations).
+
+    Unreadable files produce a blank tile instead of raising.
+    """
+    encoder = CatpicEncoder(basis=basis)
+    try:
+        with Image.open(path) as img:
+            width, height = fit_tile(img.size, tile_width, tile_height)
+            basis_x, basis_y = basis.value
+            # Let JPEG decode at reduced scale when that is enough
+            img.draft("RGB", (width * basis_x, height * basis_y))
+            img_resized, width, height = encoder.prepare_image(img, width, height)
+    except Exception:
+        return []
+
+    return encoder._encode_cells(img_resized, width, height)
+
+
+def compose_row(
+    tiles: Sequence[List[str]],
+    names: Sequence[str],
+    tile_width: int,
+    captions: bool = True
+) -> List[str]:
+    """
+    Composite tiles side by side into terminal lines.
+
+    Each tile is centered in its column and padded with spaces; tiles
+    shorter than the tallest are padded with blank lines at the bottom.
+    """
+    height = max((len(tile) for tile in tiles), default=0)
+    blank = " " * tile_width
+    columns = []
+    for tile in tiles:
+        # Every cell is one character wide, so the visible width is known
+        cell_width = len(tile[0].split("\x1b[0m")) - 1 if tile else 0
+        left = (tile_width - cell_width) // 2
+        right = tile_width - cell_width - left
+        lines = [" " * left + line + " " * right for line in tile]
+        columns.append(lines + [blank] * (height - len(lines)))
+
+    gap = " " * GAP
+    rows = [gap.join(parts).rstrip() for parts in zip(*columns)]
+    if captions:
+        labels = [_caption(name, tile_width) for name in names]
+        rows.append(gap.join(labels).rstrip())
+    return rows
+
+
+def _caption(name: str, width: int) -> str:
+    if len(name) > width:
+        name = name[:max(0, width - 1)] + "…"
+    return name.center(width)
+
+
+def iter_gallery_rows(
+    paths: Sequence[Union[str, Path]],
+    basis: BASIS,
+    columns: int,
+    tile_width: int,
+    tile_height: Optional[int] = None,
+    jobs: Optional[int] = None,
+    captions: bool = True
+) -> Iterator[List[str]]:
+    """
+    Encode thumbnails and yield the lines of each grid row in order.
+
+    All tiles are queued on the pool up front; rows are yielded as soon as
+    their own tiles finish, regardless of later rows.
+    """
+    if tile_height is None:
+        tile_height = max(1, tile_width // 2)
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    names = [Path(path).name for path in paths]
+    starts = range(0, len(paths), columns)
+
+    if jobs <= 1:
+        for start in starts:
+            tiles = [
+                render_tile(basis, path, tile_width, tile_height)
+                for path in paths[start:start + columns]
+            ]
+            yield compose_row(tiles, names[start:start + columns], tile_width, captions)
+        return
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures: List[Future] = [
+            pool.submit(render_tile, basis, path, tile_width, tile_height) for path in paths
+        ]
+        try:
+            for start in starts:
+                tiles = [future.result() for future in futures[start:start + columns]]
+                yield compose_row(tiles, names[start:start + columns], tile_width, captions)
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+def render_gallery(
+    sources: Union[str, Path, Sequence[Union[str, Path]]],
+    out: Optional[TextIO] = None,
+    basis: Optional[Union[BASIS, Tuple[int, int]]] = None,
+    columns: Optional[int] = None,
+    tile_width: Optional[int] = None,
+    jobs: Optional[int] = None,
+    captions: bool = True
+) -> int:
+    """
+    Print a contact sheet of images, one grid row at a time.
+
+    Args:
+        sources: Directory, glob pattern, file, or a sequence of these
+        out: Text stream to write to (default: stdout)
+        basis: BASIS level (default: CATPIC_BASIS env var or 2,2)
+        columns: Number of columns (default: as many as fit the terminal)
+        tile_width: Thumbnail width in characters (default: 24, or derived
+                    from columns)
+        jobs: Worker processes (default: CPU count)
+        captions: Print file names under each row
+
+    Returns:
+        Number of images shown
+
+    Example:
+        >>> render_gallery('photos/', columns=4)
+    """
+    from .batch import collect_sources
+
+    if out is None:
+        out = sys.stdout
+    paths = collect_sources(sources)
+    encoder_basis = CatpicEncoder(basis=basis).basis
+    columns, tile_width = gallery_layout(len(paths), columns, tile_width)
+
+    for rows in iter_gallery_rows(paths, encoder_basis, columns, tile_width, jobs=jobs, captions=captions):
+        out.write("\n".join(rows) + "\n")
+        out.flush()
+    return len(paths)
@@ -10,11 +10,18 @@ Use these to build custom TUI graphics, animations, or integrate with
 frameworks like Textual. The high-level encoder uses these internally.
 """
 
-from typing import Dict, List, Optional, Tuple, Union
+import math
+from array import array
+from collections.abc import Sequence
+from itertools import chain
+from typing import Dict, Iterator, List, Optional, Tuple, Union, overload
 
 from PIL import Image
 
+from . import trace
 from .core import BASIS, CatpicCore
+from .engines import get_engine
+from .framediff import cursor_to
 
 
 class Cell:
@@ -33,6 +40,8 @@ class Cell:
         pattern: Bit pattern index (0 to 2^(basis_x*basis_y)-1)
     """
     
+    __slots__ = ('char', 'fg_rgb', 'bg_rgb', 'pattern')
+    
     def __init__(
         self,
         char: str,
@@ -53,6 +62,322 @@ class Cell:
         return f"Cell('{self.char}', fg={self.fg_rgb}, bg={self.bg_rgb}, pattern={self.pattern})"
 
 
+# One cell in the same format as CatpicCore.format_cell, for bulk rendering
+_CELL_TEMPLATE = "\x1b[38;2;%d;%d;%dm\x1b[48;2;%d;%d;%dm%s\x1b[0m"
+
+
+class CellGrid:
+    """
+    Compact 2D grid of mosaic cells stored as parallel arrays.
+    
+    Instead of one Cell object per position, a grid keeps struct-of-arrays
+    storage: pattern indices and glyph indices (into the grid's GLUT) as
+    byte arrays, and foreground/background colors as packed RGB
+    bytearrays. A 200×100 grid is about 160 KB instead of tens of
+    thousands of Python objects.
+    
+    For compatibility with List[List[Cell]] code, ``grid[y]`` is a row
+    view, ``grid[y][x]`` is a write-through CellView, and iterating yields
+    rows. Assigning to a view's attributes goes through set_cell().
+    
+    Attributes:
+        width: Width in cells
+        height: Height in cells
+        glut: Character lookup table glyph indices refer to
+        patterns: Bit pattern per cell (row-major)
+        glyphs: GLUT index per cell (row-major)
+        fg: Foreground colors, 3 bytes per cell (row-major)
+        bg: Background colors, 3 bytes per cell (row-major)
+    
+    Example:
+        >>> grid = image_to_cells(img, 80, 40, basis=BASIS.BASIS_2_2)
+        >>> grid[0][0].fg_rgb
+        (255, 0, 0)
+        >>> grid[0][0].fg_rgb = (0, 0, 255)  # Edits the grid
+        >>> lines = grid.to_ansi_lines()
+    """
+    
+    __slots__ = ('width', 'height', 'glut', 'patterns', 'glyphs', 'fg', 'bg',
+                 '_x0', '_y0', '_stride', '_dirty', '_dirty_rows')
+    
+    def __init__(self, width: int, height: int, glut: List[str]):
+        n = width * height
+        self.width = width
+        self.height = height
+        self.glut = glut
+        self.patterns = array('B', bytes(n))
+        self.glyphs = array('B', bytes(n))
+        self.fg = bytearray(3 * n)
+        self.bg = bytearray(3 * n)
+        # Origin and row stride within the arrays (non-trivial for regions)
+        self._x0 = 0
+        self._y0 = 0
+        self._stride = width
+        # Cells changed since the last render_dirty(); a new grid has not
+        # been drawn yet, so everything starts dirty
+        self._dirty = bytearray(b'\x01' * n)
+        self._dirty_rows = set(range(height))
+    
+    @classmethod
+    def from_cells(cls, cells: List[List[Cell]], glut: List[str]) -> "CellGrid":
+        """Build a grid from a List[List[Cell]] using the given GLUT."""
+        height = len(cells)
+        width = len(cells[0]) if height else 0
+        grid = cls(width, height, glut)
+        for y, row in enumerate(cells):
+            for x, cell in enumerate(row):
+                grid.set_cell(x, y, cell.pattern, cell.fg_rgb, cell.bg_rgb)
+        return grid
+    
+    def _offset(self, x: int, y: int) -> int:
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            raise IndexError(f"Cell ({x}, {y}) outside {self.width}×{self.height} grid")
+        return (self._y0 + y) * self._stride + self._x0 + x
+    
+    def set_cell(
+        self,
+        x: int,
+        y: int,
+        pattern: int,
+        fg_rgb: Tuple[int, int, int],
+        bg_rgb: Tuple[int, int, int],
+    ) -> None:
+        """
+        Store a cell; the glyph is glut[pattern], clamped like process_cell.
+        
+        The cell is marked dirty only if its contents actually change.
+        """
+        i = self._offset(x, y)
+        fg = bytes(fg_rgb)
+        bg = bytes(bg_rgb)
+        if (
+            self.patterns[i] == pattern
+            and self.fg[3 * i:3 * i + 3] == fg
+            and self.bg[3 * i:3 * i + 3] == bg
+        ):
+            return
+        self.patterns[i] = pattern
+        self.glyphs[i] = min(pattern, len(self.glut) - 1)
+        self.fg[3 * i:3 * i + 3] = fg
+        self.bg[3 * i:3 * i + 3] = bg
+        self._dirty[i] = 1
+        self._dirty_rows.add(self._y0 + y)
+    
+    def mark_dirty(
+        self,
+        x: int = 0,
+        y: int = 0,
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+    ) -> None:
+        """Force a rectangle (default: the whole grid) to be redrawn."""
+        width = self.width - x if width is None else width
+        height = self.height - y if height is None else height
+        for row in range(y, y + height):
+            start = self._offset(x, row)
+            self._dirty[start:start + width] = b'\x01' * width
+            self._dirty_rows.add(self._y0 + row)
+    
+    def clear_dirty(self) -> None:
+        """Mark every cell of this grid as drawn."""
+        for row in range(self.height):
+            start = self._offset(0, row) if self.width else 0
+            self._dirty[start:start + self.width] = bytes(self.width)
+            # A narrower region view may leave dirty cells elsewhere in the row
+            line = (self._y0 + row) * self._stride
+            if 1 not in self._dirty[line:line + self._stride]:
+                self._dirty_rows.discard(self._y0 + row)
+    
+    def dirty_spans(self) -> List[Tuple[int, int, int]]:
+        """
+        Runs of dirty cells as (row, start_col, end_col), end exclusive.
+        
+        Coordinates are relative to this grid (or region view).
+        """
+        spans = []
+        for abs_row in sorted(self._dirty_rows):
+            y = abs_row - self._y0
+            if not 0 <= y < self.height:
+                continue
+            start = self._offset(0, y)
+            flags = self._dirty[start:start + self.width]
+            x = flags.find(1)
+            while x != -1:
+                end = flags.find(0, x)
+                if end == -1:
+                    end = self.width
+                spans.append((y, x, end))
+                x = flags.find(1, end)
+        return spans
+    
+    def cell(self, x: int, y: int) -> "CellView":
+        """Write-through view of position (x, y)."""
+        self._offset(x, y)
+        return CellView(self, x, y)
+    
+    def row(self, y: int) -> "CellRow":
+        """Row view of the grid."""
+        if y < 0:
+            y += self.height
+        if not 0 <= y < self.height:
+            raise IndexError(f"Row {y} outside grid of height {self.height}")
+        return CellRow(self, y)
+    
+    def region(self, x: int, y: int, width: int, height: int) -> "CellGrid":
+        """
+        View of a sub-rectangle sharing this grid's storage.
+        
+        Changes through either grid are visible in both.
+        """
+        if x < 0 or y < 0 or x + width > self.width or y + height > self.height:
+            raise IndexError(f"Region ({x}, {y}, {width}, {height}) outside grid")
+        view = CellGrid.__new__(CellGrid)
+        view.width = width
+        view.height = height
+        view.glut = self.glut
+        view.patterns = self.patterns
+        view.glyphs = self.glyphs
+        view.fg = self.fg
+        view.bg = self.bg
+        view._x0 = self._x0 + x
+        view._y0 = self._y0 + y
+        view._stride = self._stride
+        view._dirty = self._dirty
+        view._dirty_rows = self._dirty_rows
+        return view
+    
+    def __len__(self) -> int:
+        return self.height
+    
+    def __getitem__(self, y: int) -> "CellRow":
+        return self.row(y)
+    
+    def __iter__(self) -> Iterator["CellRow"]:
+        for y in range(self.height):
+            yield CellRow(self, y)
+    
+    def row_ansi(self, y: int, start: int = 0, end: Optional[int] = None) -> str:
+        """Render cells start..end of row y to ANSI without building Cells."""
+        if end is None:
+            end = self.width
+        if end <= start:
+            return ""
+        i = self._offset(start, y)
+        j = i + (end - start)
+        fg, bg = self.fg, self.bg
+        glut = self.glut
+        chars = [glut[g] for g in self.glyphs[i:j]]
+        values = chain.from_iterable(zip(
+            fg[3 * i:3 * j:3], fg[3 * i + 1:3 * j:3], fg[3 * i + 2:3 * j:3],
+            bg[3 * i:3 * j:3], bg[3 * i + 1:3 * j:3], bg[3 * i + 2:3 * j:3],
+            chars,
+        ))
+        return (_CELL_TEMPLATE * (end - start)) % tuple(values)
+    
+    def to_ansi_lines(self) -> List[str]:
+        """Render the grid to ANSI lines (bulk path of cells_to_ansi_lines)."""
+        return [self.row_ansi(y) for y in range(self.height)]
+    
+    def __repr__(self) -> str:
+        return f"CellGrid({self.width}×{self.height}, glut={len(self.glut)} glyphs)"
+
+
+class CellView(Cell):
+    """
+    Write-through view of one CellGrid position.
+    
+    Reads come straight from the grid's arrays and assignments go through
+    CellGrid.set_cell(), so ``grid[y][x].fg_rgb = (255, 0, 0)`` edits the
+    grid (and marks the cell dirty) just like a List[List[Cell]] would.
+    Assigning ``char`` selects the matching GLUT pattern.
+    """
+    
+    __slots__ = ('grid', 'x', 'y')
+    
+    def __init__(self, grid: CellGrid, x: int, y: int):
+        self.grid = grid
+        self.x = x
+        self.y = y
+    
+    @property  # type: ignore[override]
+    def char(self) -> str:
+        return self.grid.glut[self.grid.glyphs[self.grid._offset(self.x, self.y)]]
+    
+    @char.setter
+    def char(self, value: str) -> None:
+        try:
+            pattern = self.grid.glut.index(value)
+        except ValueError:
+            raise ValueError(f"Character {value!r} is not in the grid's GLUT") from None
+        self.grid.set_cell(self.x, self.y, pattern, self.fg_rgb, self.bg_rgb)
+    
+    @property  # type: ignore[override]
+    def pattern(self) -> int:
+        return self.grid.patterns[self.grid._offset(self.x, self.y)]
+    
+    @pattern.setter
+    def pattern(self, value: int) -> None:
+        self.grid.set_cell(self.x, self.y, value, self.fg_rgb, self.bg_rgb)
+    
+    @property  # type: ignore[override]
+    def fg_rgb(self) -> Tuple[int, int, int]:
+        i = 3 * self.grid._offset(self.x, self.y)
+        fg = self.grid.fg
+        return (fg[i], fg[i + 1], fg[i + 2])
+    
+    @fg_rgb.setter
+    def fg_rgb(self, value: Tuple[int, int, int]) -> None:
+        self.grid.set_cell(self.x, self.y, self.pattern, value, self.bg_rgb)
+    
+    @property  # type: ignore[override]
+    def bg_rgb(self) -> Tuple[int, int, int]:
+        i = 3 * self.grid._offset(self.x, self.y)
+        bg = self.grid.bg
+        return (bg[i], bg[i + 1], bg[i + 2])
+    
+    @bg_rgb.setter
+    def bg_rgb(self, value: Tuple[int, int, int]) -> None:
+        self.grid.set_cell(self.x, self.y, self.pattern, self.fg_rgb, value)
+    
+    def snapshot(self) -> Cell:
+        """Detached Cell copy of the current contents."""
+        return Cell(self.char, self.fg_rgb, self.bg_rgb, self.pattern)
+
+
+class CellRow(Sequence):  # type: ignore[type-arg]
+    """Row view of a CellGrid; items are write-through CellViews."""
+    
+    __slots__ = ('grid', 'y')
+    
+    def __init__(self, grid: CellGrid, y: int):
+        self.grid = grid
+        self.y = y
+    
+    def __len__(self) -> int:
+        return self.grid.width
+    
+    @overload
+    def __getitem__(self, x: int) -> CellView: ...
+    
+    @overload
+    def __getitem__(self, x: slice) -> List[CellView]: ...
+    
+    def __getitem__(self, x: Union[int, slice]) -> Union[CellView, List[CellView]]:
+        if isinstance(x, slice):
+            return [self.grid.cell(i, self.y) for i in range(*x.indices(len(self)))]
+        if x < 0:
+            x += self.grid.width
+        return self.grid.cell(x, self.y)
+    
+    def __iter__(self) -> Iterator[CellView]:
+        for x in range(self.grid.width):
+            yield CellView(self.grid, x, self.y)
+    
+    def to_ansi(self) -> str:
+        """Render this row to ANSI."""
+        return self.grid.row_ansi(self.y)
+
+
 # Glyph Lookup Tables (GLUT)
 # These map bit patterns to Unicode characters
 
@@ -147,9 +472,15 @@ def quantize_cell(
     # Quantize to 2 colors using median cut
     duotone = cell_img.quantize(colors=2)
     
+    # Raw bytes rather than getdata(): one palette index per pixel, and the
+    # original pixels as tuples
+    classes = duotone.tobytes()
+    bands = len(cell_img.getbands())
+    raw = cell_img.tobytes()
+    
     # Classify each pixel and collect original colors
-    for idx, pixel_class in enumerate(list(duotone.getdata())):
-        original_pixel = cell_img.getdata()[idx]
+    for idx, pixel_class in enumerate(classes):
+        original_pixel = tuple(raw[idx * bands:(idx + 1) * bands])
         if pixel_class:  # Foreground
             fg_pixels.append(original_pixel)
         else:  # Background
@@ -157,7 +488,7 @@ def quantize_cell(
     
     # Generate bit pattern (True = foreground)
     pattern_bits = [
-        bool(pixel_class) for pixel_class in duotone.getdata()
+        bool(pixel_class) for pixel_class in classes
     ]
     
     return pattern_bits, fg_pixels, bg_pixels
@@ -240,18 +571,41 @@ def process_cell(
         >>> glut = get_pips_glut(2, 2)
         >>> cell = process_cell(cell_img, glut)
     """
+    pattern_idx, fg_color, bg_color = _cell_values(cell_img)
+    char = glut[min(pattern_idx, len(glut) - 1)]
+    return Cell(char, fg_color, bg_color, pattern_idx)
+
+
+def _cell_values(
+    cell_img: Image.Image,
+) -> Tuple[int, Tuple[int, int, int], Tuple[int, int, int]]:
+    """Pattern index and fg/bg centroids of a block, without building a Cell."""
     # Quantize and classify pixels
     pattern_bits, fg_pixels, bg_pixels = quantize_cell(cell_img)
     
-    # Generate character index and select from GLUT
-    pattern_idx = pattern_to_index(pattern_bits)
-    char = glut[min(pattern_idx, len(glut) - 1)]
-    
-    # Compute colors
-    fg_color = compute_centroid(fg_pixels)
-    bg_color = compute_centroid(bg_pixels)
-    
-    return Cell(char, fg_color, bg_color, pattern_idx)
+    # Generate character index and compute colors
+    return (
+        pattern_to_index(pattern_bits),
+        compute_centroid(fg_pixels),
+        compute_centroid(bg_pixels),
+    )
+
+
+def _basis_for_glut(glut: List[str]) -> Tuple[int, int]:
+    """Infer BASIS dimensions from GLUT size."""
+    num_patterns = len(glut)
+    # Find basis that produces this many patterns (2^(x*y))
+    total_bits = int(math.log2(num_patterns))
+    # Common basis dimensions
+    if total_bits == 2:  # 4 patterns
+        return 1, 2
+    elif total_bits == 4:  # 16 patterns
+        return 2, 2
+    elif total_bits == 6:  # 64 patterns
+        return 2, 3
+    elif total_bits == 8:  # 256 patterns
+        return 2, 4
+    raise ValueError(f"Cannot infer BASIS from GLUT size {num_patterns}")
 
 
 def image_to_cells(
@@ -260,7 +614,8 @@ def image_to_cells(
     height: int,
     glut: Optional[List[str]] = None,
     basis: Optional[BASIS] = None,
-) -> List[List[Cell]]:
+    engine: Optional[str] = None,
+) -> CellGrid:
     """
     Convert PIL Image to 2D grid of mosaic Cells.
     
@@ -273,9 +628,11 @@ def image_to_cells(
         height: Output height in terminal characters
         glut: Character lookup table (optional, uses full blocks if None)
         basis: BASIS level (required if glut not provided)
+        engine: Cell encoding engine (see catpic.engines); None uses
+                CATPIC_ENGINE or 'pil'
     
     Returns:
-        2D list: cells[y][x] = Cell
+        CellGrid: cells[y][x] = CellView (array-backed, see CellGrid)
     
     Examples:
         >>> # Default (full blocks, BASIS 2,2)
@@ -302,22 +659,7 @@ def image_to_cells(
         glut = get_full_glut(basis)
         basis_x, basis_y = basis.value
     else:
-        # Infer basis from GLUT size
-        num_patterns = len(glut)
-        # Find basis that produces this many patterns (2^(x*y))
-        import math
-        total_bits = int(math.log2(num_patterns))
-        # Common basis dimensions
-        if total_bits == 2:  # 4 patterns
-            basis_x, basis_y = 1, 2
-        elif total_bits == 4:  # 16 patterns
-            basis_x, basis_y = 2, 2
-        elif total_bits == 6:  # 64 patterns
-            basis_x, basis_y = 2, 3
-        elif total_bits == 8:  # 256 patterns
-            basis_x, basis_y = 2, 4
-        else:
-            raise ValueError(f"Cannot infer BASIS from GLUT size {num_patterns}")
+        basis_x, basis_y = _basis_for_glut(glut)
     
     # Convert to RGB
     if image.mode != 'RGB':
@@ -326,38 +668,66 @@ def image_to_cells(
     # Resize to exact pixel dimensions
     pixel_width = width * basis_x
     pixel_height = height * basis_y
-    img_resized = image.resize((pixel_width, pixel_height), Image.Resampling.LANCZOS)
+    with trace.stage("cells.resize"):
+        img_resized = image.resize((pixel_width, pixel_height), Image.Resampling.LANCZOS)
     
     # Process each cell
-    cells = []
-    for y in range(height):
-        row = []
-        for x in range(width):
-            # Extract pixel block
-            block_x = x * basis_x
-            block_y = y * basis_y
-            cell_img = img_resized.crop((
-                block_x,
-                block_y,
-                block_x + basis_x,
-                block_y + basis_y,
-            ))
-            
-            # Process to Cell
-            cell = process_cell(cell_img, glut)
-            row.append(cell)
-        
-        cells.append(row)
+    cells = CellGrid(width, height, glut)
+    if (basis_x, basis_y) == (1, 2):
+        with trace.stage("cells.quantize"):
+            _fill_half_blocks(cells, img_resized)
+        trace.count("cells_encoded", width * height)
+        return cells
+    
+    cell_engine = get_engine(engine, basis_x, basis_y, width * height)
+    with trace.stage("cells.quantize"):
+        for y, glyphs in enumerate(cell_engine.encode(img_resized, basis_x, basis_y, width, height)):
+            for x, glyph in enumerate(glyphs):
+                # Store straight into the grid's arrays
+                cells.set_cell(x, y, *glyph)  # type: ignore[misc]
+    trace.count("cells_encoded", width * height)
     
     return cells
 
 
-def cells_to_ansi_lines(cells: List[List[Cell]]) -> List[str]:
+def _fill_half_blocks(cells: CellGrid, img_resized: Image.Image) -> None:
+    """
+    Fill a new grid from a resized RGB image at BASIS 1,2.
+    
+    Each cell is exactly two pixels, so no quantization is needed: the top
+    pixel is the foreground and the bottom pixel the background of pattern
+    1 (upper half), or pattern 3 (full block) when they are equal. Pixel
+    rows are copied straight into the grid's color arrays.
+    """
+    data = img_resized.tobytes()
+    width = cells.width
+    stride = width * 3
+    upper = min(1, len(cells.glut) - 1)
+    full = min(3, len(cells.glut) - 1)
+    for y in range(cells.height):
+        top = data[2 * y * stride:(2 * y + 1) * stride]
+        bottom = data[(2 * y + 1) * stride:(2 * y + 2) * stride]
+        cells.fg[y * stride:(y + 1) * stride] = top
+        cells.bg[y * stride:(y + 1) * stride] = bottom
+        for x in range(width):
+            i = y * width + x
+            if top[3 * x:3 * x + 3] == bottom[3 * x:3 * x + 3]:
+                cells.patterns[i] = 3
+                cells.glyphs[i] = full
+            else:
+                cells.patterns[i] = 1
+                cells.glyphs[i] = upper
+
+
+def cells_to_ansi_lines(cells: Union[CellGrid, List[List[Cell]]]) -> List[str]:
     """
     Convert 2D Cell grid to ANSI-formatted text lines.
     
+    CellGrid input is rendered in bulk straight from its arrays; a plain
+    List[List[Cell]] is rendered cell by cell.
+    
     Args:
-        cells: 2D list from image_to_cells()
+        cells: CellGrid from image_to_cells(), or a 2D list of Cells
     
     Returns:
         List of strings (one per row) with ANSI codes
@@ -368,11 +738,126 @@ def cells_to_ansi_lines(cells: List[List[Cell]]) -> List[str]:
         >>> for line in lines:
         ...     print(line)  # Displays in terminal
     """
-    lines = []
-    for row in cells:
-        line_parts = [cell.to_ansi() for cell in row]
-        lines.append(''.join(line_parts))
-    return lines
+    with trace.stage("cells.format"):
+        if isinstance(cells, CellGrid):
+            return cells.to_ansi_lines()
+        
+        lines = []
+        for row in cells:
+            line_parts = [cell.to_ansi() for cell in row]
+            lines.append(''.join(line_parts))
+        return lines
+
+
+# Radius of the LANCZOS kernel: output pixels when downscaling, source
+# pixels when upscaling
+_LANCZOS_SUPPORT = 3
+
+
+def update_region(
+    cells: CellGrid,
+    image: Image.Image,
+    x: int,
+    y: int,
+    width: int,
+    height: int,
+    engine: Optional[str] = None,
+) -> None:
+    """
+    Re-encode one rectangle of cells from a changed source image.
+    
+    The rectangle should cover the cells behind the changed source pixels.
+    LANCZOS spreads each source pixel over a few output pixels, so cells
+    within the filter's reach around the rectangle are re-encoded too.
+    Only that area is resampled, at the same scale as the whole grid, and
+    only cells whose contents change are marked dirty. Pair with
+    render_dirty() to redraw just those cells.
+    
+    At integer scale factors the result matches a full image_to_cells.
+    At other scales the resampled patch can differ from a full resize by
+    rounding (one intensity level on a few pixels), so an occasional cell
+    may differ slightly from a fresh encode.
+    
+    Args:
+        cells: Grid previously produced by image_to_cells() for this image
+        image: Source image at its original size, with changes applied
+        x, y: Top-left cell of the rectangle
+        width, height: Rectangle size in cells
+        engine: Cell encoding engine, as for image_to_cells()
+    
+    Example:
+        >>> grid = image_to_cells(img, 80, 40, basis=BASIS.BASIS_2_2)
+        >>> draw.rectangle((100, 50, 120, 70), fill='red')  # Edit img
+        >>> update_region(grid, img, 20, 8, 6, 5)
+        >>> sys.stdout.write(render_dirty(grid, origin=(1, 1)))
+    """
+    if width <= 0 or height <= 0:
+        return
+    basis_x, basis_y = _basis_for_glut(cells.glut)
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    
+    # Source pixels per output pixel at the grid's scale
+    scale_x = image.width / (cells.width * basis_x)
+    scale_y = image.height / (cells.height * basis_y)
+    
+    # Widen by the filter's reach in output pixels (plus one for window
+    # rounding), converted to cells
+    margin_x = math.ceil((_LANCZOS_SUPPORT * max(1.0, 1 / scale_x) + 1) / basis_x)
+    margin_y = math.ceil((_LANCZOS_SUPPORT * max(1.0, 1 / scale_y) + 1) / basis_y)
+    x0, y0 = max(0, x - margin_x), max(0, y - margin_y)
+    x1 = min(cells.width, x + width + margin_x)
+    y1 = min(cells.height, y + height + margin_y)
+    if x1 <= x0 or y1 <= y0:
+        return
+    
+    # Source box for the widened rectangle
+    box = (
+        x0 * basis_x * scale_x,
+        y0 * basis_y * scale_y,
+        x1 * basis_x * scale_x,
+        y1 * basis_y * scale_y,
+    )
+    patch = image.resize(
+        ((x1 - x0) * basis_x, (y1 - y0) * basis_y),
+        Image.Resampling.LANCZOS,
+        box=box,
+    )
+    
+    patch_engine = get_engine(engine, basis_x, basis_y, (x1 - x0) * (y1 - y0))
+    for cy, glyphs in enumerate(patch_engine.encode(patch, basis_x, basis_y, x1 - x0, y1 - y0)):
+        for cx, glyph in enumerate(glyphs):
+            cells.set_cell(x0 + cx, y0 + cy, *glyph)  # type: ignore[misc]
+
+
+def render_dirty(
+    cells: CellGrid,
+    origin: Optional[Tuple[int, int]] = None,
+) -> str:
+    """
+    Render only the dirty spans of a grid, with cursor positioning.
+    
+    Clears the grid's dirty state. A new grid is entirely dirty, so the
+    first call draws everything.
+    
+    Args:
+        cells: CellGrid to render
+        origin: (row, col) terminal position of the grid's top-left cell,
+                1-based. If None, positions are relative to the cursor
+                position saved with ESC[s (as CatpicPlayer does).
+    
+    Returns:
+        ANSI string that updates the changed cells in place
+    """
+    output = []
+    for row, start, end in cells.dirty_spans():
+        if origin is None:
+            output.append(cursor_to(row, start))
+        else:
+            output.append(f"\x1b[{origin[0] + row};{origin[1] + start}H")
+        output.append(cells.row_ansi(row, start, end))
+    cells.clear_dirty()
+    return ''.join(output)
 
 
 # Convenience function for quick experiments
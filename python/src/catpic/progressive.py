@@ -0,0 +1,147 @@
+"""
+Progressive display: a coarse preview first, the full render over it.
+
+For interactive browsing, showing something quickly matters more than
+full quality. ProgressiveRender starts the full encode in a background
+thread and waits up to a deadline for it. If it is not done by then, a
+draft render (CatpicEncoder.encode_draft(): BASIS 1,2 from a reduced
+decode) is shown, and redrawn in place at the requested BASIS once the
+full encode finishes. Images that encode within the deadline are drawn
+once, without a preview.
+
+The full encode can be cancelled from another thread, e.g. when the user
+moves on to the next file; the preview then stays on screen.
+"""
+
+import shutil
+import sys
+import threading
+from pathlib import Path
+from typing import List, Optional, TextIO, Union
+
+from . import trace
+from .decoder import CatpicDecoder
+from .encoder import CatpicEncoder, EncodeCancelled
+
+# Seconds to wait for the full render before drawing a preview. The draft
+# of a large JPEG takes a few tens of milliseconds more, so the preview
+# appears within about 50-100 ms.
+DEFAULT_DEADLINE = 0.03
+
+
+class ProgressiveRender:
+    """
+    One image displayed progressively; see the module docstring.
+
+    Example:
+        >>> render = ProgressiveRender(CatpicEncoder(basis=BASIS.BASIS_2_4), 'photo.jpg', width=80)
+        >>> render.show()  # Another thread may call render.cancel()
+    """
+
+    def __init__(
+        self,
+        encoder: CatpicEncoder,
+        image_path: Union[str, Path],
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        deadline: float = DEFAULT_DEADLINE,
+        max_memory: Optional[int] = None
+    ):
+        """
+        Args:
+            encoder: Encoder for the full render (its BASIS and engine)
+            image_path: Image file to show; the preview and the full
+                        render each open it
+            width: Output width in characters (default: 80)
+            height: Output height in characters (default: from aspect ratio)
+            deadline: Seconds to wait for the full render before drawing
+                      the preview; 0 always draws one first
+            max_memory: Peak decoding bytes for the full render
+        """
+        self.encoder = encoder
+        self.image_path = image_path
+        self.width = width
+        self.height = height
+        self.deadline = deadline
+        self.max_memory = max_memory
+        self.previewed = False  # Whether the last show() drew a preview
+        self._cancel = threading.Event()
+        self._result: Optional[str] = None
+        self._error: Optional[BaseException] = None
+
+    def cancel(self) -> None:
+        """Stop the full encode; show() returns without redrawing."""
+        self._cancel.set()
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether cancel() has been called."""
+        return self._cancel.is_set()
+
+    def show(self, file: Optional[TextIO] = None) -> bool:
+        """
+        Draw the image, with a preview first if the full render is slow.
+
+        The preview is skipped if it would not fit the terminal's height,
+        since lines scrolled off screen cannot be redrawn in place.
+
+        Returns:
+            True if the full render was drawn, False if cancelled first
+
+        Raises:
+            Whatever the full encode raised (e.g. OSError for bad files)
+        """
+        if file is None:
+            file = sys.stdout
+        self.previewed = False
+        self._result = self._error = None
+        worker = threading.Thread(target=self._encode, name="catpic-refine", daemon=True)
+        worker.start()
+
+        drawn = 0
+        try:
+            worker.join(self.deadline)
+            if worker.is_alive() and not self.cancelled:
+                with trace.stage("progressive.preview"):
+                    preview = self._data_lines(self.encoder.encode_draft(self.image_path, self.width, self.height))
+                # Drawn unless the full render overtook it
+                if worker.is_alive() and not self.cancelled and len(preview) < shutil.get_terminal_size(fallback=(80, 24)).lines:
+                    print("\n".join(preview), file=file, flush=True)
+                    drawn = len(preview)
+                    self.previewed = True
+            while worker.is_alive():
+                # Short joins keep Ctrl+C responsive
+                worker.join(0.05)
+        except BaseException:
+            # Ctrl+C, or the draft failed: stop the full render too
+            self.cancel()
+            worker.join()
+            raise
+
+        if self._error is not None:
+            raise self._error
+        if self._result is None:
+            return False
+
+        lines = self._data_lines(self._result)
+        # Back to the preview's first line; every line is fully overwritten
+        up = f"\x1b[{drawn}A\r" if drawn else ""
+        with trace.stage("progressive.refine"):
+            print(up + "\n".join(lines), file=file, flush=True)
+        trace.count("bytes_emitted", sum(len(line) + 1 for line in lines))
+        return True
+
+    def _encode(self) -> None:
+        """Background thread: the full render, or why there is none."""
+        try:
+            self._result = self.encoder.encode_image(
+                self.image_path, self.width, self.height, max_memory=self.max_memory, cancel=self._cancel
+            )
+        except EncodeCancelled:
+            pass
+        except BaseException as e:
+            self._error = e
+
+    @staticmethod
+    def _data_lines(content: str) -> List[str]:
+        return CatpicDecoder().parse_meow(content)["data_lines"]  # type: ignore[return-value]
@@ -0,0 +1,233 @@
+"""
+Cell grids parsed back from MEOW data, and rescaled in cell space.
+
+A MEOW file keeps no pixels, but every cell still describes its
+BASIS_X×BASIS_Y subpixels exactly: pixels whose pattern bit is set show
+the foreground color and the rest the background. parse_cells() recovers
+(pattern, fg_rgb, bg_rgb) per cell by mapping each glyph back through
+CatpicCore.BLOCKS. downscale() rebuilds the subpixels, box-filters them
+to a smaller grid and splits each new cell into two colors again with the
+fast engine, so a file wider than the terminal can be shown at the
+terminal's width without the original image.
+
+Like catpic.engines, this module imports neither Pillow nor NumPy, so
+displaying a .meow file stays light.
+
+Example:
+    >>> rows = parse_cells(parsed['data_lines'], BASIS.BASIS_2_2)
+    >>> lines = format_cells(downscale(rows, BASIS.BASIS_2_2, 80), BASIS.BASIS_2_2)
+"""
+
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .core import BASIS, CatpicCore
+from .engines import Glyph, split_rows
+
+RGB = Tuple[int, int, int]
+
+# Color of a cell drawn before any SGR color, or after a reset
+DEFAULT_RGB: RGB = (0, 0, 0)
+
+# One cell exactly as CatpicCore.format_cell writes it
+_CELL = re.compile(r"\x1b\[38;2;(\d+);(\d+);(\d+)m\x1b\[48;2;(\d+);(\d+);(\d+)m([^\x1b])\x1b\[0m")
+_CELLS = re.compile(r"(?:\x1b\[38;2;\d+;\d+;\d+m\x1b\[48;2;\d+;\d+;\d+m[^\x1b]\x1b\[0m)*")
+
+# Any SGR escape sequence or a single printable character
+_TOKEN = re.compile(r"\x1b\[([0-9;]*)m|([^\x1b])", re.DOTALL)
+
+_CELL_TEMPLATE = "\x1b[38;2;%d;%d;%dm\x1b[48;2;%d;%d;%dm%s\x1b[0m"
+
+# Per BASIS: glyph -> pattern, the reverse of CatpicCore.BLOCKS
+_PATTERNS: Dict[BASIS, Dict[str, int]] = {}
+
+
+def glyph_patterns(basis: BASIS) -> Dict[str, int]:
+    """Map each glyph of a BASIS to its pattern (the first, if repeated)."""
+    patterns = _PATTERNS.get(basis)
+    if patterns is None:
+        patterns = {}
+        for pattern, char in enumerate(CatpicCore.BLOCKS[basis]):
+            patterns.setdefault(char, pattern)
+        _PATTERNS[basis] = patterns
+    return patterns
+
+
+def parse_cells(lines: Sequence[str], basis: BASIS) -> List[List[Glyph]]:
+    """
+    Parse MEOW data lines back into (pattern, fg_rgb, bg_rgb) cells.
+
+    Lines written by catpic are matched cell by cell with one regular
+    expression. Anything else (compacted output, other SGR sequences) is
+    tokenized and its 24-bit colors and resets tracked. Characters that
+    are not glyphs of the BASIS become pattern 0, i.e. their background.
+
+    Returns:
+        One list of cells per line; lines keep their own lengths
+    """
+    patterns = glyph_patterns(basis)
+    rows = []
+    for line in lines:
+        if _CELLS.fullmatch(line):
+            rows.append([
+                (patterns.get(char, 0), (int(fr), int(fg), int(fb)), (int(br), int(bg), int(bb)))
+                for fr, fg, fb, br, bg, bb, char in _CELL.findall(line)
+            ])
+        else:
+            rows.append(_parse_line(line, patterns))
+    return rows
+
+
+def _parse_line(line: str, patterns: Dict[str, int]) -> List[Glyph]:
+    """Parse one line of arbitrary SGR-colored text into cells."""
+    row = []
+    fg = bg = DEFAULT_RGB
+    for match in _TOKEN.finditer(line):
+        params, char = match.groups()
+        if char is not None:
+            row.append((patterns.get(char, 0), fg, bg))
+            continue
+        codes = params.split(";")
+        i = 0
+        while i < len(codes):
+            code = codes[i]
+            if code in ("", "0"):
+                fg = bg = DEFAULT_RGB
+            elif code == "39":
+                fg = DEFAULT_RGB
+            elif code == "49":
+                bg = DEFAULT_RGB
+            elif code in ("38", "48") and i + 1 < len(codes):
+                if codes[i + 1] == "2" and i + 4 < len(codes):
+                    rgb = (int(codes[i + 2] or 0), int(codes[i + 3] or 0), int(codes[i + 4] or 0))
+                    if code == "38":
+                        fg = rgb
+                    else:
+                        bg = rgb
+                    i += 4
+                elif codes[i + 1] == "5":
+                    # 256-color palette entries are not reversed; keep the color
+                    i += 2
+            i += 1
+    return row
+
+
+def format_cells(rows: Sequence[Sequence[Glyph]], basis: BASIS) -> List[str]:
+    """Format cells as MEOW data lines, like CatpicCore.format_cell."""
+    blocks = CatpicCore.BLOCKS[basis]
+    return [
+        "".join([_CELL_TEMPLATE % (*fg, *bg, blocks[pattern]) for pattern, fg, bg in row])
+        for row in rows
+    ]
+
+
+def downscale(
+    rows: Sequence[Sequence[Glyph]],
+    basis: BASIS,
+    width: int,
+    height: Optional[int] = None
+) -> List[List[Glyph]]:
+    """
+    Rescale parsed cells to WIDTH×HEIGHT cells at the same BASIS.
+
+    Each cell is expanded to its subpixels, the subpixel image is
+    resampled with an area-averaging box filter (like PIL's BOX) and the
+    new cells are split into two colors by the fast engine, so two-color
+    detail that survives the shrink stays sharp.
+
+    Args:
+        rows: Cells from parse_cells(); short rows are padded with
+              DEFAULT_RGB background
+        basis: BASIS of the cells, kept for the result
+        width: Width in cells
+        height: Height in cells (default: keep the aspect ratio)
+
+    Returns:
+        HEIGHT rows of WIDTH (pattern, fg_rgb, bg_rgb) cells
+    """
+    basis_x, basis_y = basis.value
+    source_width = max((len(row) for row in rows), default=0)
+    source_height = len(rows)
+    if not source_width or width < 1:
+        raise ValueError("Cannot rescale an empty grid")
+    if height is None:
+        height = max(1, round(source_height * width / source_width))
+
+    pixels = _subpixels(rows, basis_x, basis_y, source_width)
+    resized = _box_resize(pixels, source_width * basis_x, width * basis_x, height * basis_y)
+    data = b"".join(resized)
+    return list(split_rows(data, width * basis_x * 3, basis_x, basis_y, width, height))  # type: ignore[arg-type]
+
+
+def _subpixels(rows: Sequence[Sequence[Glyph]], basis_x: int, basis_y: int, width: int) -> List[bytes]:
+    """Pixel rows (packed RGB) of the image the cells show."""
+    blank = bytes(DEFAULT_RGB) * basis_x
+    pixels = []
+    for row in rows:
+        colors = [(pattern, bytes(fg), bytes(bg)) for pattern, fg, bg in row]
+        for r in range(basis_y):
+            first = r * basis_x
+            line = bytearray()
+            for pattern, fg, bg in colors:
+                for bit in range(first, first + basis_x):
+                    line += fg if pattern >> bit & 1 else bg
+            line += blank * (width - len(colors))
+            pixels.append(bytes(line))
+    return pixels
+
+
+def _taps(source: int, target: int) -> List[List[Tuple[int, float]]]:
+    """Box filter weights: (source index, weight) per target index."""
+    scale = source / target
+    taps = []
+    for i in range(target):
+        low = i * scale
+        high = low + scale
+        weights = []
+        j = int(low)
+        while j < high and j < source:
+            overlap = min(high, j + 1) - max(low, j)
+            if overlap > 1e-9:
+                weights.append((j, overlap / scale))
+            j += 1
+        taps.append(weights)
+    return taps
+
+
+def _box_resize(pixels: List[bytes], source_width: int, width: int, height: int) -> List[bytes]:
+    """Resample packed RGB pixel rows to WIDTH×HEIGHT: columns, then rows."""
+    column_taps = _taps(source_width, width)
+    narrowed = []
+    for line in pixels:
+        out = []
+        for weights in column_taps:
+            r = g = b = 0.0
+            for j, weight in weights:
+                j *= 3
+                r += line[j] * weight
+                g += line[j + 1] * weight
+                b += line[j + 2] * weight
+            out += (r, g, b)
+        narrowed.append(out)
+
+    resized = []
+    for weights in _taps(len(pixels), height):
+        j, weight = weights[0]
+        total = [value * weight for value in narrowed[j]]
+        for j, weight in weights[1:]:
+            total = [t + value * weight for t, value in zip(total, narrowed[j])]
+        resized.append(bytes([min(255, int(value + 0.5)) for value in total]))
+    return resized
+
+
+def fit_width(lines: Sequence[str], basis: BASIS, columns: int) -> List[str]:
+    """
+    MEOW data lines at most COLUMNS cells wide.
+
+    Lines that already fit are returned unchanged; wider images are
+    parsed and downscaled to COLUMNS cells, keeping the aspect ratio.
+    """
+    rows = parse_cells(lines, basis)
+    if max((len(row) for row in rows), default=0) <= columns:
+        return list(lines)
+    return format_cells(downscale(rows, basis, columns), basis)
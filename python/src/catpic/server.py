@@ -0,0 +1,424 @@
+"""
+Local HTTP render service (``catpic serve``).
+
+A small asyncio HTTP/1.1 server, standard library only:
+
+    POST /render?basis=2,2&width=40[&height=20][&format=meow|ansi]
+        Body: image file bytes. Returns MEOW text (or bare ANSI lines),
+        streamed with chunked encoding as rows are encoded. BASIS defaults
+        to the server's CATPIC_BASIS. Animations always return MEOW-ANIM.
+    GET /stats
+        JSON request, latency and throughput counters.
+    GET /health
+        "ok"
+
+Decoding and cell encoding run on a bounded process pool. A static image
+is decoded and resized in one task, then split into strips of rows that
+are encoded in parallel and written out in order as each finishes.
+Animated images are encoded as one MEOW-ANIM task.
+
+When more than ``max_queue`` requests are in progress, new renders get
+``503 Service Unavailable`` with ``Retry-After`` instead of queueing
+without bound. Clients that stall while sending the request head or body
+get ``408 Request Timeout`` after ``read_timeout`` seconds, so idle
+connections cannot pile up outside the queue limit.
+
+Example:
+    $ catpic serve --port 8080 -j 4 &
+    $ curl --data-binary @photo.jpg 'localhost:8080/render?width=60'
+"""
+
+import asyncio
+import io
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+# Rows of cells per encoding task
+STRIP_ROWS = 8
+
+# Largest accepted upload
+DEFAULT_MAX_BODY = 32 * 1024 * 1024
+
+# Seconds allowed for reading the request head, and again for the body
+DEFAULT_READ_TIMEOUT = 30.0
+
+# Latency samples kept for percentiles
+LATENCY_SAMPLES = 1024
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    408: "Request Timeout",
+    411: "Length Required",
+    413: "Payload Too Large",
+    422: "Unprocessable Entity",
+    503: "Service Unavailable",
+}
+
+
+class HTTPError(Exception):
+    """Request failure carrying an HTTP status."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _prepare(
+    basis_value: str,
+    data: bytes,
+    width: Optional[int],
+    height: Optional[int]
+) -> Tuple[str, Any]:
+    """
+    Decode an upload in a pool worker.
+
+    Returns:
+        ("anim", MEOW-ANIM text) for animations, otherwise
+        ("image", (pixel size, RGB bytes, width, height)) ready for strips
+    """
+    from PIL import Image
+
+    from .core import get_default_basis
+    from .encoder import CatpicEncoder
+
+    encoder = CatpicEncoder(basis=get_default_basis(basis_value or None))
+    with Image.open(io.BytesIO(data)) as img:
+        if getattr(img, "is_animated", False):
+            return "anim", encoder.encode_animation(io.BytesIO(data), width, height)
+        img_resized, width, height = encoder.prepare_image(img, width, height)
+    return "image", (img_resized.size, img_resized.tobytes(), width, height)
+
+
+def _encode_strip(
+    basis_value: str,
+    size: Tuple[int, int],
+    data: bytes,
+    width: int,
+    rows: int
+) -> List[str]:
+    """Encode a strip of cell rows from raw RGB pixel rows."""
+    from PIL import Image
+
+    from .core import get_default_basis
+    from .encoder import CatpicEncoder
+
+    encoder = CatpicEncoder(basis=get_default_basis(basis_value or None))
+    return encoder._encode_cells(Image.frombytes("RGB", size, data), width, rows)
+
+
+class RenderServer:
+    """
+    Asyncio HTTP server rendering uploaded images to MEOW.
+
+    Args:
+        host: Interface to bind (default: localhost only)
+        port: TCP port (0 picks a free port; see ``port`` after start)
+        jobs: Worker processes (default: CPU count)
+        max_queue: Renders admitted at once before answering 503
+                   (default: 4 per worker)
+        max_body: Largest accepted upload in bytes
+        read_timeout: Seconds allowed for reading the request head, and
+                      again for the body
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8080,
+        jobs: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        max_body: int = DEFAULT_MAX_BODY,
+        read_timeout: float = DEFAULT_READ_TIMEOUT
+    ):
+        self.host = host
+        self.port = port
+        self.jobs = jobs or os.cpu_count() or 1
+        self.max_queue = max_queue if max_queue is not None else self.jobs * 4
+        self.max_body = max_body
+        self.read_timeout = read_timeout
+
+        self.stats: Dict[str, int] = {
+            "requests": 0,
+            "renders": 0,
+            "rejected": 0,
+            "errors": 0,
+            "bytes_in": 0,
+            "bytes_out": 0,
+            "cells": 0,
+        }
+        self.active = 0
+        self._latencies: deque = deque(maxlen=LATENCY_SAMPLES)
+        self._started = time.monotonic()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.ready = threading.Event()
+
+    async def start(self) -> None:
+        """Start the worker pool and bind the listening socket."""
+        self._loop = asyncio.get_running_loop()
+        self._pool = ProcessPoolExecutor(max_workers=self.jobs)
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._started = time.monotonic()
+        self.ready.set()
+
+    async def serve_forever(self) -> None:
+        """Serve until stop() is called."""
+        if self._server is None:
+            await self.start()
+        assert self._server is not None
+        try:
+            async with self._server:
+                await self._server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False)
+                self._pool = None
+
+    def stop(self) -> None:
+        """Stop serving; safe to call from another thread."""
+        if self._loop is not None and self._server is not None:
+            self._loop.call_soon_threadsafe(self._server.close)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current counters with latency percentiles and throughput."""
+        elapsed = max(time.monotonic() - self._started, 1e-9)
+        latencies = sorted(self._latencies)
+
+        def percentile(p: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 2)
+
+        return dict(
+            self.stats,
+            active=self.active,
+            max_queue=self.max_queue,
+            uptime_s=round(elapsed, 3),
+            renders_per_s=round(self.stats["renders"] / elapsed, 3),
+            cells_per_s=round(self.stats["cells"] / elapsed, 1),
+            latency_ms={"p50": percentile(0.5), "p95": percentile(0.95), "p99": percentile(0.99)},
+        )
+
+    # -- HTTP plumbing ------------------------------------------------------
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.stats["requests"] += 1
+        try:
+            method, target, headers = await self._read_timed(self._read_head(reader))
+            url = urlsplit(target)
+            if url.path == "/render":
+                if method != "POST":
+                    raise HTTPError(405, "Use POST with the image as the body")
+                await self._render(reader, writer, headers, parse_qs(url.query))
+            elif url.path == "/stats" and method == "GET":
+                await self._respond(writer, 200, json.dumps(self.snapshot()), "application/json")
+            elif url.path == "/health" and method == "GET":
+                await self._respond(writer, 200, "ok\n")
+            else:
+                raise HTTPError(404, f"No route for {method} {url.path}")
+        except HTTPError as e:
+            if e.status >= 500:
+                self.stats["rejected"] += 1
+            else:
+                self.stats["errors"] += 1
+            headers = {"Retry-After": "1"} if e.status == 503 else {}
+            await self._respond(writer, e.status, f"Error: {e}\n", headers=headers)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception:
+            # Failure mid-stream: the status line is already sent, so the
+            # truncated chunked body is all the client can be told
+            self.stats["errors"] += 1
+        finally:
+            writer.close()
+
+    async def _read_timed(self, read: Any) -> Any:
+        """Await a read, answering 408 if the client stalls."""
+        try:
+            return await asyncio.wait_for(read, self.read_timeout)
+        except asyncio.TimeoutError:
+            raise HTTPError(408, f"No request data for {self.read_timeout:g}s")
+
+    @staticmethod
+    async def _read_head(reader: asyncio.StreamReader) -> Tuple[str, str, Dict[str, str]]:
+        line = (await reader.readline()).decode("latin-1").strip()
+        parts = line.split()
+        if len(parts) != 3 or not parts[2].startswith("HTTP/1."):
+            raise HTTPError(400, "Malformed request line")
+        headers = {}
+        while True:
+            header = (await reader.readline()).decode("latin-1").strip()
+            if not header:
+                break
+            name, _, value = header.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        return parts[0].upper(), parts[1], headers
+
+    async def _respond(
+        self,
+        writer: asyncio.StreamWriter,
+        status: int,
+        body: str,
+        content_type: str = "text/plain; charset=utf-8",
+        headers: Optional[Dict[str, str]] = None
+    ) -> None:
+        data = body.encode("utf-8")
+        head = [
+            f"HTTP/1.1 {status} {_REASONS.get(status, '')}",
+            f"Content-Type: {content_type}",
+            f"Content-Length: {len(data)}",
+            "Connection: close",
+        ]
+        head.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + data)
+        await writer.drain()
+
+    # -- Rendering ----------------------------------------------------------
+
+    async def _render(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        headers: Dict[str, str],
+        query: Dict[str, List[str]]
+    ) -> None:
+        if self.active >= self.max_queue:
+            raise HTTPError(503, "Render queue full")
+
+        if "content-length" not in headers:
+            raise HTTPError(411, "Content-Length required")
+        try:
+            length = int(headers["content-length"])
+        except ValueError:
+            raise HTTPError(400, "Content-Length must be an integer")
+        if length < 0:
+            raise HTTPError(400, "Content-Length must not be negative")
+        if length > self.max_body:
+            raise HTTPError(413, f"Image larger than {self.max_body} bytes")
+
+        basis, width, height, fmt = self._parse_options(query)
+
+        self.active += 1
+        start = time.monotonic()
+        try:
+            data = await self._read_timed(reader.readexactly(length))
+            self.stats["bytes_in"] += length
+            loop = asyncio.get_running_loop()
+            try:
+                kind, result = await loop.run_in_executor(
+                    self._pool, _prepare, basis, data, width, height
+                )
+            except Exception as e:
+                raise HTTPError(422, f"Cannot read image: {e}")
+
+            writer.write(
+                b"HTTP/1.1 200 OK\r\n"
+                b"Content-Type: text/plain; charset=utf-8\r\n"
+                b"Transfer-Encoding: chunked\r\n"
+                b"Connection: close\r\n\r\n"
+            )
+            if kind == "anim":
+                await self._write_chunk(writer, result)
+                self.stats["cells"] += result.count("\x1b[0m")
+            else:
+                await self._stream_strips(writer, basis, result, fmt)
+            await self._write_chunk(writer, "")
+
+            self.stats["renders"] += 1
+            self._latencies.append(time.monotonic() - start)
+        finally:
+            self.active -= 1
+
+    @staticmethod
+    def _parse_options(query: Dict[str, List[str]]) -> Tuple[str, Optional[int], Optional[int], str]:
+        def single(name: str) -> Optional[str]:
+            values = query.get(name)
+            return values[-1] if values else None
+
+        basis = single("basis") or ""
+        if basis and basis not in ("1,2", "2,2", "2,3", "2,4"):
+            raise HTTPError(400, f"Invalid BASIS '{basis}'")
+        fmt = single("format") or "meow"
+        if fmt not in ("meow", "ansi"):
+            raise HTTPError(400, "format must be 'meow' or 'ansi'")
+        try:
+            width = int(single("width")) if single("width") else None
+            height = int(single("height")) if single("height") else None
+        except ValueError:
+            raise HTTPError(400, "width and height must be integers")
+        if (width is not None and width < 1) or (height is not None and height < 1):
+            raise HTTPError(400, "width and height must be positive")
+        return basis, width, height, fmt
+
+    async def _stream_strips(
+        self,
+        writer: asyncio.StreamWriter,
+        basis: str,
+        prepared: Tuple[Tuple[int, int], bytes, int, int],
+        fmt: str
+    ) -> None:
+        """Encode strips on the pool and write them in order as they finish."""
+        from .core import get_default_basis
+
+        (pixel_width, _), data, width, height = prepared
+        basis_x, basis_y = get_default_basis(basis or None).value
+
+        if fmt == "meow":
+            header = f"MEOW/1.0\nWIDTH:{width}\nHEIGHT:{height}\nBASIS:{basis_x},{basis_y}\nDATA:\n"
+            await self._write_chunk(writer, header)
+
+        loop = asyncio.get_running_loop()
+        row_bytes = pixel_width * 3 * basis_y
+        strips = []
+        for top in range(0, height, STRIP_ROWS):
+            rows = min(STRIP_ROWS, height - top)
+            chunk = data[top * row_bytes:(top + rows) * row_bytes]
+            strips.append(loop.run_in_executor(
+                self._pool, _encode_strip, basis, (pixel_width, rows * basis_y), chunk, width, rows
+            ))
+
+        try:
+            for idx, strip in enumerate(strips):
+                lines = await strip
+                last = idx == len(strips) - 1
+                await self._write_chunk(writer, "\n".join(lines) + ("" if last else "\n"))
+                self.stats["cells"] += width * len(lines)
+        finally:
+            for strip in strips:
+                strip.cancel()
+
+    async def _write_chunk(self, writer: asyncio.StreamWriter, text: str) -> None:
+        data = text.encode("utf-8")
+        if text == "":
+            writer.write(b"0\r\n\r\n")
+        elif data:
+            writer.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.stats["bytes_out"] += len(data)
+        await writer.drain()
+
+
+def serve(
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    jobs: Optional[int] = None,
+    max_queue: Optional[int] = None
+) -> None:
+    """Run a RenderServer until interrupted."""
+    server = RenderServer(host, port, jobs=jobs, max_queue=max_queue)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
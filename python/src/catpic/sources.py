@@ -0,0 +1,271 @@
+"""
+Frame sources for encoding video-like input to MEOW-ANIM.
+
+Each source reads frames one at a time, so arbitrarily long clips can be
+encoded with bounded memory:
+
+- Y4M (YUV4MPEG2) streams, e.g. ``ffmpeg -i clip.mp4 -f yuv4mpegpipe -``
+- Raw RGB24 streams, e.g. ``ffmpeg -i clip.mp4 -f rawvideo -pix_fmt rgb24 -``
+- Numbered image sequences in a directory (frame_0001.png, ...)
+
+Sources yield full-size RGB PIL Images; CatpicEncoder.encode_stream()
+resizes and encodes them.
+"""
+
+import re
+import sys
+from fractions import Fraction
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional, Tuple, Union
+
+from PIL import Image
+
+# Default frame delay (ms) when a source carries no timing information
+DEFAULT_DELAY = 100
+
+# Image file suffixes picked up by ImageSequenceSource
+IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg", ".bmp", ".gif", ".ppm", ".tif", ".tiff", ".webp")
+
+
+class FrameSource:
+    """
+    Base class for sequential frame sources.
+
+    Attributes:
+        width: Frame width in pixels
+        height: Frame height in pixels
+        delay: Frame delay in milliseconds
+        frame_count: Number of frames if known up front, else None
+    """
+
+    width: int
+    height: int
+    delay: int = DEFAULT_DELAY
+    frame_count: Optional[int] = None
+    stream: Optional[BinaryIO] = None
+
+    def __iter__(self) -> Iterator[Image.Image]:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release the underlying file (stdin is left open)."""
+        if self.stream is not None and self.stream is not sys.stdin.buffer:
+            self.stream.close()
+
+
+def _read_exact(stream: BinaryIO, size: int) -> Optional[bytes]:
+    """Read exactly size bytes; None at clean end of stream."""
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = stream.read(remaining)
+        if not chunk:
+            if remaining == size:
+                return None
+            raise ValueError("Truncated frame data at end of stream")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def _fps_to_delay(fps: Union[float, Fraction]) -> int:
+    """Convert a frame rate to a whole-millisecond delay."""
+    if fps <= 0:
+        return DEFAULT_DELAY
+    return max(1, round(1000 / fps))
+
+
+class Y4MSource(FrameSource):
+    """
+    YUV4MPEG2 stream reader.
+
+    Supports 8-bit 4:2:0 (all siting variants), 4:2:2, 4:4:4 and mono.
+    Samples are treated as limited-range BT.601, which is what ffmpeg
+    writes. Other colorspaces (high bit depths such as 420p10 or mono16,
+    444alpha with its fourth plane, 411) are rejected rather than read
+    with the wrong frame size.
+    """
+
+    # Chroma subsampling (x, y) per colorspace name
+    _SUBSAMPLING = {
+        "420jpeg": (2, 2),
+        "420paldv": (2, 2),
+        "420mpeg2": (2, 2),
+        "420": (2, 2),
+        "422": (2, 1),
+        "444": (1, 1),
+        "mono": (0, 0),
+    }
+
+    def __init__(self, stream: BinaryIO, frame_count: Optional[int] = None):
+        self.stream = stream
+        header = stream.readline()
+        if not header.startswith(b"YUV4MPEG2"):
+            raise ValueError("Invalid Y4M stream: missing YUV4MPEG2 header")
+
+        params = {}
+        for token in header.decode("ascii").split()[1:]:
+            params[token[0]] = token[1:]
+
+        self.width = int(params["W"])
+        self.height = int(params["H"])
+
+        rate = params.get("F", "0:1").split(":")
+        self.delay = _fps_to_delay(Fraction(int(rate[0]), int(rate[1]) or 1))
+
+        colorspace = params.get("C", "420jpeg")
+        if colorspace not in self._SUBSAMPLING:
+            raise ValueError(f"Unsupported Y4M colorspace: {colorspace}")
+        self.subsampling = self._SUBSAMPLING[colorspace]
+
+        sub_x, sub_y = self.subsampling
+        if sub_x:
+            self.chroma_size = (-(-self.width // sub_x), -(-self.height // sub_y))
+        else:
+            self.chroma_size = (0, 0)
+        self.frame_count = frame_count
+
+        # Limited-range (16-235 / 16-240) to full-range lookup tables
+        self._luma = [min(255, max(0, round((v - 16) * 255 / 219))) for v in range(256)]
+        self._chroma = [min(255, max(0, round((v - 128) * 255 / 224 + 128))) for v in range(256)]
+
+    def __iter__(self) -> Iterator[Image.Image]:
+        luma_size = self.width * self.height
+        chroma_w, chroma_h = self.chroma_size
+        chroma_size = chroma_w * chroma_h
+
+        while True:
+            marker = self.stream.readline()
+            if not marker:
+                return
+            if not marker.startswith(b"FRAME"):
+                raise ValueError("Invalid Y4M stream: missing FRAME marker")
+
+            data = _read_exact(self.stream, luma_size + 2 * chroma_size)
+            if data is None:
+                raise ValueError("Truncated frame data at end of stream")
+
+            y = Image.frombytes("L", (self.width, self.height), data[:luma_size])
+            y = y.point(self._luma)
+            if not chroma_size:
+                yield y.convert("RGB")
+                continue
+
+            planes = [y]
+            for offset in (luma_size, luma_size + chroma_size):
+                plane = Image.frombytes("L", self.chroma_size, data[offset:offset + chroma_size])
+                if self.chroma_size != y.size:
+                    plane = plane.resize(y.size, Image.Resampling.BILINEAR)
+                planes.append(plane.point(self._chroma))
+            yield Image.merge("YCbCr", planes).convert("RGB")
+
+
+class RawRGBSource(FrameSource):
+    """Reader for headerless RGB24 frames of a known size."""
+
+    def __init__(
+        self,
+        stream: BinaryIO,
+        width: int,
+        height: int,
+        fps: Optional[float] = None,
+        frame_count: Optional[int] = None
+    ):
+        self.stream = stream
+        self.width = width
+        self.height = height
+        self.delay = _fps_to_delay(fps) if fps else DEFAULT_DELAY
+        self.frame_count = frame_count
+
+    def __iter__(self) -> Iterator[Image.Image]:
+        frame_size = self.width * self.height * 3
+        while True:
+            data = _read_exact(self.stream, frame_size)
+            if data is None:
+                return
+            yield Image.frombytes("RGB", (self.width, self.height), data)
+
+
+class ImageSequenceSource(FrameSource):
+    """
+    Numbered image files in a directory, in natural numeric order.
+
+    Only one image is open at a time. Every frame is converted to RGB and
+    must have the size of the first frame (others are resized to it).
+    """
+
+    def __init__(self, directory: Union[str, Path], fps: Optional[float] = None):
+        self.paths = self.list_frames(directory)
+        if not self.paths:
+            raise ValueError(f"No image files found in '{directory}'")
+        with Image.open(self.paths[0]) as first:
+            self.width, self.height = first.size
+        self.delay = _fps_to_delay(fps) if fps else DEFAULT_DELAY
+        self.frame_count = len(self.paths)
+
+    @staticmethod
+    def list_frames(directory: Union[str, Path]) -> List[Path]:
+        """List image files sorted so frame_2 comes before frame_10."""
+        def natural_key(path: Path) -> Tuple[object, ...]:
+            return tuple(
+                int(part) if part.isdigit() else part
+                for part in re.split(r"(\d+)", path.name)
+            )
+
+        files = [
+            path for path in Path(directory).iterdir()
+            if path.suffix.lower() in IMAGE_SUFFIXES and path.is_file()
+        ]
+        return sorted(files, key=natural_key)
+
+    def __iter__(self) -> Iterator[Image.Image]:
+        for path in self.paths:
+            with Image.open(path) as img:
+                frame = img.convert("RGB")
+            if frame.size != (self.width, self.height):
+                frame = frame.resize((self.width, self.height), Image.Resampling.LANCZOS)
+            yield frame
+
+
+def open_source(
+    path: Union[str, Path],
+    raw_size: Optional[Tuple[int, int]] = None,
+    fps: Optional[float] = None
+) -> FrameSource:
+    """
+    Open a frame source by path.
+
+    Args:
+        path: Directory of numbered images, a .y4m file, a raw RGB24 file,
+              or "-" for stdin (Y4M is detected by its header)
+        raw_size: (width, height) of raw RGB24 frames; required for raw input
+        fps: Frame rate for sources without timing (raw, image sequences)
+
+    Raises:
+        ValueError: If the input cannot be identified or is malformed
+    """
+    if str(path) != "-" and Path(path).is_dir():
+        return ImageSequenceSource(path, fps)
+
+    if str(path) == "-":
+        stream: BinaryIO = sys.stdin.buffer
+        total_size = None
+    else:
+        stream = open(path, "rb")
+        total_size = Path(path).stat().st_size
+
+    peek = stream.peek(9)[:9] if hasattr(stream, "peek") else b""
+    if peek == b"YUV4MPEG2":
+        source: FrameSource = Y4MSource(stream)
+        if fps:
+            source.delay = _fps_to_delay(fps)
+        return source
+
+    if raw_size is None:
+        if total_size is not None:
+            stream.close()
+        raise ValueError("Raw RGB input needs a frame size (e.g. --raw-size 640x360)")
+
+    width, height = raw_size
+    frame_count = total_size // (width * height * 3) if total_size is not None else None
+    return RawRGBSource(stream, width, height, fps, frame_count)
@@ -0,0 +1,209 @@
+"""
+Per-stage timing and counters for profiling renders.
+
+Tracing is off unless turned on with ``catpic --profile`` or the
+CATPIC_TRACE environment variable. While off, stage() hands back a shared
+no-op context manager and count() returns after a single global check, so
+instrumented code pays well under a microsecond per call. Stages are
+coarse (per image, per cell row, per frame), never per cell.
+
+Stages recorded:
+    encode.decode    Decoding and RGB conversion of source images
+    encode.resize    Resampling to the cell grid's pixel size
+    encode.quantize  Two-color quantization and centroids, per cell row
+    encode.format    ANSI formatting of cells, per cell row
+    cells.resize     image_to_cells resampling (primitives API)
+    cells.quantize   image_to_cells cell processing
+    cells.format     cells_to_ansi_lines
+    decode.parse     MEOW parsing
+    decode.write     Writing a decoded image to the terminal
+    play.prepare     Building full-frame or diff output for a frame
+    play.write       Writing a frame to the terminal
+
+Counters: cells_encoded, frames_encoded, bytes_emitted, frames_drawn.
+
+Work done in worker processes (``-j``) is not recorded.
+
+Example:
+    >>> from catpic import trace
+    >>> tracer = trace.enable()
+    >>> CatpicEncoder().encode_image("photo.jpg")
+    >>> print(tracer.summary())
+    >>> tracer.write_chrome_trace("trace.json")  # chrome://tracing, Perfetto
+"""
+
+import os
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# Events kept for Chrome traces; totals keep counting past this
+MAX_EVENTS = 100_000
+
+
+class Tracer:
+    """Collects stage timings, counters and trace events."""
+
+    def __init__(self):
+        self.stages: Dict[str, List[float]] = {}  # name -> [calls, seconds]
+        self.counters: Dict[str, int] = {}
+        self.events: List[Tuple[str, float, float, int]] = []  # name, start, duration, thread
+        self.origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def record(self, name: str, start: float, end: float) -> None:
+        """Add one timed call of a stage."""
+        with self._lock:
+            totals = self.stages.get(name)
+            if totals is None:
+                totals = self.stages[name] = [0, 0.0]
+            totals[0] += 1
+            totals[1] += end - start
+            if len(self.events) < MAX_EVENTS:
+                self.events.append((name, start, end - start, threading.get_ident()))
+
+    def count(self, name: str, n: int = 1) -> None:
+        """Add n to a counter."""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def summary(self) -> str:
+        """Table of stages (calls, total and mean time, share) and counters."""
+        elapsed = time.perf_counter() - self.origin
+        lines = [f"{'stage':<18} {'calls':>8} {'total ms':>10} {'mean ms':>9} {'share':>6}"]
+        for name, (calls, seconds) in sorted(self.stages.items(), key=lambda item: -item[1][1]):
+            lines.append(
+                f"{name:<18} {int(calls):>8} {seconds * 1000:>10.2f} "
+                f"{seconds * 1000 / calls:>9.3f} {seconds / elapsed:>6.1%}"
+            )
+        lines.append(f"{'wall':<18} {'':>8} {elapsed * 1000:>10.2f}")
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"{name:<18} {value:>8}")
+        return "\n".join(lines)
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Events in Chrome trace format (open in chrome://tracing or Perfetto)."""
+        pid = os.getpid()
+        events: List[Dict[str, Any]] = [
+            {
+                "name": name,
+                "cat": name.split(".", 1)[0],
+                "ph": "X",
+                "ts": (start - self.origin) * 1e6,
+                "dur": duration * 1e6,
+                "pid": pid,
+                "tid": tid,
+            }
+            for name, start, duration, tid in self.events
+        ]
+        end = (time.perf_counter() - self.origin) * 1e6
+        events.extend(
+            {"name": name, "ph": "C", "ts": end, "pid": pid, "args": {name: value}}
+            for name, value in sorted(self.counters.items())
+        )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: str) -> None:
+        """Write chrome_trace() as JSON."""
+        import json
+
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+
+
+class _Stage:
+    """Context manager timing one stage call."""
+
+    __slots__ = ("tracer", "name", "start")
+
+    def __init__(self, tracer: Tracer, name: str):
+        self.tracer = tracer
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> "_Stage":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.tracer.record(self.name, self.start, time.perf_counter())
+
+
+class _NoStage:
+    """Shared do-nothing context manager used while tracing is off."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoStage":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        pass
+
+
+_NO_STAGE = _NoStage()
+
+# The active tracer, or None while tracing is off
+_tracer: Optional[Tracer] = None
+
+
+def enable() -> Tracer:
+    """Start recording into a new Tracer and return it."""
+    global _tracer
+    _tracer = Tracer()
+    return _tracer
+
+
+def disable() -> Optional[Tracer]:
+    """Stop recording; returns the tracer that was active."""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+def active() -> Optional[Tracer]:
+    """The active tracer, or None."""
+    return _tracer
+
+
+def stage(name: str) -> Any:
+    """
+    Time a block as one call of stage ``name``.
+
+    Example:
+        >>> with trace.stage("encode.resize"):
+        ...     img = img.resize(size)
+    """
+    if _tracer is None:
+        return _NO_STAGE
+    return _Stage(_tracer, name)
+
+
+def count(name: str, n: int = 1) -> None:
+    """Add n to counter ``name`` if tracing is on."""
+    if _tracer is not None:
+        _tracer.count(name, n)
+
+
+def env_target() -> Optional[str]:
+    """
+    Where CATPIC_TRACE asks for results.
+
+    Returns:
+        None if unset, "0" or empty; "-" for a summary on stderr ("1");
+        otherwise a Chrome trace file path
+    """
+    value = os.environ.get("CATPIC_TRACE", "").strip()
+    if value in ("", "0"):
+        return None
+    return "-" if value == "1" else value
+
+
+def report(tracer: Tracer, target: str = "-") -> None:
+    """Print the summary table to stderr ("-") or write a Chrome trace."""
+    if target == "-":
+        print(tracer.summary(), file=sys.stderr)
+    else:
+        tracer.write_chrome_trace(target)
+        print(f"Trace written to {target}", file=sys.stderr)
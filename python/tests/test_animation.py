@@ -0,0 +1,458 @@
+"""Tests for animation encoding and playback."""
+
+import io
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from catpic import BASIS, CatpicDecoder, CatpicEncoder
+from catpic.decoder import CatpicPlayer, MeowStreamReader, PlaybackStats
+
+FIXTURES = Path(__file__).parent / "fixtures"
+BOUNCE = FIXTURES / "bounce_small.gif"
+
+
+def render_screen(output):
+    """Replay player output on a minimal terminal model, return the cells."""
+    screen = {}
+    row = col = 0
+    saved = (0, 0)
+    sgr = ""
+    for esc, params, cmd, char in re.findall(r"(\x1b\[(\??[0-9;]*)([A-Za-z]))|(.)", output, re.S):
+        if char:
+            screen[(row, col)] = sgr + char
+            col += 1
+        elif cmd == "s":
+            saved = (row, col)
+        elif cmd == "u":
+            row, col = saved
+        elif cmd == "B":
+            row += int(params or 1)
+        elif cmd == "C":
+            col += int(params or 1)
+        elif cmd == "G":
+            col = int(params or 1) - 1
+        elif cmd == "K":
+            for key in [k for k in screen if k[0] == row and k[1] >= col]:
+                del screen[key]
+        elif cmd == "m":
+            sgr = "" if params in ("", "0") else sgr + esc
+    return screen
+
+
+class TestAnimationEncoding:
+    """Test frame-by-frame animation encoding."""
+
+    def test_animation_info(self):
+        """Test animation properties are read without encoding."""
+        encoder = CatpicEncoder(basis=BASIS.BASIS_2_2)
+        info = encoder.animation_info(BOUNCE, width=16)
+        assert info["width"] == 16
+        assert info["height"] == 8
+        assert info["frames"] == 8
+        assert info["delay"] == 100
+
+    def test_iter_frames_matches_encode_animation(self):
+        """Test lazily encoded frames match the serialized animation."""
+        encoder = CatpicEncoder(basis=BASIS.BASIS_2_2)
+        frames = list(encoder.iter_animation_frames(BOUNCE, width=16))
+        parsed = CatpicDecoder().parse_meow(encoder.encode_animation(BOUNCE, width=16))
+
+        assert len(frames) == 8
+        assert frames == [frame["lines"] for frame in parsed["frames"]]
+
+    def test_parallel_encoding_matches_serial(self):
+        """Test worker processes reassemble frames in order."""
+        encoder = CatpicEncoder(basis=BASIS.BASIS_2_2)
+        serial = encoder.encode_animation(BOUNCE, width=16)
+        parallel = encoder.encode_animation(BOUNCE, width=16, workers=2)
+        assert parallel == serial
+
+    def test_unchanged_cells_are_reused(self):
+        """Test identical pixel blocks reuse the previous frame's cells."""
+        encoder = CatpicEncoder(basis=BASIS.BASIS_2_2)
+        encoder.encode_animation(BOUNCE, width=16)
+        stats = encoder.reuse_stats
+        assert stats["cells"] == 16 * 8 * 8
+        assert 0 < stats["reused"] < stats["cells"]
+        assert encoder.reuse_ratio == stats["reused"] / stats["cells"]
+
+    def test_unchanged_cells_mask(self):
+        """Test the bulk buffer comparison flags only changed cells."""
+        from PIL import Image
+
+        encoder = CatpicEncoder(basis=BASIS.BASIS_2_2)
+        before = Image.new("RGB", (8, 4), (10, 20, 30))
+        after = before.copy()
+        after.putpixel((5, 3), (255, 0, 0))  # Cell (2, 1)
+
+        mask = encoder._unchanged_cells(before.tobytes(), after.tobytes(), 4, 2)
+        assert list(mask) == [1, 1, 1, 1, 1, 1, 0, 1]
+
+    def test_static_image_rejected(self):
+        """Test non-animated input raises ValueError."""
+        encoder = CatpicEncoder()
+        with pytest.raises(ValueError):
+            encoder.animation_info(FIXTURES / "red_4x4.png")
+
+
+class TestPlayStream:
+    """Test encode-while-play pipeline."""
+
+    def test_play_stream_draws_all_frames(self, capsys):
+        """Test streamed frames are drawn in order."""
+        frames = [[f"frame{i}"] for i in range(5)]
+        CatpicPlayer().play_stream(iter(frames), height=1, delay=0, loop=False, diff=False)
+        out = capsys.readouterr().out
+        positions = [out.index(f"frame{i}") for i in range(5)]
+        assert positions == sorted(positions)
+
+    def test_play_stream_retains_frames_for_loops(self, capsys):
+        """Test the producer is consumed once and frames replay from memory."""
+        produced = []
+
+        def produce():
+            for i in range(3):
+                produced.append(i)
+                yield [f"frame{i}"]
+
+        CatpicPlayer().play_stream(produce(), height=1, delay=0, max_loops=3, diff=False)
+        out = capsys.readouterr().out
+        assert produced == [0, 1, 2]
+        assert out.count("frame2") == 3
+
+    def test_play_stream_propagates_producer_error(self):
+        """Test encoder failures surface in the playing thread."""
+        def produce():
+            yield ["frame0"]
+            raise RuntimeError("decode failed")
+
+        with pytest.raises(RuntimeError, match="decode failed"):
+            CatpicPlayer().play_stream(produce(), height=1, delay=0, loop=False)
+
+    def test_close_stops_producer(self):
+        """Test closing early closes the frame generator and joins the thread."""
+        from catpic.decoder import _PrefetchedFrames
+
+        closed = []
+
+        def produce():
+            try:
+                i = 0
+                while True:
+                    yield [f"frame{i}"]
+                    i += 1
+            finally:
+                closed.append(True)
+
+        buffered = _PrefetchedFrames(produce(), prefetch=2)
+        assert next(iter(buffered)) == ["frame0"]
+        buffered.close()
+        assert closed == [True]
+        assert not buffered._thread.is_alive()
+
+    def test_interrupted_parallel_encode_shuts_pool(self):
+        """Test closing a parallel frame stream cancels and shuts its pool."""
+        encoder = CatpicEncoder(basis=BASIS.BASIS_2_2)
+        frames = encoder.iter_timed_frames(BOUNCE, width=16, workers=2)
+        next(frames)
+        frames.close()
+        assert encoder.frame_stats["encoded"] < 8
+
+
+class TestFrameDiff:
+    """Test runtime frame differencing."""
+
+    def test_split_cells(self):
+        """Test a MEOW line splits into self-contained cells."""
+        from catpic.core import CatpicCore
+        from catpic.framediff import split_cells
+
+        cells = [
+            CatpicCore.format_cell("▘", (1, 2, 3), (4, 5, 6)),
+            CatpicCore.format_cell("█", (7, 8, 9), (0, 0, 0)),
+        ]
+        assert split_cells("".join(cells)) == cells
+
+    def test_split_cells_carries_state(self):
+        """Test cells without their own SGR inherit the active colors."""
+        from catpic.framediff import split_cells
+
+        cells = split_cells("\x1b[38;2;1;2;3m\x1b[48;2;4;5;6mab\x1b[0m")
+        assert cells == [
+            "\x1b[38;2;1;2;3m\x1b[48;2;4;5;6ma\x1b[0m",
+            "\x1b[38;2;1;2;3m\x1b[48;2;4;5;6mb\x1b[0m",
+        ]
+
+    def test_changed_spans(self):
+        """Test only differing runs of cells are reported."""
+        from catpic.framediff import changed_spans
+
+        previous = [list("abcdef"), list("xyz")]
+        current = [list("abXYef"), list("xyz")]
+        assert changed_spans(previous, current) == [(0, 2, 4)]
+
+    def test_changed_spans_shorter_row(self):
+        """Test a shortened row reports its stale tail."""
+        from catpic.framediff import changed_spans
+
+        assert changed_spans([list("abcd")], [list("ab")]) == [(0, 2, 4)]
+
+    def test_diff_playback_writes_less(self, capsys):
+        """Test mostly static animations emit far fewer bytes with diffing."""
+        encoder = CatpicEncoder(basis=BASIS.BASIS_2_2)
+        content = encoder.encode_animation(BOUNCE, width=16)
+
+        CatpicPlayer().play(content, delay=0, max_loops=2, diff=False)
+        full = len(capsys.readouterr().out)
+        CatpicPlayer().play(content, delay=0, max_loops=2)
+        diffed = len(capsys.readouterr().out)
+
+        assert diffed < full / 2
+
+    def test_diff_playback_matches_full_redraw(self, capsys):
+        """Test the screen after diffed playback equals a full redraw."""
+        encoder = CatpicEncoder(basis=BASIS.BASIS_2_2)
+        content = encoder.encode_animation(BOUNCE, width=16)
+
+        for loops in (1, 2):
+            CatpicPlayer().play(content, delay=0, max_loops=loops, diff=False)
+            full = render_screen(capsys.readouterr().out)
+            CatpicPlayer().play(content, delay=0, max_loops=loops)
+            diffed = render_screen(capsys.readouterr().out)
+            assert diffed == full
+
+
+def make_gif(path, colors, duration=100):
+    """Write an animated GIF with one solid-color frame per entry."""
+    from PIL import Image
+
+    frames = [Image.new("RGB", (16, 16), color) for color in colors]
+    frames[0].save(
+        path, save_all=True, append_images=frames[1:], duration=duration, loop=0
+    )
+    return path
+
+
+class TestFrameCollapse:
+    """Test duplicate-frame merging and frame rate budget."""
+
+    def test_duplicate_frames_merged(self):
+        """Test runs of identical frames become one longer frame."""
+        from PIL import Image
+
+        red, blue = Image.new("RGB", (4, 4), "red"), Image.new("RGB", (4, 4), "blue")
+        frames = [(red, 100), (red.copy(), 100), (red.copy(), 50), (blue, 100), (red, 100)]
+
+        encoder = CatpicEncoder(basis=BASIS.BASIS_2_2)
+        merged = list(encoder._collapse_frames(iter(frames)))
+        assert [delay for _, delay in merged] == [250, 100, 100]
+
+    def test_near_identical_frames_merged(self, tmp_path):
+        """Test frames within the tolerance are merged."""
+        colors = [(250, 0, 0), (246, 0, 0), (248, 0, 0), (0, 0, 255)]
+        gif = make_gif(tmp_path / "pause.gif", colors)
+        encoder = CatpicEncoder(basis=BASIS.BASIS_2_2)
+
+        exact = list(encoder.iter_timed_frames(gif, width=4))
+        assert len(exact) == 4
+
+        timed = list(encoder.iter_timed_frames(gif, width=4, tolerance=8))
+        assert [delay for _, delay in timed] == [300, 100]
+        assert encoder.frame_stats == {"source": 4, "encoded": 2}
+
+    def test_max_fps_budget(self, tmp_path):
+        """Test frames faster than max_fps are merged into their predecessor."""
+        colors = [(i * 20, 0, 0) for i in range(10)]
+        gif = make_gif(tmp_path / "fast.gif", colors, duration=20)
+        encoder = CatpicEncoder(basis=BASIS.BASIS_2_2)
+
+        timed = list(encoder.iter_timed_frames(gif, width=4, max_fps=10))
+        assert [delay for _, delay in timed] == [100, 100]
+
+    def test_per_frame_delay_round_trip(self, tmp_path):
+        """Test merged frame delays survive serialization and parsing."""
+        colors = [(250, 0, 0), (246, 0, 0), (0, 0, 255)]
+        gif = make_gif(tmp_path / "pause.gif", colors)
+        content = CatpicEncoder(basis=BASIS.BASIS_2_2).encode_animation(
+            gif, width=4, tolerance=8
+        )
+
+        parsed = CatpicDecoder().parse_meow(content)
+        assert content.startswith("MEOW-ANIM/1.1\n")
+        assert "FRAMES:2" in content
+        assert parsed["frames"][0]["delay"] == 200
+        assert "delay" not in parsed["frames"][1]
+        assert all(len(frame["lines"]) == 2 for frame in parsed["frames"])
+
+    def test_uniform_timing_stays_1_0(self, tmp_path):
+        """Test animations without per-frame delays keep the 1.0 header."""
+        gif = make_gif(tmp_path / "steady.gif", [(250, 0, 0), (0, 0, 255)])
+        content = CatpicEncoder(basis=BASIS.BASIS_2_2).encode_animation(gif, width=4)
+        assert content.startswith("MEOW-ANIM/1.0\n")
+        assert "\nDELAY:" not in content.split("DATA:", 1)[1]
+
+
+class TestPlaybackStats:
+    """Test playback telemetry."""
+
+    def test_counts_frames_and_bytes(self, capsys):
+        """Test every written frame and its bytes are recorded."""
+        seen = []
+        stats = PlaybackStats(on_frame=lambda s: seen.append(s.frames))
+        frames = [[f"frame{i}\u2580"] for i in range(5)]
+        CatpicPlayer().play_stream(iter(frames), height=1, delay=0, loop=False, stats=stats)
+
+        out = capsys.readouterr().out
+        values = stats.as_dict()
+        assert seen == [1, 2, 3, 4, 5]
+        assert values["frames"] == 5
+        assert values["dropped"] == values["late"] == 0
+        assert values["target_fps"] is None  # DELAY 0: as fast as possible
+        assert 0 < values["bytes"] <= len(out.encode("utf-8"))
+        assert values["max_frame_bytes"] >= values["bytes_per_frame"]
+        assert values["write_ms"]["p50"] <= values["write_ms"]["p100"]
+
+    def test_slow_producer_frames_are_late(self, capsys):
+        """Test frames that arrive after their slot are counted late."""
+        def produce():
+            for i in range(4):
+                if i:
+                    time.sleep(0.05)
+                yield [f"frame{i}"], 10
+
+        player = CatpicPlayer()
+        player.play_stream(produce(), height=1, loop=False)
+        assert player.stats.frames == 4
+        assert player.stats.late == 3
+        assert player.stats.target_fps == pytest.approx(100)
+        assert player.stats.achieved_fps < 50
+
+    def test_drop_late_keeps_time(self, capsys):
+        """Test drop_late skips frames whose slot passed during a slow write."""
+        stats = PlaybackStats(on_frame=lambda s: time.sleep(0.035))  # A slow terminal
+        frames = [([f"frame{i}"], 10) for i in range(12)]
+        CatpicPlayer().play_stream(
+            iter(frames), height=1, loop=False, diff=False, stats=stats, drop_late=True
+        )
+
+        out = capsys.readouterr().out
+        assert stats.dropped > 0
+        assert stats.frames + stats.dropped == 12
+        assert out.count("frame") == stats.frames
+        assert "frame0" in out
+
+    def test_drop_late_diff_matches_full_redraw(self, capsys):
+        """Test diffs across skipped frames still end on the last frame."""
+        content = CatpicEncoder(basis=BASIS.BASIS_2_2).encode_animation(BOUNCE, width=16)
+        last = CatpicDecoder().parse_meow(content)["frames"][-1]["lines"]
+        stats = PlaybackStats(on_frame=lambda s: time.sleep(0.025))
+
+        CatpicPlayer().play(content, delay=10, loop=False, stats=stats, drop_late=True)
+        diffed = render_screen(capsys.readouterr().out)
+        CatpicPlayer().play_stream([last], height=len(last), loop=False, diff=False)
+        full = render_screen(capsys.readouterr().out)
+
+        assert stats.dropped > 0
+        assert diffed == full
+
+    def test_cli_stats_json(self, tmp_path):
+        """Test --stats-json writes statistics when playback ends."""
+        from PIL import Image
+        from click.testing import CliRunner
+
+        from catpic.cli import cli
+
+        frames = tmp_path / "frames"
+        frames.mkdir()
+        for i in range(3):
+            Image.new("RGB", (8, 8), (i * 100, 0, 0)).save(frames / f"{i:03d}.png")
+        report = tmp_path / "stats.json"
+
+        result = CliRunner().invoke(
+            cli, ["show", str(frames), "-w", "4", "--fps", "100", "--stats-json", str(report)]
+        )
+        assert result.exit_code == 0, result.output
+        values = json.loads(report.read_text())
+        assert values["frames"] == 3
+        assert values["target_fps"] == pytest.approx(100)
+
+
+def live_stream(count, delay=10):
+    """Open-ended MEOW-ANIM text (no FRAMES) with one-line frames."""
+    frames = "".join(f"FRAME:{i}\nframe{i}\n" for i in range(count))
+    return f"MEOW-ANIM/1.1\nWIDTH:8\nHEIGHT:1\nBASIS:2,2\nDELAY:{delay}\nDATA:\n{frames}"
+
+
+class TestLivePlayback:
+    """Test playing MEOW-ANIM streams as they arrive."""
+
+    def test_frame_complete_at_height(self):
+        """Test a frame is yielded once it has HEIGHT lines, before the next marker."""
+        read_fd, write_fd = os.pipe()
+        with open(read_fd, encoding="utf-8") as r, open(write_fd, "w", encoding="utf-8") as w:
+            w.write("MEOW-ANIM/1.1\nWIDTH:4\nHEIGHT:2\nDELAY:50\nDATA:\nFRAME:0\nDELAY:70\nab\ncd\n")
+            w.flush()
+            reader = MeowStreamReader(r)
+            frames = iter(reader)
+            assert next(frames) == (["ab", "cd"], 70)  # The writer is still open
+            w.write("FRAME:1\nef\ngh\n")
+            w.close()
+            assert list(frames) == [(["ef", "gh"], 50)]
+        assert reader.height == 2
+
+    def test_skips_to_newest_frame(self, capsys):
+        """Test frames arriving faster than they are drawn are dropped, not queued."""
+        stats = PlaybackStats()
+        CatpicPlayer().play_live(io.StringIO(live_stream(50)), diff=False, stats=stats)
+
+        out = capsys.readouterr().out
+        assert stats.dropped > 0
+        assert stats.frames + stats.dropped == 50
+        assert out.count("frame") == stats.frames
+        assert "frame49" in out
+
+    def test_paced_producer_draws_every_frame(self, capsys):
+        """Test a producer slower than the terminal loses no frames."""
+        read_fd, write_fd = os.pipe()
+
+        def produce():
+            with open(write_fd, "w", encoding="utf-8") as w:
+                w.write(live_stream(0, delay=0))
+                for i in range(5):
+                    w.write(f"FRAME:{i}\nframe{i}\n")
+                    w.flush()
+                    time.sleep(0.03)
+
+        producer = threading.Thread(target=produce)
+        producer.start()
+        with open(read_fd, encoding="utf-8") as r:
+            player = CatpicPlayer()
+            player.play_live(r, diff=False)
+        producer.join()
+
+        out = capsys.readouterr().out
+        assert player.stats.frames == 5
+        assert player.stats.dropped == 0
+        assert [out.index(f"frame{i}") for i in range(5)] == sorted(out.index(f"frame{i}") for i in range(5))
+
+    def test_not_an_animation(self):
+        """Test static MEOW on a live stream is rejected."""
+        with pytest.raises(ValueError, match="MEOW-ANIM"):
+            CatpicPlayer().play_live(io.StringIO("MEOW/1.0\nWIDTH:1\nHEIGHT:1\nDATA:\nx\n"))
+
+    def test_cli_play_stdin(self):
+        """Test catpic play - reads the stream from stdin."""
+        from click.testing import CliRunner
+
+        from catpic.cli import cli
+
+        result = CliRunner().invoke(cli, ["play", "-", "--stats"], input=live_stream(20))
+        assert result.exit_code == 0, result.output
+        assert "frame19" in result.output
+        assert "dropped" in result.output
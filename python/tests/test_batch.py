@@ -0,0 +1,119 @@
+"""Tests for batch conversion and the batch CLI command."""
+
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from catpic import BASIS, CatpicEncoder, render_many
+from catpic.cli import cli
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+@pytest.fixture
+def images(tmp_path):
+    """A directory with a few static images and one animation."""
+    src = tmp_path / "src"
+    src.mkdir()
+    for name in ("red_4x4.png", "checker_16x16.png", "gradient_64x64.jpg", "bounce_small.gif"):
+        shutil.copy(FIXTURES / name, src / name)
+    return src
+
+
+class TestRenderMany:
+    """Test render_many()."""
+
+    def test_renders_directory(self, images, tmp_path):
+        """Test every image is written and matches a single encode."""
+        out = tmp_path / "out"
+        stats = render_many(images, out, basis=BASIS.BASIS_2_2, width=8, jobs=1)
+
+        assert (stats["rendered"], stats["skipped"], stats["failed"]) == (4, 0, 0)
+        assert sorted(p.name for p in out.glob("*.meow")) == [
+            "bounce_small.meow", "checker_16x16.meow", "gradient_64x64.meow", "red_4x4.meow"
+        ]
+        expected = CatpicEncoder(basis=BASIS.BASIS_2_2).encode_image(
+            images / "checker_16x16.png", width=8
+        )
+        assert (out / "checker_16x16.meow").read_text(encoding="utf-8") == expected
+        assert (out / "bounce_small.meow").read_text(encoding="utf-8").startswith("MEOW-ANIM/")
+        assert stats["cells"] > 0 and stats["images_per_second"] > 0
+
+    def test_worker_pool_matches_in_process(self, images, tmp_path):
+        """Test pooled rendering writes the same files."""
+        render_many(images, tmp_path / "serial", width=8, jobs=1)
+        render_many(images, tmp_path / "pooled", width=8, jobs=2)
+        for path in (tmp_path / "serial").glob("*.meow"):
+            assert path.read_bytes() == (tmp_path / "pooled" / path.name).read_bytes()
+
+    def test_skips_up_to_date(self, images, tmp_path):
+        """Test a second run skips, and a touched but unchanged file stays skipped."""
+        out = tmp_path / "out"
+        render_many(images, out, width=8, jobs=1)
+        assert render_many(images, out, width=8, jobs=1)["skipped"] == 4
+
+        source = images / "red_4x4.png"
+        stat = source.stat()
+        os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert render_many(images, out, width=8, jobs=1)["rendered"] == 0
+
+    def test_rerenders_on_change(self, images, tmp_path):
+        """Test changed sources, changed options and force re-render."""
+        out = tmp_path / "out"
+        render_many(images, out, width=8, jobs=1)
+
+        shutil.copy(FIXTURES / "blue_4x4.png", images / "red_4x4.png")
+        stats = render_many(images, out, width=8, jobs=1)
+        assert (stats["rendered"], stats["skipped"]) == (1, 3)
+
+        assert render_many(images, out, width=10, jobs=1)["rendered"] == 4
+        assert render_many(images, out, width=10, jobs=1, force=True)["rendered"] == 4
+
+    def test_glob_and_failures(self, images, tmp_path):
+        """Test glob patterns and that unreadable images are reported."""
+        (images / "broken.png").write_bytes(b"not an image")
+        stats = render_many(str(images / "*.png"), tmp_path / "out", width=8, jobs=1)
+
+        assert stats["rendered"] == 2
+        assert stats["failed"] == 1
+        assert str(images / "broken.png") in stats["errors"]
+
+    def test_output_collision(self, images, tmp_path):
+        """Test two sources with one output name are rejected, even if one is up to date."""
+        out = tmp_path / "out"
+        render_many(images / "red_4x4.png", out, width=8, jobs=1)
+        other = tmp_path / "other"
+        other.mkdir()
+        shutil.copy(FIXTURES / "blue_4x4.png", other / "red_4x4.jpg")
+        with pytest.raises(ValueError, match="both render to"):
+            render_many([images / "red_4x4.png", other / "red_4x4.jpg"], out, width=8, jobs=1)
+
+    def test_no_matches(self, tmp_path):
+        """Test an empty pattern raises ValueError."""
+        with pytest.raises(ValueError):
+            render_many(str(tmp_path / "*.png"))
+
+
+class TestCli:
+    """Test command dispatch."""
+
+    def test_default_command(self):
+        """Test a bare image path still runs the display command."""
+        result = CliRunner().invoke(cli, [str(FIXTURES / "red_4x4.png"), "-w", "2"])
+        assert result.exit_code == 0
+        assert "\x1b[48;2;255;0;0m" in result.output
+
+    def test_batch_command(self, images, tmp_path):
+        """Test the batch command reports aggregate results."""
+        out = tmp_path / "out"
+        args = ["batch", str(images), "-o", str(out), "-w", "8", "-j", "1"]
+        result = CliRunner().invoke(cli, args)
+        assert result.exit_code == 0
+        assert "Rendered 4, skipped 0, failed 0" in result.output
+        assert "images/s" in result.output
+
+        result = CliRunner().invoke(cli, args)
+        assert "Rendered 0, skipped 4" in result.output
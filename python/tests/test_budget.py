@@ -0,0 +1,198 @@
+"""Tests for byte-budgeted output."""
+
+import re
+from pathlib import Path
+
+import pytest
+
+from catpic import BASIS, CatpicDecoder, CatpicEncoder
+from catpic.budget import Budget, Throttle, compact, fit_image, xterm_256
+from catpic.decoder import CatpicPlayer, PlaybackStats
+from catpic.framediff import diff_frame, split_cells
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def screen(output):
+    """Replay output on a terminal model; return what each cell shows and how it was erased."""
+    cells = {}
+    row = col = 0
+    saved = (0, 0)
+    fg = bg = None
+    for params, cmd, char in re.findall(r"\x1b\[([0-9;?]*)([A-Za-z])|(.)", output, re.S):
+        if char == "\n":
+            cells[("newline", row)] = bg  # Scrolling fills with the background
+            row, col = row + 1, 0
+        elif char:
+            cells[(row, col)] = (fg, bg, char)
+            col += 1
+        elif cmd == "m":
+            parts = params.split(";") if params else ["0"]
+            i = 0
+            while i < len(parts):
+                if parts[i] in ("38", "48"):
+                    length = 5 if parts[i + 1] == "2" else 3
+                    value = tuple(parts[i + 1:i + length])
+                    if parts[i] == "38":
+                        fg = value
+                    else:
+                        bg = value
+                    i += length
+                else:
+                    fg = bg = None
+                    i += 1
+        elif cmd == "s":
+            saved = (row, col)
+        elif cmd == "u":
+            row, col = saved
+        elif cmd == "B":
+            row += int(params or 1)
+        elif cmd == "G":
+            col = 0
+        elif cmd == "C":
+            col += int(params or 1)
+        elif cmd == "K":
+            for key in [k for k in cells if k[0] == row and k[1] >= col]:
+                del cells[key]
+            cells[("erase", row, col)] = bg
+    return cells
+
+
+def in_256_colors(cells):
+    """Screen cells with RGB colors replaced by their xterm 256-color index."""
+    def convert(color):
+        if color and color[0] == "2":
+            return ("5", str(xterm_256(tuple(int(c) for c in color[1:]))))
+        return color
+
+    return {key: (convert(v[0]), convert(v[1]), v[2]) if isinstance(v, tuple) else v for key, v in cells.items()}
+
+
+@pytest.fixture(scope="module")
+def data():
+    """MEOW data lines of a photo-like fixture."""
+    meow = CatpicEncoder(basis=BASIS.BASIS_2_2).encode_image(FIXTURES / "gradient_64x64.jpg", 16)
+    return meow.split("DATA:\n", 1)[1]
+
+
+class TestBudget:
+    """Test budget parsing."""
+
+    @pytest.mark.parametrize("value, per_frame, per_second", [
+        ("4096", 4096, None),
+        ("4k", 4096, None),
+        ("20 kB/s", None, 20480),
+        ("1.5M/s", None, 1572864),
+    ])
+    def test_parse(self, value, per_frame, per_second):
+        """Test sizes, units and the /s suffix."""
+        budget = Budget.parse(value)
+        assert (budget.bytes_per_frame, budget.bytes_per_second) == (per_frame, per_second)
+
+    @pytest.mark.parametrize("value", ["", "fast", "4x", "0", "-1k"])
+    def test_parse_invalid(self, value):
+        """Test malformed and empty budgets are rejected."""
+        with pytest.raises(ValueError):
+            Budget.parse(value)
+
+
+class TestCompact:
+    """Test color sequence compaction."""
+
+    def test_same_screen(self, data):
+        """Test compacted lines draw the same cells with fewer bytes."""
+        compacted = compact(data)
+        assert screen(compacted) == screen(data)
+        assert len(compacted) < len(data)
+        assert "\x1b[0m\x1b[38" not in compacted
+
+    def test_diff_output(self):
+        """Test cursor-addressed player output survives compaction."""
+        encoder = CatpicEncoder(basis=BASIS.BASIS_2_2)
+        frames = CatpicDecoder().parse_meow(encoder.encode_animation(FIXTURES / "bounce_small.gif", 12))["frames"]
+        first, second = ([split_cells(line) for line in frame["lines"]] for frame in frames[:2])
+        output = diff_frame(None, first) + diff_frame(first, second)
+
+        assert screen(compact(output)) == screen(output)
+
+    def test_256_colors(self, data):
+        """Test RGB sequences become xterm palette indexes."""
+        compacted = compact(data, "256")
+        assert ";2;" not in compacted
+        assert len(compacted) < len(compact(data))
+        assert xterm_256((255, 0, 0)) == 196
+        assert xterm_256((128, 128, 128)) == 244
+        assert xterm_256((0, 0, 0)) == 16
+
+
+class TestFitImage:
+    """Test width, BASIS and color depth selection."""
+
+    def test_fits_budget(self):
+        """Test a tight budget lowers color depth, BASIS and width."""
+        meow, choice = fit_image(FIXTURES / "gradient_64x64.jpg", Budget.parse("3k"), BASIS.BASIS_2_4, 40)
+        data = meow.split("DATA:\n", 1)[1]
+
+        assert choice["fits"]
+        assert choice["width"] < 40
+        assert choice["bytes"] == len(compact(data, choice["colors"]).encode("utf-8")) <= 3072
+        assert meow.startswith(f"MEOW/1.0\nWIDTH:{choice['width']}\n")
+
+    def test_generous_budget(self):
+        """Test requested settings are kept when they fit."""
+        _, choice = fit_image(FIXTURES / "gradient_64x64.jpg", Budget.parse("1M"), BASIS.BASIS_2_4, 40)
+        assert (choice["width"], choice["basis"], choice["colors"]) == (40, "2,4", "truecolor")
+
+    def test_engine(self):
+        """Test candidates are encoded with the given engine."""
+        image = FIXTURES / "gradient_64x64.jpg"
+        meow, _ = fit_image(image, Budget.parse("1M"), BASIS.BASIS_2_4, 40, engine="fast")
+
+        assert meow == CatpicEncoder(basis=BASIS.BASIS_2_4, engine="fast").encode_image(image, 40)
+        assert meow != CatpicEncoder(basis=BASIS.BASIS_2_4, engine="pil").encode_image(image, 40)
+
+
+class TestThrottle:
+    """Test per-frame budget enforcement during playback."""
+
+    def test_overdraft_drops_later_frames(self, data):
+        """Test an oversized frame is sent once the bucket is full, then paid back."""
+        throttle = Throttle(Budget(bytes_per_frame=len(compact(data, "256")) // 2))
+
+        assert throttle.fit(data) is not None  # Full bucket: waiting would not help
+        assert throttle.colors == "256"
+        assert throttle.fit(data) is None
+        assert throttle.dropped == 1
+
+    def test_player_stays_within_budget(self, capsys):
+        """Test budgeted playback keeps to the budget and ends on the last frame."""
+        content = CatpicEncoder(basis=BASIS.BASIS_2_2).encode_animation(FIXTURES / "bounce_small.gif", 24)
+        frames = CatpicDecoder().parse_meow(content)["frames"]
+        stats = PlaybackStats()
+
+        CatpicPlayer().play(content, delay=1, loop=False, stats=stats, budget=Budget(bytes_per_frame=400))
+        budgeted = in_256_colors(screen(capsys.readouterr().out))
+        CatpicPlayer().play_stream([frames[-1]["lines"]], height=len(frames[-1]["lines"]), loop=False, diff=False)
+        last = in_256_colors(screen(capsys.readouterr().out))
+
+        assert stats.dropped == stats.throttle.dropped > 0
+        assert stats.frames + stats.dropped == len(frames)
+        # Spending never runs more than one forced frame ahead of the budget
+        assert stats.bytes <= 400 * len(frames) + stats.max_frame_bytes
+        assert budgeted == last
+
+
+class TestCliBudget:
+    """Test --budget on the command line."""
+
+    def test_static_image_reports_choice(self):
+        """Test the chosen settings are reported with the compacted image."""
+        from click.testing import CliRunner
+
+        from catpic.cli import cli
+
+        result = CliRunner().invoke(cli, ["show", str(FIXTURES / "gradient_64x64.jpg"), "--budget", "3k"])
+        assert result.exit_code == 0, result.output
+        assert re.search(r"Budget 3072 B/frame: width \d+, BASIS 2,2, \w+ colors", result.output)
+        assert "\x1b[38;" in result.output  # Escapes survive a non-terminal stdout
+        assert "\x1b[0m\x1b[38" not in result.output
@@ -0,0 +1,113 @@
+"""Tests for the rendering daemon and its thin client."""
+
+import threading
+from pathlib import Path
+
+import pytest
+
+from catpic import CatpicDecoder, CatpicEncoder
+from catpic.daemon import CatpicDaemon, parse_client_args, request, run_client
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    """A daemon serving on a temporary socket in a background thread."""
+    server = CatpicDaemon(str(tmp_path / "catpic.sock"), jobs=1)
+    server.start()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    thread.join(timeout=5)
+
+
+class TestClientArgs:
+    """Test which invocations are forwarded to the daemon."""
+
+    def test_simple_display_forwarded(self, monkeypatch):
+        """Test image display with size options becomes a render request."""
+        monkeypatch.delenv("CATPIC_BASIS", raising=False)
+        message = parse_client_args(["show", str(FIXTURES / "red_4x4.png"), "-w", "8", "--basis=2,4"])
+        assert message["op"] == "render"
+        assert message["path"] == str((FIXTURES / "red_4x4.png").resolve())
+        assert (message["width"], message["basis"]) == (8, "2,4")
+
+    def test_engine_forwarded(self, monkeypatch):
+        """Test CATPIC_ENGINE is sent along, since the daemon does the encoding."""
+        image = str(FIXTURES / "red_4x4.png")
+        monkeypatch.delenv("CATPIC_ENGINE", raising=False)
+        assert parse_client_args([image])["engine"] == ""
+        monkeypatch.setenv("CATPIC_ENGINE", "fast")
+        assert parse_client_args([image])["engine"] == "fast"
+
+    def test_other_invocations_local(self):
+        """Test saving, info, subcommands and .meow files stay in-process."""
+        image = str(FIXTURES / "red_4x4.png")
+        for args in (
+            [image, "-o", "out.meow"],
+            [image, "--info"],
+            ["batch", str(FIXTURES)],
+            ["missing.png"],
+            [image, "-w", "wide"],
+            [image, "-b", "3,3"],
+        ):
+            assert parse_client_args(args) is None
+
+
+class TestDaemon:
+    """Test serving render requests over the socket."""
+
+    def test_ping_and_no_daemon(self, daemon, tmp_path):
+        """Test ping answers and a missing socket returns None."""
+        header, _ = request({"op": "ping"}, daemon.socket_path)
+        assert header["ok"] and header["requests"] >= 1
+        assert request({"op": "ping"}, str(tmp_path / "none.sock")) is None
+
+    def test_render_matches_in_process(self, daemon):
+        """Test daemon output equals local encoding and repeats hit the cache."""
+        message = {"op": "render", "path": str(FIXTURES / "checker_16x16.png"),
+                   "basis": "2,2", "width": 8, "height": None}
+        header, body = request(message, daemon.socket_path)
+        expected = CatpicEncoder(basis=(2, 2)).encode_image(FIXTURES / "checker_16x16.png", 8)
+
+        assert header == {"ok": True, "format": "MEOW/1.0", "cached": False}
+        assert body == expected
+        assert request(message, daemon.socket_path)[0]["cached"] is True
+
+    def test_render_engine(self, daemon):
+        """Test the requested engine is used and cached apart from the default."""
+        image = FIXTURES / "gradient_64x64.jpg"
+        message = {"op": "render", "path": str(image), "basis": "2,2", "width": 8, "height": None}
+        default = request(message, daemon.socket_path)
+        fast = request(dict(message, engine="fast"), daemon.socket_path)
+
+        assert default[1] == CatpicEncoder(basis=(2, 2), engine="pil").encode_image(image, 8)
+        assert fast[1] == CatpicEncoder(basis=(2, 2), engine="fast").encode_image(image, 8)
+        assert fast[1] != default[1]
+        assert fast[0]["cached"] is False
+
+    def test_render_error(self, daemon, tmp_path):
+        """Test unreadable images report an error instead of output."""
+        broken = tmp_path / "broken.png"
+        broken.write_bytes(b"not an image")
+        header, body = request({"op": "render", "path": str(broken)}, daemon.socket_path)
+        assert not header["ok"] and body == ""
+
+    def test_animation_played_locally(self, daemon):
+        """Test animations are left to the client instead of sent as text."""
+        message = {"op": "render", "path": str(FIXTURES / "bounce_small.gif"), "width": 8}
+        header, body = request(message, daemon.socket_path)
+        assert header["ok"] is False and header["local"] is True
+        assert body == ""
+        assert not run_client([str(FIXTURES / "bounce_small.gif")], daemon.socket_path)
+
+    def test_run_client_displays(self, daemon, capsys):
+        """Test the thin client prints what the local display would."""
+        image = FIXTURES / "checker_16x16.png"
+        assert run_client([str(image), "-w", "8", "-b", "2,2"], daemon.socket_path)
+        remote = capsys.readouterr().out
+
+        CatpicDecoder().display(CatpicEncoder(basis=(2, 2)).encode_image(image, 8))
+        assert remote == capsys.readouterr().out
@@ -0,0 +1,174 @@
+"""Tests for image encoding: fast paths and bounded-memory decoding."""
+
+import re
+import tracemalloc
+import warnings
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from catpic import BASIS, CatpicEncoder
+
+FIXTURES = Path(__file__).parent / "fixtures"
+MAX_MEMORY = 4 * 1024 * 1024
+
+_CELL = re.compile(r"\x1b\[38;2;(\d+);(\d+);(\d+)m\x1b\[48;2;(\d+);(\d+);(\d+)m(.)\x1b\[0m")
+
+
+def halves(char, fg, bg):
+    """Colors shown in the top and bottom half of a BASIS 1,2 cell."""
+    return (fg if char in "▀█" else bg, fg if char in "▄█" else bg)
+
+
+def pixel_colors(blocks, cell):
+    """Color of every pixel of a MEOW cell, in pattern bit order."""
+    fg, bg = tuple(map(int, cell[:3])), tuple(map(int, cell[3:6]))
+    pattern = blocks.index(cell[6])
+    return [fg if pattern >> i & 1 else bg for i in range(len(blocks).bit_length() - 1)]
+
+
+def noisy_image(size):
+    """RGB noise with a flat band, so some cells have two equal pixels."""
+    img = Image.merge("RGB", [Image.effect_noise(size, 80) for _ in range(3)])
+    img.paste((30, 60, 90), (0, 0, size[0], size[1] // 4))
+    return img
+
+
+@pytest.fixture(scope="module")
+def large_image():
+    """A 4000x3000 RGB test pattern (36 MB decoded)."""
+    size = (4000, 3000)
+    gradient = Image.linear_gradient("L")
+    return Image.merge("RGB", (
+        gradient.resize(size),
+        gradient.rotate(90).resize(size),
+        Image.effect_noise((400, 300), 50).resize(size),
+    ))
+
+
+class TestHalfBlocks:
+    """Test the BASIS 1,2 fast path."""
+
+    def test_matches_quantized_cells(self):
+        """Test every cell shows the same two colors as the per-cell algorithm."""
+        encoder = CatpicEncoder(basis=BASIS.BASIS_1_2)
+        img = noisy_image((24, 32))
+        lines = encoder.encode_resized(img, 24, 16).split("DATA:\n", 1)[1].split("\n")
+
+        assert len(lines) == 16
+        for y, line in enumerate(lines):
+            cells = _CELL.findall(line)
+            assert len(cells) == 24
+            for x, cell in enumerate(cells):
+                fg, bg = tuple(map(int, cell[:3])), tuple(map(int, cell[3:6]))
+                pattern, ref_fg, ref_bg = encoder._cell_to_glyph(img.crop((x, 2 * y, x + 1, 2 * y + 2)))
+                expected = halves(encoder.core.BLOCKS[BASIS.BASIS_1_2][pattern], ref_fg, ref_bg)
+                assert halves(cell[6], fg, bg) == expected
+                assert cell[6] == ("█" if expected[0] == expected[1] else "▀")
+
+    def test_unchanged_cells_skipped(self):
+        """Test cells flagged unchanged are returned as None."""
+        encoder = CatpicEncoder(basis=BASIS.BASIS_1_2)
+        unchanged = bytearray(b"\x01\x00" * 4)
+        rows = encoder._encode_cell_rows(noisy_image((4, 4)), 4, 2, unchanged)
+
+        assert [cell is None for row in rows for cell in row] == [True, False] * 4
+
+
+class TestTiledEncoding:
+    """Test strip and draft decoding under a memory ceiling."""
+
+    @pytest.mark.parametrize("suffix", [".bmp", ".tif", ".ppm"])
+    def test_strips_stay_under_budget(self, large_image, tmp_path, suffix):
+        """Test raw-row formats decode in strips within max_memory."""
+        path = tmp_path / f"large{suffix}"
+        large_image.save(path)
+        encoder = CatpicEncoder(basis=(2, 2))
+
+        # Warnings captured by pytest would count against the peak
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            tracemalloc.start()
+            try:
+                meow = encoder.encode_image(path, width=80, height=30, max_memory=MAX_MEMORY)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+
+        assert peak < MAX_MEMORY
+        # Strips reduce exactly like the whole image reduced at once
+        factor = min(4000 // (2 * 160), 3000 // (2 * 60))
+        expected = encoder.encode_image(large_image.reduce(factor), width=80, height=30)
+        assert meow == expected
+
+    def test_jpeg_draft(self, large_image, tmp_path):
+        """Test large JPEGs are decoded at a reduced scale."""
+        path = tmp_path / "large.jpg"
+        large_image.save(path)
+        with Image.open(path) as img:
+            img_resized, width, height = CatpicEncoder(basis=(2, 2)).prepare_image(
+                img, 40, max_memory=MAX_MEMORY
+            )
+            assert img.size == (500, 375)  # 1/8 DCT scale
+        assert img_resized.size == (80, 2 * height)
+
+    def test_whole_image_formats_refused(self, large_image, tmp_path):
+        """Test an explicit ceiling rejects formats that only decode whole."""
+        path = tmp_path / "large.png"
+        large_image.save(path)
+        with pytest.raises(ValueError, match="cannot be decoded in strips"):
+            CatpicEncoder().encode_image(path, width=40, max_memory=MAX_MEMORY)
+
+    def test_small_images_unchanged(self, tmp_path):
+        """Test images under the ceiling take the exact full-decode path."""
+        path = tmp_path / "small.bmp"
+        Image.effect_noise((64, 48), 40).convert("RGB").save(path)
+        encoder = CatpicEncoder(basis=(2, 2))
+        assert encoder.encode_image(path, width=16, max_memory=MAX_MEMORY) == encoder.encode_image(path, width=16)
+
+
+class TestPaletteFrames:
+    """Test nearest resampling and exact two-color cells."""
+
+    def test_paletted_image_not_quantized(self, tmp_path, monkeypatch):
+        """Test a two-color paletted PNG is encoded without quantize()."""
+        path = tmp_path / "checker.png"
+        checker = Image.new("P", (8, 8))
+        checker.putpalette([255, 255, 0, 0, 0, 128])
+        for xy in [(x, y) for x in range(8) for y in range(8) if (x // 2 + y // 2) % 2]:
+            checker.putpixel(xy, 1)
+        checker.save(path)
+
+        calls = []
+        quantize = Image.Image.quantize
+        monkeypatch.setattr(Image.Image, "quantize", lambda *a, **k: calls.append(1) or quantize(*a, **k))
+        meow = CatpicEncoder(basis=BASIS.BASIS_2_2, resample="nearest").encode_image(path, 4, 4)
+
+        assert not calls
+        assert "▀" not in meow and "▄" not in meow  # 2x2 squares map to whole cells
+        assert "\x1b[38;2;0;0;128m" in meow or "\x1b[48;2;0;0;128m" in meow
+
+    @pytest.mark.parametrize("basis", [BASIS.BASIS_2_2, BASIS.BASIS_2_4])
+    def test_gif_matches_quantized_cells(self, basis):
+        """Test GIF frames show the same pixels as quantizing nearest-resized frames."""
+        encoder = CatpicEncoder(basis=basis, resample="nearest", engine="pil")
+        blocks = encoder.core.BLOCKS[basis]
+        basis_x, basis_y = basis.value
+        frames = list(encoder.iter_timed_frames(FIXTURES / "bounce_small.gif", 12, collapse=False))
+
+        with Image.open(FIXTURES / "bounce_small.gif") as img:
+            for (lines, _), index in zip(frames, range(img.n_frames)):
+                img.seek(index)
+                resized = img.convert("RGB").resize((12 * basis_x, len(lines) * basis_y), Image.Resampling.NEAREST)
+                for y, line in enumerate(lines):
+                    for x, cell in enumerate(_CELL.findall(line)):
+                        crop = resized.crop((x * basis_x, y * basis_y, (x + 1) * basis_x, (y + 1) * basis_y))
+                        pattern, fg, bg = encoder._cell_to_glyph(crop)
+                        reference = [fg if pattern >> i & 1 else bg for i in range(basis_x * basis_y)]
+                        assert pixel_colors(blocks, cell) == reference
+
+    def test_invalid_resample(self):
+        """Test unknown filters are rejected."""
+        with pytest.raises(ValueError):
+            CatpicEncoder(resample="bicubic")
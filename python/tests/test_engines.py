@@ -0,0 +1,227 @@
+"""Tests for cell encoding engines and engine selection."""
+
+import json
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from catpic import BASIS, CatpicEncoder, engines
+from catpic.primitives import image_to_cells
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+IMAGES = sorted(p for p in FIXTURES.iterdir() if p.suffix in (".png", ".jpg", ".gif"))
+
+BASES = [BASIS.BASIS_2_2, BASIS.BASIS_2_3, BASIS.BASIS_2_4]
+
+# Engines whose two-color split differs from PIL's median cut may
+# reconstruct multi-color cells somewhat worse, but not by more than this
+ERROR_RATIO = 1.25
+
+
+def resized(path, basis, width=16):
+    """First frame of a fixture, resized to a cell grid."""
+    basis_x, basis_y = basis.value
+    with Image.open(path) as img:
+        img = img.convert("RGB")
+        height = max(1, img.height * width // img.width // 2)
+        return img.resize((width * basis_x, height * basis_y)), width, height
+
+
+def reconstruct(glyphs, basis_x, basis_y):
+    """Pixel colors shown by each cell, in pattern bit order."""
+    return [
+        [fg if pattern >> i & 1 else bg for i in range(basis_x * basis_y)]
+        for row in glyphs for pattern, fg, bg in row
+    ]
+
+
+def source_cells(img, basis_x, basis_y, width, height):
+    """Source pixel colors of each cell, in pattern bit order."""
+    cells = []
+    for y in range(height):
+        for x in range(width):
+            raw = img.crop((x * basis_x, y * basis_y, (x + 1) * basis_x, (y + 1) * basis_y)).tobytes()
+            cells.append([tuple(raw[i:i + 3]) for i in range(0, len(raw), 3)])
+    return cells
+
+
+def error(shown, source):
+    """Mean absolute channel error of the shown pixels."""
+    total = sum(
+        abs(a - b)
+        for shown_cell, source_cell in zip(shown, source)
+        for shown_px, source_px in zip(shown_cell, source_cell)
+        for a, b in zip(shown_px, source_px)
+    )
+    return total / (3 * len(source) * len(source[0]))
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """Isolated calibration cache, forgotten in-process after the test."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    monkeypatch.setattr(engines, "_CALIBRATION", {})
+    return tmp_path
+
+
+class TestConformance:
+    """Test every engine against the reference pil engine over the fixtures."""
+
+    @pytest.mark.parametrize("name", [n for n in engines.ENGINES if n != "pil"])
+    @pytest.mark.parametrize("basis", BASES, ids=lambda b: "{},{}".format(*b.value))
+    def test_matches_reference(self, name, basis):
+        """Test two-color cells match exactly and other cells stay close."""
+        engine = engines.ENGINES[name]
+        if not engine.available():
+            pytest.skip(f"{name} engine not available")
+        basis_x, basis_y = basis.value
+
+        for path in IMAGES:
+            img, width, height = resized(path, basis)
+            reference = reconstruct(
+                engines.ENGINES["pil"].encode(img, basis_x, basis_y, width, height), basis_x, basis_y
+            )
+            shown = reconstruct(engine.encode(img, basis_x, basis_y, width, height), basis_x, basis_y)
+            source = source_cells(img, basis_x, basis_y, width, height)
+
+            assert len(shown) == width * height, path.name
+            for shown_cell, reference_cell, source_cell in zip(shown, reference, source):
+                if len(set(source_cell)) <= 2:
+                    assert shown_cell == reference_cell == source_cell, path.name
+            assert error(shown, source) <= error(reference, source) * ERROR_RATIO + 1, path.name
+
+    def test_process_engine_is_fast_engine(self):
+        """Test the process engine returns exactly the fast engine's glyphs."""
+        img, width, height = resized(FIXTURES / "gradient_64x64.jpg", BASIS.BASIS_2_2)
+        unchanged = bytearray(b"\x00\x01" * (width * height // 2))
+
+        expected = list(engines.ENGINES["fast"].encode(img, 2, 2, width, height, unchanged))
+        assert list(engines.ENGINES["process"].encode(img, 2, 2, width, height, unchanged)) == expected
+        assert expected[0][1] is None
+
+    @pytest.mark.parametrize("basis", BASES, ids=lambda b: "{},{}".format(*b.value))
+    def test_fast_engine_is_numpy_engine(self, basis):
+        """Test the pure-Python and NumPy engines split cells identically."""
+        pytest.importorskip("numpy")
+        basis_x, basis_y = basis.value
+        for path in IMAGES:
+            img, width, height = resized(path, basis)
+            assert list(engines.ENGINES["fast"].encode(img, basis_x, basis_y, width, height)) == list(
+                engines.ENGINES["numpy"].encode(img, basis_x, basis_y, width, height)
+            ), path.name
+
+
+class TestSelection:
+    """Test engine names, CATPIC_ENGINE and auto selection."""
+
+    def test_explicit_engine(self, monkeypatch):
+        """Test engine= wins over CATPIC_ENGINE, which wins over the pil default."""
+        monkeypatch.setenv("CATPIC_ENGINE", "process")
+        assert CatpicEncoder().engine == "process"
+        assert CatpicEncoder(engine="fast").engine == "fast"
+        monkeypatch.delenv("CATPIC_ENGINE")
+        assert CatpicEncoder().engine == "pil"
+
+    def test_default_is_reference(self, monkeypatch):
+        """Test default output is the reference engine's, byte for byte."""
+        monkeypatch.delenv("CATPIC_ENGINE", raising=False)
+        for basis in BASES:
+            for name in ("gradient_64x64.jpg", "checker_64x64.png"):
+                path = str(FIXTURES / name)
+                assert CatpicEncoder(basis=basis).encode_image(path, width=16) == CatpicEncoder(
+                    basis=basis, engine="pil"
+                ).encode_image(path, width=16)
+
+    def test_unknown_engine(self):
+        """Test unknown engines are rejected with the valid names."""
+        with pytest.raises(ValueError, match="Must be one of"):
+            CatpicEncoder(engine="gpu")
+
+    def test_unavailable_engine(self, monkeypatch):
+        """Test an engine with missing dependencies is rejected."""
+        monkeypatch.setattr(engines.NumpyEngine, "available", lambda self: False)
+        with pytest.raises(ValueError, match="not available"):
+            CatpicEncoder(engine="numpy")
+        assert "numpy" not in engines.engine_names()
+
+    def test_image_to_cells_engine(self):
+        """Test image_to_cells takes an engine."""
+        img = Image.open(FIXTURES / "checker_16x16.png").convert("RGB")
+        grids = [image_to_cells(img, 8, 8, basis=BASIS.BASIS_2_2, engine=n) for n in ("pil", "fast")]
+        pil, fast = (
+            reconstruct([[(c.pattern, c.fg_rgb, c.bg_rgb) for c in row] for row in grid], 2, 2) for grid in grids
+        )
+        assert pil == fast
+
+    def test_auto_calibration_cached(self, cache_dir, monkeypatch):
+        """Test auto calibrates once per BASIS, caches on disk and reuses it."""
+        monkeypatch.setattr(engines, "_candidates", lambda: ["fast", "process"])
+        choice = engines.select_engine(2, 2, 100)
+
+        cached = json.loads((cache_dir / "catpic" / "engines.json").read_text())
+        assert set(cached["bases"]["2,2"]) == {"fast", "process"}
+        assert choice in ("fast", "process")
+
+        # A new process reads the cache instead of timing engines again
+        monkeypatch.setattr(engines, "_CALIBRATION", {})
+        monkeypatch.setattr(engines, "calibrate", lambda *args: pytest.fail("recalibrated"))
+        assert engines.select_engine(2, 2, 100) == choice
+
+    def test_worker_reuses_calibration(self, cache_dir, monkeypatch):
+        """Test fewer candidates (as in a pool worker) reuse the cache untouched."""
+        monkeypatch.setattr(engines, "_candidates", lambda: ["fast", "process"])
+        engines.select_engine(2, 2, 100)
+        cache = cache_dir / "catpic" / "engines.json"
+        before = cache.read_text()
+
+        monkeypatch.setattr(engines, "_CALIBRATION", {})
+        monkeypatch.setattr(engines, "_candidates", lambda: ["fast", "numpy"])
+        monkeypatch.setattr(engines, "calibrate", lambda x, y, names: {name: [0.0, 1e-6] for name in names})
+        # Only the missing engine is timed, and merged into the cache
+        assert engines.select_engine(2, 2, 100) in ("fast", "numpy")
+        cached = json.loads(cache.read_text())["bases"]["2,2"]
+        assert set(cached) == {"fast", "process", "numpy"}
+        assert cached["fast"] == json.loads(before)["bases"]["2,2"]["fast"]
+
+        # The main process's key is unchanged, so it still hits the cache
+        monkeypatch.setattr(engines, "_CALIBRATION", {})
+        monkeypatch.setattr(engines, "_candidates", lambda: ["fast", "process"])
+        monkeypatch.setattr(engines, "calibrate", lambda *args: pytest.fail("recalibrated"))
+        engines.select_engine(2, 2, 100)
+
+    def test_auto_prefers_cheaper_engine(self, cache_dir, monkeypatch):
+        """Test auto trades fixed overhead against per-cell cost."""
+        monkeypatch.setattr(engines, "_candidates", lambda: ["fast", "process"])
+        engines._CALIBRATION["2,4"] = {"fast": [0.0, 1e-5], "process": [0.2, 1e-6]}
+
+        assert engines.select_engine(2, 4, 100) == "fast"
+        assert engines.select_engine(2, 4, 100_000) == "process"
+
+    def test_single_candidate_skips_calibration(self, cache_dir, monkeypatch):
+        """Test nothing is timed or written when there is no choice."""
+        monkeypatch.setattr(engines, "_candidates", lambda: ["fast"])
+        assert engines.select_engine(2, 2, 100) == "fast"
+        assert not (cache_dir / "catpic").exists()
+
+    def test_auto_skips_reference(self):
+        """Test auto never picks the slow reference engine."""
+        assert "pil" not in engines._candidates()
+        assert "fast" in engines._candidates()
+
+    def test_cli_engine(self, monkeypatch):
+        """Test --engine selects the engine and rejects unknown names."""
+        from click.testing import CliRunner
+
+        from catpic.cli import cli
+
+        monkeypatch.setenv("CATPIC_DAEMON", "0")
+        runner = CliRunner()
+        result = runner.invoke(cli, ["show", str(FIXTURES / "red_4x4.png"), "-w", "2", "--engine", "process"])
+        assert result.exit_code == 0, result.output
+        assert "\x1b[48;2;255;0;0m" in result.output
+
+        result = runner.invoke(cli, ["show", str(FIXTURES / "red_4x4.png"), "--engine", "gpu"])
+        assert result.exit_code == 1
+        assert "Unknown engine" in result.output
@@ -0,0 +1,65 @@
+"""Tests for contact-sheet rendering."""
+
+import io
+import re
+from pathlib import Path
+
+from catpic import BASIS, render_gallery
+from catpic.gallery import compose_row, fit_tile, gallery_layout, iter_gallery_rows
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+ANSI = re.compile(r"\x1b\[[0-9;]*m")
+
+
+class TestLayout:
+    """Test grid sizing."""
+
+    def test_columns_fit_terminal(self):
+        """Test tiles plus gaps fit in the terminal width."""
+        assert gallery_layout(100, tile_width=24, term_width=80) == (3, 24)
+        assert gallery_layout(2, tile_width=24, term_width=80) == (2, 24)
+
+    def test_width_from_columns(self):
+        """Test a fixed column count derives the tile width."""
+        assert gallery_layout(100, columns=4, term_width=80) == (4, 18)
+
+    def test_fit_tile_keeps_aspect(self):
+        """Test thumbnails fit the box with character aspect correction."""
+        assert fit_tile((64, 64), 12, 6) == (12, 6)
+        assert fit_tile((8, 128), 12, 6) == (1, 6)
+        assert fit_tile((128, 8), 12, 6) == (12, 1)
+
+
+class TestGallery:
+    """Test tile compositing and streaming."""
+
+    def test_compose_row_pads_tiles(self):
+        """Test tiles are centered and equal-height lines are produced."""
+        cell = "\x1b[38;2;0;0;0m\x1b[48;2;9;9;9m \x1b[0m"
+        rows = compose_row([[cell * 2, cell * 2], [cell * 4]], ["a", "long_name"], 4)
+
+        assert len(rows) == 3
+        assert ANSI.sub("", rows[0]) == " " * 10
+        assert ANSI.sub("", rows[1]).rstrip() == ""
+        assert rows[2].split() == ["a", "lon…"]
+
+    def test_rows_in_order(self):
+        """Test rows come out in order with every tile rendered."""
+        paths = sorted(FIXTURES.glob("*.png"))
+        serial = list(iter_gallery_rows(paths, BASIS.BASIS_2_2, 3, 8, jobs=1))
+        pooled = list(iter_gallery_rows(paths, BASIS.BASIS_2_2, 3, 8, jobs=2))
+
+        assert len(serial) == -(-len(paths) // 3)
+        assert pooled == serial
+        assert serial[0][-1].startswith(paths[0].name[:7])
+
+    def test_render_gallery(self):
+        """Test the sheet is written with captions and no line too wide."""
+        out = io.StringIO()
+        count = render_gallery(FIXTURES, out, columns=4, tile_width=12, jobs=1)
+
+        text = out.getvalue()
+        assert count == len([p for p in FIXTURES.iterdir() if p.suffix in (".png", ".jpg", ".gif")])
+        assert "red_4x4.png" in text
+        assert max(len(ANSI.sub("", line)) for line in text.splitlines()) <= 4 * 12 + 3 * 2
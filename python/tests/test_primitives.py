@@ -6,6 +6,8 @@ from PIL import Image
 from catpic import BASIS
 from catpic.primitives import (
     Cell,
+    CellGrid,
+    cells_to_ansi_lines,
     compute_centroid,
     get_full_glut,
     get_pips_glut,
@@ -13,7 +15,9 @@ from catpic.primitives import (
     pattern_to_index,
     process_cell,
     quantize_cell,
+    render_dirty,
     render_image_ansi,
+    update_region,
 )
 
 
@@ -143,6 +147,20 @@ class TestImageProcessing:
         assert len(cells) == 10
         assert len(cells[0]) == 20
     
+    def test_image_to_cells_half_blocks(self):
+        """Test BASIS 1,2 cells take their colors straight from the two pixels."""
+        img = Image.new('RGB', (3, 4), (10, 20, 30))
+        img.putpixel((1, 0), (255, 0, 0))
+        img.putpixel((2, 3), (0, 0, 255))
+        cells = image_to_cells(img, 3, 2, basis=BASIS.BASIS_1_2)
+        
+        assert [cell.char for row in cells for cell in row] == ["█", "▀", "█", "█", "█", "▀"]
+        assert cells[0][1].fg_rgb == (255, 0, 0)
+        assert cells[0][1].bg_rgb == (10, 20, 30)
+        assert cells[1][2].fg_rgb == (10, 20, 30)
+        assert cells[1][2].bg_rgb == (0, 0, 255)
+        assert cells[1][0].fg_rgb == cells[1][0].bg_rgb == (10, 20, 30)
+    
     def test_render_image_ansi(self):
         """Test quick ANSI rendering."""
         img = Image.new('RGB', (40, 20), (128, 128, 128))
@@ -151,3 +169,139 @@ class TestImageProcessing:
         assert isinstance(ansi, str)
         assert len(ansi) > 0
         assert "\x1b[" in ansi  # Contains ANSI codes
+
+
+class TestCellGrid:
+    """Test array-backed cell grid."""
+    
+    def make_grid(self):
+        img = Image.new('RGB', (8, 4))
+        img.putpixel((0, 0), (255, 0, 0))
+        img.putpixel((5, 3), (0, 255, 0))
+        return image_to_cells(img, 4, 2, basis=BASIS.BASIS_2_2)
+    
+    def test_cell_has_slots(self):
+        """Test Cell stores no per-instance __dict__."""
+        cell = Cell("█", (255, 0, 0), (0, 0, 255), 15)
+        assert not hasattr(cell, "__dict__")
+    
+    def test_image_to_cells_returns_grid(self):
+        """Test image_to_cells returns a CellGrid usable as rows of Cells."""
+        grid = self.make_grid()
+        assert isinstance(grid, CellGrid)
+        assert [len(row) for row in grid] == [4, 4]
+        assert all(isinstance(cell, Cell) for row in grid for cell in row)
+        assert grid[-1][-1].pattern == grid.cell(3, 1).pattern
+    
+    def test_set_and_get_cell(self):
+        """Test cells round-trip through the arrays."""
+        grid = CellGrid(3, 2, get_full_glut(BASIS.BASIS_2_2))
+        grid.set_cell(2, 1, 9, (1, 2, 3), (4, 5, 6))
+        cell = grid[1][2]
+        assert (cell.char, cell.fg_rgb, cell.bg_rgb, cell.pattern) == ("▚", (1, 2, 3), (4, 5, 6), 9)
+    
+    def test_cell_views_write_through(self):
+        """Test assigning to grid[y][x] edits the grid and marks it dirty."""
+        grid = CellGrid(3, 2, get_full_glut(BASIS.BASIS_2_2))
+        grid.clear_dirty()
+        grid[1][2].fg_rgb = (1, 2, 3)
+        grid[1][2].char = "▚"
+        assert (grid.cell(2, 1).fg_rgb, grid.cell(2, 1).pattern) == ((1, 2, 3), 9)
+        assert grid.dirty_spans() == [(1, 2, 3)]
+        
+        snapshot = grid[1][2].snapshot()
+        grid[1][2].bg_rgb = (7, 7, 7)
+        assert snapshot.bg_rgb == (0, 0, 0)
+        with pytest.raises(ValueError):
+            grid[0][0].char = "x"
+    
+    def test_bulk_render_matches_cells(self):
+        """Test bulk rendering equals per-cell to_ansi output."""
+        grid = self.make_grid()
+        as_lists = [list(row) for row in grid]
+        assert cells_to_ansi_lines(grid) == cells_to_ansi_lines(as_lists)
+    
+    def test_from_cells(self):
+        """Test a List[List[Cell]] converts to an equivalent grid."""
+        grid = self.make_grid()
+        copy = CellGrid.from_cells([list(row) for row in grid], grid.glut)
+        assert copy.to_ansi_lines() == grid.to_ansi_lines()
+    
+    def test_region_shares_storage(self):
+        """Test region views read and write the parent grid."""
+        grid = self.make_grid()
+        region = grid.region(1, 1, 2, 1)
+        assert len(region) == 1 and len(region[0]) == 2
+        assert region.to_ansi_lines()[0] == grid.row_ansi(1, 1, 3)
+        
+        region.set_cell(0, 0, 15, (9, 9, 9), (0, 0, 0))
+        assert grid.cell(1, 1).fg_rgb == (9, 9, 9)
+    
+    def test_out_of_range(self):
+        """Test indexing outside the grid raises IndexError."""
+        grid = self.make_grid()
+        with pytest.raises(IndexError):
+            grid[2]
+        with pytest.raises(IndexError):
+            grid.region(3, 0, 2, 1)
+
+
+class TestDirtyRendering:
+    """Test incremental re-encoding and dirty-span rendering."""
+    
+    def test_new_grid_is_dirty(self):
+        """Test the first render draws every row, then nothing is dirty."""
+        grid = CellGrid(3, 2, get_full_glut(BASIS.BASIS_2_2))
+        assert grid.dirty_spans() == [(0, 0, 3), (1, 0, 3)]
+        render_dirty(grid)
+        assert grid.dirty_spans() == []
+    
+    def test_set_cell_marks_only_changes(self):
+        """Test writing identical contents does not dirty a cell."""
+        grid = CellGrid(4, 2, get_full_glut(BASIS.BASIS_2_2))
+        grid.clear_dirty()
+        grid.set_cell(0, 0, 0, (0, 0, 0), (0, 0, 0))
+        grid.set_cell(2, 1, 15, (255, 0, 0), (0, 0, 0))
+        grid.set_cell(3, 1, 15, (255, 0, 0), (0, 0, 0))
+        assert grid.dirty_spans() == [(1, 2, 4)]
+    
+    def test_render_dirty_positions_spans(self):
+        """Test dirty spans are emitted with absolute cursor positioning."""
+        grid = CellGrid(4, 2, get_full_glut(BASIS.BASIS_2_2))
+        grid.clear_dirty()
+        grid.set_cell(1, 1, 15, (255, 0, 0), (0, 0, 0))
+        output = render_dirty(grid, origin=(10, 5))
+        assert output == "\x1b[11;6H" + grid.row_ansi(1, 1, 2)
+        assert render_dirty(grid) == ""
+    
+    def test_update_region_matches_full_encode(self):
+        """Test re-encoding a rectangle equals encoding the whole image."""
+        img = Image.new('RGB', (32, 16), (40, 80, 120))
+        grid = image_to_cells(img, 16, 8, basis=BASIS.BASIS_2_2)
+        grid.clear_dirty()
+        
+        changed = img.copy()
+        for px in range(10, 14):
+            for py in range(4, 8):
+                changed.putpixel((px, py), (255, 255, 0))
+        update_region(grid, changed, 4, 1, 4, 4)
+        
+        expected = image_to_cells(changed, 16, 8, basis=BASIS.BASIS_2_2)
+        assert grid.to_ansi_lines() == expected.to_ansi_lines()
+        spans = grid.dirty_spans()
+        assert spans and all(1 <= row < 5 and 4 <= start and end <= 8 for row, start, end in spans)
+    
+    def test_update_region_non_integer_scale(self):
+        """Test neighbours within the filter's reach are refreshed too."""
+        img = Image.new('RGB', (97, 61), (40, 80, 120))
+        grid = image_to_cells(img, 20, 10, basis=BASIS.BASIS_2_2)
+        grid.clear_dirty()
+        
+        changed = img.copy()
+        changed.paste((255, 255, 0), (40, 20, 50, 30))
+        # Source x 40..50 and y 20..30 fall behind cells x 8..10, y 3..5
+        update_region(grid, changed, 8, 3, 3, 3)
+        
+        expected = image_to_cells(changed, 20, 10, basis=BASIS.BASIS_2_2)
+        assert grid.to_ansi_lines() == expected.to_ansi_lines()
+        assert any(start < 8 or end > 11 for _, start, end in grid.dirty_spans())
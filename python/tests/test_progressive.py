@@ -0,0 +1,156 @@
+"""Tests for draft encoding, cancellation and progressive display."""
+
+import io
+import threading
+from pathlib import Path
+
+import pytest
+
+from catpic import BASIS, CatpicEncoder, ProgressiveRender
+from catpic.decoder import CatpicDecoder
+from catpic.encoder import EncodeCancelled
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+IMAGE = FIXTURES / "gradient_64x64.jpg"
+
+
+def data_lines(content):
+    """Data lines of MEOW content."""
+    return CatpicDecoder().parse_meow(content)["data_lines"]
+
+
+class Screen(io.StringIO):
+    """Output stream that notes when something was first written."""
+
+    def __init__(self):
+        super().__init__()
+        self.written = threading.Event()
+
+    def write(self, text):
+        self.written.set()
+        return super().write(text)
+
+
+class CancelOnSet(threading.Event):
+    """Event that cancels a render when set."""
+
+    def __init__(self, render):
+        super().__init__()
+        self.render = render
+
+    def set(self):
+        self.render.cancel()
+        super().set()
+
+
+class SlowEncoder(CatpicEncoder):
+    """Encoder whose full render waits until the preview is on screen."""
+
+    def __init__(self, screen, **kwargs):
+        super().__init__(**kwargs)
+        self.screen = screen
+
+    def encode_image(self, *args, cancel=None, **kwargs):
+        self.screen.written.wait(5)
+        return super().encode_image(*args, cancel=cancel, **kwargs)
+
+
+@pytest.fixture(autouse=True)
+def tall_terminal(monkeypatch):
+    """Room for every preview unless a test says otherwise."""
+    monkeypatch.setenv("LINES", "100")
+
+
+class TestDraft:
+    """Test the quick render and cancelling the full one."""
+
+    def test_same_cells(self):
+        """Test the draft is BASIS 1,2 with the full render's size."""
+        encoder = CatpicEncoder(basis=BASIS.BASIS_2_4)
+        draft = CatpicDecoder().parse_meow(encoder.encode_draft(IMAGE, width=20))
+        full = CatpicDecoder().parse_meow(encoder.encode_image(IMAGE, width=20))
+
+        assert draft["basis"] == "1,2"
+        assert (draft["width"], draft["height"]) == (full["width"], full["height"]) == (20, 10)
+        assert len(draft["data_lines"]) == 10
+
+    def test_cancel(self):
+        """Test a set cancel event stops encode_image()."""
+        cancel = threading.Event()
+        cancel.set()
+        for basis in (BASIS.BASIS_1_2, BASIS.BASIS_2_2):
+            with pytest.raises(EncodeCancelled):
+                CatpicEncoder(basis=basis).encode_image(IMAGE, width=8, cancel=cancel)
+
+
+class TestProgressive:
+    """Test preview, in-place refinement, the deadline and cancellation."""
+
+    def test_fast_render_skips_preview(self):
+        """Test an image encoded within the deadline is drawn once."""
+        encoder = CatpicEncoder(basis=BASIS.BASIS_2_2)
+        screen = io.StringIO()
+        render = ProgressiveRender(encoder, IMAGE, width=8, deadline=30)
+
+        assert render.show(screen)
+        assert not render.previewed
+        assert screen.getvalue() == "\n".join(data_lines(encoder.encode_image(IMAGE, width=8))) + "\n"
+
+    def test_preview_then_refine(self):
+        """Test a slow render draws the draft, then redraws over it."""
+        screen = Screen()
+        encoder = SlowEncoder(screen, basis=BASIS.BASIS_2_2)
+        render = ProgressiveRender(encoder, IMAGE, width=8, deadline=0)
+
+        assert render.show(screen)
+        assert render.previewed
+        preview = data_lines(encoder.encode_draft(IMAGE, width=8))
+        full = data_lines(CatpicEncoder(basis=BASIS.BASIS_2_2).encode_image(IMAGE, width=8))
+        assert screen.getvalue() == (
+            "\n".join(preview) + "\n" + f"\x1b[{len(preview)}A\r" + "\n".join(full) + "\n"
+        )
+
+    def test_cancel_keeps_preview(self):
+        """Test cancelling leaves the preview and skips the redraw."""
+        screen = Screen()
+        encoder = SlowEncoder(screen, basis=BASIS.BASIS_2_2)
+        render = ProgressiveRender(encoder, IMAGE, width=8, deadline=0)
+        # The user moves on as soon as the preview appears
+        screen.written = CancelOnSet(render)
+
+        assert not render.show(screen)
+        assert render.previewed and render.cancelled
+        assert screen.getvalue() == "\n".join(data_lines(encoder.encode_draft(IMAGE, width=8))) + "\n"
+
+    def test_preview_taller_than_terminal(self, monkeypatch):
+        """Test no preview is drawn that could not be redrawn in place."""
+        monkeypatch.setenv("LINES", "4")
+        screen = Screen()
+        threading.Timer(0.2, screen.written.set).start()
+        render = ProgressiveRender(SlowEncoder(screen, basis=BASIS.BASIS_2_2), IMAGE, width=8, deadline=0)
+
+        assert render.show(screen)
+        assert not render.previewed
+        assert "\x1b[" in screen.getvalue() and "A\r" not in screen.getvalue()
+
+    def test_errors_propagate(self, tmp_path):
+        """Test a failing full render raises from show()."""
+        broken = tmp_path / "broken.png"
+        broken.write_bytes(b"not an image")
+        with pytest.raises(OSError):
+            ProgressiveRender(CatpicEncoder(), broken, width=8).show(io.StringIO())
+
+    def test_cli_without_terminal(self, monkeypatch):
+        """Test --progressive prints the plain render when not on a terminal."""
+        from click.testing import CliRunner
+
+        from catpic.cli import cli
+
+        monkeypatch.setenv("CATPIC_DAEMON", "0")
+        runner = CliRunner()
+        plain = runner.invoke(cli, ["show", str(IMAGE), "-w", "8"])
+        progressive = runner.invoke(cli, ["show", str(IMAGE), "-w", "8", "--progressive", "--deadline", "0"])
+
+        assert progressive.exit_code == 0, progressive.output
+        assert progressive.output == plain.output
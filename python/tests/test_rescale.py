@@ -0,0 +1,132 @@
+"""Tests for parsing MEOW data back into cells and rescaling in cell space."""
+
+from pathlib import Path
+
+import pytest
+
+from catpic import BASIS, CatpicEncoder
+from catpic.budget import compact
+from catpic.decoder import CatpicDecoder
+from catpic.rescale import downscale, format_cells, parse_cells
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def data_lines(path, basis, width):
+    """MEOW data lines of a fixture encoded at BASIS and WIDTH."""
+    content = CatpicEncoder(basis=basis).encode_image(str(path), width=width)
+    return CatpicDecoder().parse_meow(content)["data_lines"]
+
+
+def pixels(rows, basis):
+    """Subpixel colors the cells show, row by row."""
+    basis_x, basis_y = basis.value
+    return [
+        [
+            fg if pattern >> (r * basis_x + c) & 1 else bg
+            for pattern, fg, bg in row
+            for c in range(basis_x)
+        ]
+        for row in rows
+        for r in range(basis_y)
+    ]
+
+
+class TestParse:
+    """Test MEOW data lines parse back into the cells they encode."""
+
+    @pytest.mark.parametrize("basis", list(BASIS), ids=lambda b: "{},{}".format(*b.value))
+    def test_round_trip(self, basis):
+        """Test formatting parsed cells reproduces the data lines."""
+        lines = data_lines(FIXTURES / "gradient_64x64.jpg", basis, 12)
+        rows = parse_cells(lines, basis)
+
+        assert [len(row) for row in rows] == [12] * len(lines)
+        assert format_cells(rows, basis) == lines
+
+    def test_compacted_lines(self):
+        """Test output with merged and omitted SGR sequences parses the same."""
+        lines = data_lines(FIXTURES / "checker_16x16.png", BASIS.BASIS_2_2, 8)
+        compacted = compact("\n".join(lines)).split("\n")
+        assert compacted != lines
+
+        assert parse_cells(compacted, BASIS.BASIS_2_2) == parse_cells(lines, BASIS.BASIS_2_2)
+
+    def test_foreign_characters(self):
+        """Test text that is not a glyph of the BASIS shows its background."""
+        rows = parse_cells(["\x1b[38;2;1;2;3;48;2;4;5;6mab\x1b[49m▘"], BASIS.BASIS_2_2)
+
+        assert rows == [[(0, (1, 2, 3), (4, 5, 6)), (0, (1, 2, 3), (4, 5, 6)), (1, (1, 2, 3), (0, 0, 0))]]
+
+
+class TestDownscale:
+    """Test rescaling cells without the original image."""
+
+    @pytest.mark.parametrize("basis", list(BASIS), ids=lambda b: "{},{}".format(*b.value))
+    def test_same_size_keeps_pixels(self, basis):
+        """Test rescaling to the same size shows exactly the same pixels."""
+        rows = parse_cells(data_lines(FIXTURES / "gradient_64x64.jpg", basis, 10), basis)
+
+        assert pixels(downscale(rows, basis, 10, len(rows)), basis) == pixels(rows, basis)
+
+    def test_halving(self):
+        """Test halving averages each 2×2 block of subpixels."""
+        red, blue = (255, 0, 0), (0, 0, 255)
+        rows = [[(0b0101, red, blue), (0, red, blue)] * 2] * 2
+
+        small = downscale(rows, BASIS.BASIS_2_2, 2)
+
+        assert len(small) == 1
+        # Left half of the first cell: one red column, then three blue ones
+        assert pixels(small, BASIS.BASIS_2_2) == [[(128, 0, 128), (0, 0, 255)] * 2] * 2
+
+    def test_close_to_encoding_smaller(self):
+        """Test a downscaled file looks like the image encoded at that width."""
+        basis = BASIS.BASIS_2_2
+        wide = parse_cells(data_lines(FIXTURES / "gradient_64x64.jpg", basis, 32), basis)
+        small = downscale(wide, basis, 16)
+        direct = parse_cells(data_lines(FIXTURES / "gradient_64x64.jpg", basis, 16), basis)
+
+        assert len(small) == len(direct)
+        shown, expected = pixels(small, basis), pixels(direct, basis)
+        error = sum(
+            abs(a - b)
+            for shown_row, expected_row in zip(shown, expected)
+            for shown_px, expected_px in zip(shown_row, expected_row)
+            for a, b in zip(shown_px, expected_px)
+        ) / (3 * len(shown) * len(shown[0]))
+        assert error < 8
+
+    def test_empty(self):
+        """Test an empty grid cannot be rescaled."""
+        with pytest.raises(ValueError):
+            downscale([], BASIS.BASIS_2_2, 4)
+
+
+class TestDisplay:
+    """Test .meow files wider than the terminal are downscaled to fit."""
+
+    @pytest.fixture
+    def wide(self, tmp_path):
+        path = tmp_path / "wide.meow"
+        path.write_text(
+            CatpicEncoder(basis=BASIS.BASIS_2_2).encode_image(str(FIXTURES / "checker_16x16.png"), width=16),
+            encoding="utf-8",
+        )
+        return path
+
+    def test_fits_terminal(self, wide, monkeypatch):
+        """Test display shrinks to the terminal width, and --force does not."""
+        from click.testing import CliRunner
+
+        from catpic.cli import cli
+
+        monkeypatch.setenv("CATPIC_DAEMON", "0")
+        monkeypatch.setenv("COLUMNS", "8")
+        runner = CliRunner()
+
+        lines = runner.invoke(cli, ["show", str(wide)]).output.splitlines()
+        assert [len(row) for row in parse_cells(lines, BASIS.BASIS_2_2)] == [8] * 4
+
+        lines = runner.invoke(cli, ["show", str(wide), "--force"]).output.splitlines()
+        assert [len(row) for row in parse_cells(lines, BASIS.BASIS_2_2)] == [16] * 8
@@ -0,0 +1,129 @@
+"""Tests for the HTTP render service."""
+
+import asyncio
+import http.client
+import json
+import socket
+import threading
+from pathlib import Path
+
+import pytest
+
+from catpic import CatpicDecoder, CatpicEncoder
+from catpic.server import RenderServer
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+@pytest.fixture
+def server():
+    """A render server on a free localhost port in a background thread."""
+    server = RenderServer(port=0, jobs=1)
+    thread = threading.Thread(target=asyncio.run, args=(server.serve_forever(),), daemon=True)
+    thread.start()
+    assert server.ready.wait(10)
+    yield server
+    server.stop()
+    thread.join(timeout=5)
+
+
+def post(server, path, body):
+    """POST a body and return (status, headers, text)."""
+    conn = http.client.HTTPConnection("127.0.0.1", server.port, timeout=30)
+    conn.request("POST", path, body=body)
+    response = conn.getresponse()
+    result = response.status, dict(response.getheaders()), response.read().decode("utf-8")
+    conn.close()
+    return result
+
+
+def get(server, path):
+    """GET a path and return (status, text)."""
+    conn = http.client.HTTPConnection("127.0.0.1", server.port, timeout=30)
+    conn.request("GET", path)
+    response = conn.getresponse()
+    result = response.status, response.read().decode("utf-8")
+    conn.close()
+    return result
+
+
+def post_with_length(server, length):
+    """POST /render with a raw Content-Length header and return the status."""
+    conn = http.client.HTTPConnection("127.0.0.1", server.port, timeout=30)
+    conn.putrequest("POST", "/render")
+    conn.putheader("Content-Length", length)
+    conn.endheaders()
+    status = conn.getresponse().status
+    conn.close()
+    return status
+
+
+class TestRenderService:
+    """Test rendering over HTTP."""
+
+    def test_render_matches_encoder(self, server):
+        """Test streamed strips reassemble into the encoder's output."""
+        image = FIXTURES / "gradient_64x64.jpg"
+        status, headers, text = post(server, "/render?basis=2,2&width=20", image.read_bytes())
+
+        assert status == 200
+        assert headers["Transfer-Encoding"] == "chunked"
+        assert text == CatpicEncoder(basis=(2, 2)).encode_image(image, width=20)
+
+    def test_ansi_format(self, server):
+        """Test format=ansi returns only the data lines."""
+        image = FIXTURES / "checker_16x16.png"
+        _, _, text = post(server, "/render?basis=2,2&width=8&format=ansi", image.read_bytes())
+        meow = CatpicEncoder(basis=(2, 2)).encode_image(image, width=8)
+        assert text == meow.split("DATA:\n", 1)[1]
+
+    def test_animation(self, server):
+        """Test animated uploads come back as MEOW-ANIM."""
+        body = (FIXTURES / "bounce_small.gif").read_bytes()
+        status, _, text = post(server, "/render?width=16", body)
+        assert status == 200
+        assert len(CatpicDecoder().parse_meow(text)["frames"]) == 8
+
+    def test_bad_requests(self, server):
+        """Test invalid parameters and images are rejected with 4xx."""
+        image = (FIXTURES / "red_4x4.png").read_bytes()
+        assert post(server, "/render?basis=9,9", image)[0] == 400
+        assert post(server, "/render?width=abc", image)[0] == 400
+        assert post(server, "/render", b"not an image")[0] == 422
+        assert get(server, "/render")[0] == 405
+        assert get(server, "/nowhere")[0] == 404
+        assert post_with_length(server, "abc") == 400
+        assert post_with_length(server, "-5") == 400
+
+    def test_stalled_client_times_out(self, server):
+        """Test a client that stops mid-request gets 408 instead of holding on."""
+        server.read_timeout = 0.2
+        with socket.create_connection(("127.0.0.1", server.port), timeout=10) as sock:
+            sock.sendall(b"POST /render HTTP/1.1\r\nContent-Length: 100\r\n")
+            assert sock.recv(1024).startswith(b"HTTP/1.1 408")
+        with socket.create_connection(("127.0.0.1", server.port), timeout=10) as sock:
+            sock.sendall(b"POST /render HTTP/1.1\r\nContent-Length: 100\r\n\r\npartial")
+            assert sock.recv(1024).startswith(b"HTTP/1.1 408")
+        assert server.active == 0
+
+    def test_backpressure(self, server):
+        """Test a full queue answers 503 with Retry-After."""
+        server.active = server.max_queue
+        try:
+            status, headers, _ = post(server, "/render", (FIXTURES / "red_4x4.png").read_bytes())
+        finally:
+            server.active = 0
+        assert status == 503
+        assert headers["Retry-After"] == "1"
+
+    def test_stats(self, server):
+        """Test counters, latency percentiles and throughput are reported."""
+        post(server, "/render?width=8", (FIXTURES / "red_4x4.png").read_bytes())
+        status, text = get(server, "/stats")
+        stats = json.loads(text)
+
+        assert status == 200
+        assert stats["renders"] == 1
+        assert stats["cells"] == 8 * 4
+        assert stats["latency_ms"]["p50"] > 0
+        assert stats["renders_per_s"] > 0
@@ -0,0 +1,119 @@
+"""Tests for video-like frame sources and streaming encoding."""
+
+import io
+
+import pytest
+from PIL import Image
+
+from catpic import BASIS, CatpicDecoder, CatpicEncoder
+from catpic.sources import (
+    ImageSequenceSource,
+    RawRGBSource,
+    Y4MSource,
+    open_source,
+)
+
+
+def make_y4m(frames, width=4, height=4, rate="25:1", colorspace="420jpeg"):
+    """Build a 4:2:0 Y4M stream of solid frames given as (Y, Cb, Cr)."""
+    data = io.BytesIO()
+    data.write(f"YUV4MPEG2 W{width} H{height} F{rate} Ip A1:1 C{colorspace}\n".encode())
+    for y, cb, cr in frames:
+        data.write(b"FRAME\n")
+        data.write(bytes([y]) * (width * height))
+        data.write(bytes([cb]) * (width * height // 4))
+        data.write(bytes([cr]) * (width * height // 4))
+    data.seek(0)
+    return data
+
+
+class TestY4MSource:
+    """Test YUV4MPEG2 parsing."""
+
+    def test_header(self):
+        """Test frame size and rate come from the header."""
+        source = Y4MSource(make_y4m([(16, 128, 128)], width=8, height=6, rate="30000:1001"))
+        assert (source.width, source.height) == (8, 6)
+        assert source.delay == 33
+
+    def test_limited_range_conversion(self):
+        """Test limited-range black/white map to full-range RGB."""
+        frames = list(Y4MSource(make_y4m([(16, 128, 128), (235, 128, 128)])))
+        assert len(frames) == 2
+        assert frames[0].getpixel((0, 0)) == (0, 0, 0)
+        assert frames[1].getpixel((0, 0)) == (255, 255, 255)
+
+    def test_missing_header(self):
+        """Test non-Y4M input is rejected."""
+        with pytest.raises(ValueError):
+            Y4MSource(io.BytesIO(b"not a stream\n"))
+
+    @pytest.mark.parametrize("colorspace", ["444alpha", "mono16", "420p10"])
+    def test_unsupported_colorspace(self, colorspace):
+        """Test colorspaces with extra planes or wider samples are rejected."""
+        with pytest.raises(ValueError, match="Unsupported Y4M colorspace"):
+            Y4MSource(make_y4m([], colorspace=colorspace))
+
+    def test_chroma_siting_variants(self):
+        """Test every 8-bit 4:2:0 siting variant is read the same way."""
+        for colorspace in ("420", "420mpeg2", "420paldv"):
+            frames = list(Y4MSource(make_y4m([(235, 128, 128)], colorspace=colorspace)))
+            assert frames[0].getpixel((0, 0)) == (255, 255, 255)
+
+    def test_truncated_frame(self):
+        """Test a short final frame raises ValueError."""
+        stream = io.BytesIO(make_y4m([(16, 128, 128)]).getvalue()[:-3])
+        with pytest.raises(ValueError):
+            list(Y4MSource(stream))
+
+
+class TestOtherSources:
+    """Test raw RGB and image sequence sources."""
+
+    def test_raw_rgb(self):
+        """Test raw RGB24 frames are split by frame size."""
+        stream = io.BytesIO(bytes([255, 0, 0]) * 4 + bytes([0, 0, 255]) * 4)
+        frames = list(RawRGBSource(stream, 2, 2, fps=10))
+        assert [frame.getpixel((1, 1)) for frame in frames] == [(255, 0, 0), (0, 0, 255)]
+
+    def test_image_sequence_natural_order(self, tmp_path):
+        """Test frame_2 sorts before frame_10."""
+        for idx in (10, 2, 1):
+            Image.new("RGB", (4, 4), (idx, 0, 0)).save(tmp_path / f"frame_{idx}.png")
+        source = ImageSequenceSource(tmp_path, fps=5)
+        assert [p.name for p in source.paths] == ["frame_1.png", "frame_2.png", "frame_10.png"]
+        assert [frame.getpixel((0, 0))[0] for frame in source] == [1, 2, 10]
+        assert source.delay == 200
+
+    def test_raw_needs_size(self, tmp_path):
+        """Test raw input without a frame size is rejected."""
+        raw = tmp_path / "clip.rgb"
+        raw.write_bytes(bytes(12))
+        with pytest.raises(ValueError):
+            open_source(raw)
+
+
+class TestEncodeStream:
+    """Test incremental MEOW-ANIM output."""
+
+    def test_encode_stream(self):
+        """Test streamed output parses as an animation."""
+        source = Y4MSource(make_y4m([(16, 128, 128), (235, 128, 128), (235, 128, 128)]))
+        out = io.StringIO()
+        count = CatpicEncoder(basis=BASIS.BASIS_2_2).encode_stream(source, out, width=2)
+
+        parsed = CatpicDecoder().parse_meow(out.getvalue())
+        assert out.getvalue().startswith("MEOW-ANIM/1.1\n")
+        assert count == 2  # Duplicate last frame merged
+        assert len(parsed["frames"]) == 2
+        assert parsed["frames"][1]["delay"] == 80
+        assert all(len(frame["lines"]) == 1 for frame in parsed["frames"])
+
+    def test_frames_header_when_known(self):
+        """Test FRAMES is written only when the count is known up front."""
+        stream = io.BytesIO(bytes(2 * 2 * 3 * 3))
+        source = RawRGBSource(stream, 2, 2, frame_count=3)
+        out = io.StringIO()
+        CatpicEncoder(basis=BASIS.BASIS_2_2).encode_stream(source, out, width=2, collapse=False)
+        assert out.getvalue().startswith("MEOW-ANIM/1.0\n")
+        assert "FRAMES:3" in out.getvalue()
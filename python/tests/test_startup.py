@@ -0,0 +1,86 @@
+"""Tests guarding cold-start cost of displaying .meow files."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import catpic
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+# Cumulative import time allowed for catpic.cli (microseconds). The lazy
+# tree imports it in roughly 40 ms; eager Pillow imports push it past 100.
+IMPORT_BUDGET_US = 100_000
+
+# Modules that must stay unloaded while displaying .meow files
+HEAVY_MODULES = ("PIL", "catpic.encoder", "concurrent.futures.process", "multiprocessing")
+
+
+def run_python(code, *args):
+    """Run code in a fresh interpreter and return its stdout and stderr."""
+    result = subprocess.run(
+        [sys.executable, *args, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        timeout=60,
+        env={"CATPIC_DAEMON": "0", "PATH": ""},
+    )
+    return result.stdout, result.stderr
+
+
+class TestLazyImports:
+    """Test that MEOW display never imports Pillow."""
+
+    def test_import_catpic_is_light(self):
+        """Test import catpic loads none of the heavy modules."""
+        out, _ = run_python(
+            "import sys, catpic\n"
+            f"print([m for m in {HEAVY_MODULES!r} if m in sys.modules])\n"
+        )
+        assert out.strip() == "[]"
+
+    def test_display_meow_without_pil(self, tmp_path):
+        """Test catpic file.meow and animation playback avoid heavy imports."""
+        image = tmp_path / "image.meow"
+        anim = tmp_path / "anim.meow"
+        catpic.save_meow(image, FIXTURES / "checker_16x16.png", width=4)
+        anim.write_text(
+            catpic.CatpicEncoder().encode_animation(FIXTURES / "bounce_small.gif", width=4),
+            encoding="utf-8",
+        )
+
+        # The CLI loops animations forever, so play a single pass directly.
+        # A 2-column terminal also makes both downscale in cell space.
+        code = (
+            "import os, sys\n"
+            "os.environ['COLUMNS'] = '2'\n"
+            "from catpic.cli import main\n"
+            "from catpic.decoder import CatpicPlayer\n"
+            "try:\n"
+            f"    main([{str(image)!r}])\n"
+            "except SystemExit:\n"
+            "    pass\n"
+            f"CatpicPlayer().play(open({str(anim)!r}).read(), delay=0, max_loops=1)\n"
+            f"print([m for m in {HEAVY_MODULES!r} if m in sys.modules], file=sys.stderr)\n"
+        )
+        out, err = run_python(code)
+        assert "\x1b[" in out
+        assert "Animation scaled to 2 columns" in err
+        assert err.splitlines()[-1] == "[]"
+
+    def test_lazy_names_resolve(self):
+        """Test every public name resolves through the package."""
+        for name in catpic.__all__:
+            assert getattr(catpic, name) is not None
+        assert set(catpic.__all__) <= set(dir(catpic))
+
+    def test_import_time_budget(self):
+        """Test the CLI module imports within the cold-start budget."""
+        _, err = run_python("import catpic.cli", "-X", "importtime")
+        cumulative = {
+            line.split("|")[2].strip(): int(line.split("|")[1])
+            for line in err.splitlines()
+            if line.startswith("import time:") and line.split("|")[1].strip().isdigit()
+        }
+        assert cumulative["catpic.cli"] < IMPORT_BUDGET_US
@@ -0,0 +1,80 @@
+"""Tests for per-stage profiling and tracing."""
+
+import json
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from catpic import CatpicDecoder, CatpicEncoder, trace
+from catpic.cli import cli
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+@pytest.fixture
+def tracer():
+    """An active tracer, disabled again after the test."""
+    tracer = trace.enable()
+    yield tracer
+    trace.disable()
+
+
+class TestTracer:
+    """Test stage timing and counters."""
+
+    def test_disabled_is_noop(self):
+        """Test stages and counters record nothing while tracing is off."""
+        assert trace.active() is None
+        assert trace.stage("a") is trace.stage("b")
+        with trace.stage("a"):
+            trace.count("cells_encoded", 5)
+
+    def test_encode_and_display_stages(self, tracer, capsys):
+        """Test encoding and display record their stages and counters."""
+        meow = CatpicEncoder(basis=(2, 2)).encode_image(FIXTURES / "checker_16x16.png", width=8)
+        CatpicDecoder().display(meow)
+
+        for name in ("encode.decode", "encode.resize", "encode.quantize",
+                     "encode.format", "decode.parse", "decode.write"):
+            assert tracer.stages[name][0] >= 1
+        assert tracer.stages["encode.quantize"][0] == 4  # One per cell row
+        assert tracer.counters["cells_encoded"] == 8 * 4
+        assert tracer.counters["bytes_emitted"] == len(capsys.readouterr().out)
+        assert "encode.quantize" in tracer.summary()
+
+    def test_chrome_trace(self, tracer, tmp_path):
+        """Test the Chrome trace holds complete events and counters."""
+        CatpicEncoder().encode_animation(FIXTURES / "bounce_small.gif", width=8)
+        path = tmp_path / "trace.json"
+        tracer.write_chrome_trace(str(path))
+
+        events = json.loads(path.read_text())["traceEvents"]
+        spans = [e for e in events if e["ph"] == "X"]
+        assert {e["name"] for e in spans} >= {"encode.decode", "encode.resize", "encode.quantize"}
+        assert all(e["dur"] >= 0 for e in spans)
+        assert {"name": "frames_encoded", "args": {"frames_encoded": 8}}.items() <= next(
+            e for e in events if e["name"] == "frames_encoded"
+        ).items()
+
+
+class TestCli:
+    """Test --profile and CATPIC_TRACE."""
+
+    def test_profile_flag(self):
+        """Test --profile prints the summary before the default command runs."""
+        result = CliRunner().invoke(cli, ["--profile", str(FIXTURES / "red_4x4.png"), "-w", "2"])
+        assert result.exit_code == 0
+        assert "\x1b[48;2;255;0;0m" in result.output
+        assert "encode.quantize" in result.output and "cells_encoded" in result.output
+        assert trace.disable() is not None
+
+    def test_env_trace_file(self, tmp_path, monkeypatch):
+        """Test CATPIC_TRACE=path writes a Chrome trace for a subcommand."""
+        path = tmp_path / "trace.json"
+        monkeypatch.setenv("CATPIC_TRACE", str(path))
+        out = tmp_path / "out"
+        result = CliRunner().invoke(cli, ["batch", str(FIXTURES / "red_4x4.png"), "-o", str(out), "-j", "1"])
+        trace.disable()
+        assert result.exit_code == 0
+        assert json.loads(path.read_text())["traceEvents"]